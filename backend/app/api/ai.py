@@ -1,15 +1,38 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, AsyncIterator
 from app.core.config import get_settings
+from app.core.html_parser import (
+    parse_naver_post,
+    parse_naver_iframe,
+    parse_generic_post,
+    parse_main_page_links,
+    parse_iframe_links,
+    parse_post_list_page,
+)
+from app.core.workers import run_cpu_bound
+from app.core.crawl_client import build_crawl_headers, get_crawl_client, normalize_naver_post_url, parse_naver_post_id
+from app.core.crawl_cache import crawl_cache, content_hash
+from app.core.learning_store import learning_store
+from app.core.gemini import generate_content, get_gemini_model, stream_content
+from app.core.image_jobs import image_jobs
+from app.core.image_store import image_store
+from app.core.image_variants import create_image_variants
+from app.core.imagen import get_imagen_model, imagen_generation_params, imagen_registry
+from app.core.dedup import add_unique_blog_texts, compact_learning_data
+from app.core.violation_scanner import get_violation_scanner
+from app.core.result_cache import make_cache_key, result_cache
+from app.core.log_writer import log_to_file
+from app.core.prompt_context import get_draft_learning_context, get_revision_learning_context
 import google.generativeai as genai
 import json
 from pathlib import Path
 from datetime import datetime
 import httpx
-from bs4 import BeautifulSoup
 import re
 import asyncio
+import time
 import sys
 import os
 import io
@@ -27,70 +50,10 @@ if sys.platform == 'win32':
 
 router = APIRouter()
 
-# 로그 파일 경로
-# backend/app/api/ai.py -> backend/app/api -> backend/app -> backend -> 프로젝트 루트
-LOG_FILE_PATH = Path(__file__).resolve().parent.parent.parent.parent / "backend_logs.txt"
-
-def log_to_file(message: str):
-    """파일과 콘솔 모두에 로그 출력"""
-    # 콘솔에 먼저 출력 (인코딩 문제 없이)
-    print(message, flush=True)
-    sys.stdout.flush()
-    sys.stderr.flush()
-    
-    # 파일에 쓰기 (UTF-8)
-    try:
-        # 로그 파일 경로 확인
-        log_dir = LOG_FILE_PATH.parent
-        if not log_dir.exists():
-            log_dir.mkdir(parents=True, exist_ok=True)
-            print(f"[로그] 디렉토리 생성: {log_dir}", flush=True)
-        
-        # 메시지를 UTF-8로 명시적으로 인코딩
-        message_bytes = message.encode('utf-8', errors='replace')
-        message_safe = message_bytes.decode('utf-8', errors='replace')
-        
-        # 파일 열기 (없으면 생성)
-        with open(LOG_FILE_PATH, 'a', encoding='utf-8', errors='replace') as f:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"[{timestamp}] {message_safe}\n")
-            f.flush()
-            os.fsync(f.fileno())  # 디스크에 즉시 쓰기
-    except PermissionError as e:
-        print(f"[로그 파일 쓰기 실패 - 권한 오류] {str(e)}", flush=True)
-        print(f"[로그 파일 경로] {LOG_FILE_PATH}", flush=True)
-    except Exception as e:
-        # 파일 로깅 실패해도 콘솔 출력은 계속
-        print(f"[로그 파일 쓰기 실패] {type(e).__name__}: {str(e)}", flush=True)
-        print(f"[로그 파일 경로] {LOG_FILE_PATH}", flush=True)
-        import traceback
-        print(f"[로그 파일 쓰기 실패 상세] {traceback.format_exc()}", flush=True)
-
-# 학습 데이터 저장 경로
-LEARNING_DATA_PATH = Path(__file__).resolve().parent.parent.parent.parent / "learning_data.json"
-
-# 학습 데이터 로드 함수
+# 학습 데이터 로드 함수 (저장 방식은 app.core.learning_store 참고)
 def load_learning_data() -> dict:
-    """학습 데이터를 로드합니다."""
-    if LEARNING_DATA_PATH.exists():
-        try:
-            with open(LEARNING_DATA_PATH, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"[학습] 데이터 로드 실패: {str(e)}")
-            return {}
-    return {}
-
-# 학습 데이터 저장 함수
-def save_learning_data(data: dict):
-    """학습 데이터를 저장합니다."""
-    try:
-        with open(LEARNING_DATA_PATH, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"[학습] 데이터 저장 완료")
-    except Exception as e:
-        print(f"[학습] 데이터 저장 실패: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"학습 데이터 저장 실패: {str(e)}")
+    """학습 데이터 스냅샷을 반환합니다 (메모리 캐시, 읽기 전용 - 수정하지 마세요)."""
+    return learning_store.snapshot()
 
 
 async def extract_blog_post_urls(blog_url: str, max_pages: int = 50, cookies: Optional[str] = None) -> List[str]:
@@ -111,17 +74,8 @@ async def extract_blog_post_urls(blog_url: str, max_pages: int = 50, cookies: Op
     try:
         print(f"[블로그 URL 추출] 시작: {blog_url} (쿠키 사용: {'예' if cookies else '아니오'})")
         
-        # User-Agent 설정
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Referer': 'https://blog.naver.com/'
-        }
-        
-        # 쿠키 추가
-        if cookies:
-            headers['Cookie'] = cookies
+        # User-Agent 및 쿠키 설정
+        headers = build_crawl_headers(cookies)
         
         # 블로그 ID 추출
         blog_id_match = re.search(r'blog\.naver\.com/([^/?]+)', blog_url)
@@ -132,176 +86,88 @@ async def extract_blog_post_urls(blog_url: str, max_pages: int = 50, cookies: Op
         blog_id = blog_id_match.group(1)
         print(f"[블로그 URL 추출] 블로그 ID: {blog_id}")
         
-        async with httpx.AsyncClient(timeout=httpx.Timeout(20.0), follow_redirects=True) as client:
-            # 먼저 메인 페이지에서 iframe 확인
-            try:
-                main_response = await client.get(blog_url, headers=headers)
-                if main_response.status_code == 200:
-                    main_soup = BeautifulSoup(main_response.text, 'html.parser')
-                    # 메인 페이지의 iframe에서도 포스트 링크 찾기
-                    for link in main_soup.find_all('a', href=True):
-                        href = link.get('href', '')
-                        if 'PostView.naver' in href and 'logNo=' in href:
-                            full_url = href if href.startswith('http') else f'https://blog.naver.com{href}'
-                            post_urls.add(full_url)
-                        elif re.search(r'blog\.naver\.com/[^/]+/\d+$', href):
-                            full_url = href if href.startswith('http') else f'https://blog.naver.com{href}'
-                            post_urls.add(full_url)
-            except Exception as e:
-                print(f"[블로그 URL 추출] 메인 페이지 크롤링 실패: {str(e)}")
+        # 공유 크롤링 클라이언트 사용 (목록 페이지는 타임아웃 20초)
+        client = get_crawl_client()
+        list_timeout = httpx.Timeout(20.0)
+        
+        # 먼저 메인 페이지에서 iframe 확인
+        try:
+            main_response = await client.get(blog_url, headers=headers, timeout=list_timeout)
+            if main_response.status_code == 200:
+                # 메인 페이지에서도 포스트 링크 찾기
+                post_urls.update(await run_cpu_bound(parse_main_page_links, main_response.text))
+        except Exception as e:
+            print(f"[블로그 URL 추출] 메인 페이지 크롤링 실패: {str(e)}")
+        
+        # 페이지네이션을 통해 모든 포스트 수집
+        page = 1
+        consecutive_empty_pages = 0  # 연속으로 빈 페이지가 나오면 중단
+        
+        while page <= max_pages and consecutive_empty_pages < 3:
+            # 네이버 블로그 포스트 목록 페이지 URL (여러 형식 시도)
+            post_list_urls = [
+                f'https://blog.naver.com/PostList.naver?blogId={blog_id}&currentPage={page}',
+                f'https://blog.naver.com/PostList.naver?blogId={blog_id}&categoryNo=0&listStyle=blog&from=postList&userSelectMenu=true&currentPage={page}',
+            ]
             
-            # 페이지네이션을 통해 모든 포스트 수집
-            page = 1
-            consecutive_empty_pages = 0  # 연속으로 빈 페이지가 나오면 중단
+            page_post_count = 0
             
-            while page <= max_pages and consecutive_empty_pages < 3:
-                # 네이버 블로그 포스트 목록 페이지 URL (여러 형식 시도)
-                post_list_urls = [
-                    f'https://blog.naver.com/PostList.naver?blogId={blog_id}&currentPage={page}',
-                    f'https://blog.naver.com/PostList.naver?blogId={blog_id}&categoryNo=0&listStyle=blog&from=postList&userSelectMenu=true&currentPage={page}',
-                ]
-                
-                page_post_count = 0
-                
-                for post_list_url in post_list_urls:
-                    try:
-                        print(f"[블로그 URL 추출] 페이지 {page} 크롤링 중... ({post_list_url})")
-                        response = await client.get(post_list_url, headers=headers)
-                        
-                        if response.status_code != 200:
-                            continue
-                        
-                        html = response.text
-                        soup = BeautifulSoup(html, 'html.parser')
-                        
-                        # 방법 1: 모든 a 태그에서 PostView 링크 찾기
-                        for link in soup.find_all('a', href=True):
-                            href = link.get('href', '')
-                            
-                            # PostView.naver 형식 (상대/절대 경로 모두 처리)
-                            if 'PostView.naver' in href or 'PostView' in href:
-                                if 'logNo=' in href or 'logNo' in href:
-                                    # 상대 경로 처리
-                                    if href.startswith('/'):
-                                        full_url = f'https://blog.naver.com{href}'
-                                    elif href.startswith('http'):
-                                        full_url = href
-                                    else:
-                                        full_url = f'https://blog.naver.com/{href}'
-                                    
-                                    # URL 정규화 (blogId와 logNo 추출)
-                                    if 'blogId=' in full_url and 'logNo=' in full_url:
-                                        if full_url not in post_urls:
-                                            post_urls.add(full_url)
-                                            page_post_count += 1
-                            
-                            # /username/postId 형식
-                            elif re.search(r'blog\.naver\.com/[^/]+/\d+', href) or re.search(r'^/\d+$', href):
-                                if href.startswith('/'):
-                                    full_url = f'https://blog.naver.com/{blog_id}{href}'
-                                elif href.startswith('http'):
-                                    full_url = href
-                                else:
-                                    full_url = f'https://blog.naver.com/{blog_id}/{href}'
-                                
-                                if full_url not in post_urls:
-                                    post_urls.add(full_url)
-                                    page_post_count += 1
-                        
-                        # 방법 2: data-log-no, data-post-no 등 속성에서 포스트 번호 추출
-                        for attr_name in ['data-log-no', 'data-post-no', 'data-logno', 'logNo', 'postNo']:
-                            for element in soup.find_all(attrs={attr_name: True}):
-                                log_no = element.get(attr_name) or element.get(attr_name.replace('-', ''))
-                                if log_no:
-                                    post_url = f'https://blog.naver.com/PostView.naver?blogId={blog_id}&logNo={log_no}'
-                                    if post_url not in post_urls:
-                                        post_urls.add(post_url)
-                                        page_post_count += 1
-                        
-                        # 방법 3: onclick 속성에서 logNo 추출
-                        for element in soup.find_all(attrs={'onclick': True}):
-                            onclick = element.get('onclick', '')
-                            log_no_match = re.search(r'logNo[=:](\d+)', onclick)
-                            if log_no_match:
-                                log_no = log_no_match.group(1)
-                                post_url = f'https://blog.naver.com/PostView.naver?blogId={blog_id}&logNo={log_no}'
-                                if post_url not in post_urls:
-                                    post_urls.add(post_url)
-                                    page_post_count += 1
-                        
-                        # 방법 4: iframe 내부 확인 (PostList 페이지도 iframe 사용 가능)
-                        iframes = soup.find_all('iframe')
-                        for iframe in iframes:
-                            iframe_src = iframe.get('src') or iframe.get('data-src')
-                            if iframe_src:
-                                if not iframe_src.startswith('http'):
-                                    iframe_src = 'https://blog.naver.com' + iframe_src
-                                
-                                try:
-                                    iframe_response = await client.get(iframe_src, headers=headers)
-                                    if iframe_response.status_code == 200:
-                                        iframe_html = iframe_response.text
-                                        iframe_soup = BeautifulSoup(iframe_html, 'html.parser')
-                                        
-                                        for link in iframe_soup.find_all('a', href=True):
-                                            href = link.get('href', '')
-                                            if 'PostView.naver' in href and 'logNo=' in href:
-                                                full_url = href if href.startswith('http') else f'https://blog.naver.com{href}'
-                                                if full_url not in post_urls:
-                                                    post_urls.add(full_url)
-                                                    page_post_count += 1
-                                            elif re.search(r'blog\.naver\.com/[^/]+/\d+', href):
-                                                full_url = href if href.startswith('http') else f'https://blog.naver.com{href}'
-                                                if full_url not in post_urls:
-                                                    post_urls.add(full_url)
-                                                    page_post_count += 1
-                                except Exception as e:
-                                    pass  # iframe 실패해도 계속 진행
-                        
-                        # 방법 5: JavaScript 변수에서 logNo 추출
-                        scripts = soup.find_all('script')
-                        for script in scripts:
-                            if script.string:
-                                # logNo 패턴 찾기
-                                log_no_matches = re.findall(r'logNo["\']?\s*[:=]\s*["\']?(\d+)', script.string)
-                                for log_no in log_no_matches:
-                                    post_url = f'https://blog.naver.com/PostView.naver?blogId={blog_id}&logNo={log_no}'
-                                    if post_url not in post_urls:
-                                        post_urls.add(post_url)
-                                        page_post_count += 1
-                        
-                        # 한 URL에서 포스트를 찾았으면 다른 URL은 시도하지 않음
-                        if page_post_count > 0:
-                            break
+            for post_list_url in post_list_urls:
+                try:
+                    print(f"[블로그 URL 추출] 페이지 {page} 크롤링 중... ({post_list_url})")
+                    response = await client.get(post_list_url, headers=headers, timeout=list_timeout)
                     
-                    except httpx.TimeoutException:
-                        print(f"[블로그 URL 추출] 페이지 {page} 타임아웃")
+                    if response.status_code != 200:
                         continue
-                    except Exception as e:
-                        print(f"[블로그 URL 추출] 페이지 {page} 오류: {str(e)}")
-                        continue
-                
-                print(f"[블로그 URL 추출] 페이지 {page}: {page_post_count}개 포스트 발견 (총 {len(post_urls)}개)")
-                
-                # 이 페이지에서 포스트를 찾지 못했으면 연속 빈 페이지 카운트 증가
-                if page_post_count == 0:
-                    consecutive_empty_pages += 1
-                else:
-                    consecutive_empty_pages = 0  # 포스트를 찾았으면 리셋
-                
-                # 다음 페이지로
-                page += 1
+                    
+                    # HTML 파싱은 CPU 워커 풀에서 실행 (이벤트 루프 차단 방지)
+                    page_urls, iframe_srcs = await run_cpu_bound(parse_post_list_page, response.text, blog_id)
+                    
+                    # iframe 내부 확인 (PostList 페이지도 iframe 사용 가능)
+                    for iframe_src in iframe_srcs:
+                        try:
+                            iframe_response = await client.get(iframe_src, headers=headers, timeout=list_timeout)
+                            if iframe_response.status_code == 200:
+                                page_urls.extend(await run_cpu_bound(parse_iframe_links, iframe_response.text))
+                        except Exception as e:
+                            pass  # iframe 실패해도 계속 진행
+                    
+                    for full_url in page_urls:
+                        if full_url not in post_urls:
+                            post_urls.add(full_url)
+                            page_post_count += 1
+                    
+                    # 한 URL에서 포스트를 찾았으면 다른 URL은 시도하지 않음
+                    if page_post_count > 0:
+                        break
                 
-                # 요청 간 딜레이 (너무 빠르게 요청하면 차단될 수 있음)
-                import asyncio
-                await asyncio.sleep(1.0)  # 딜레이 증가
+                except httpx.TimeoutException:
+                    print(f"[블로그 URL 추출] 페이지 {page} 타임아웃")
+                    continue
+                except Exception as e:
+                    print(f"[블로그 URL 추출] 페이지 {page} 오류: {str(e)}")
+                    continue
             
-            print(f"[블로그 URL 추출] 완료: 총 {len(post_urls)}개의 포스트 URL 발견")
+            print(f"[블로그 URL 추출] 페이지 {page}: {page_post_count}개 포스트 발견 (총 {len(post_urls)}개)")
             
-            # set을 list로 변환하고 정렬 (최신순으로)
-            result = sorted(list(post_urls), reverse=True)
-            return result
+            # 이 페이지에서 포스트를 찾지 못했으면 연속 빈 페이지 카운트 증가
+            if page_post_count == 0:
+                consecutive_empty_pages += 1
+            else:
+                consecutive_empty_pages = 0  # 포스트를 찾았으면 리셋
+            
+            # 다음 페이지로
+            page += 1
+            
+            # 요청 간 딜레이 (너무 빠르게 요청하면 차단될 수 있음)
+            await asyncio.sleep(1.0)  # 딜레이 증가
+        
+        print(f"[블로그 URL 추출] 완료: 총 {len(post_urls)}개의 포스트 URL 발견")
         
+        # set을 list로 변환하고 정렬 (최신순으로)
+        result = sorted(list(post_urls), reverse=True)
+        return result
+    
     except Exception as e:
         print(f"[블로그 URL 추출] 오류: {str(e)}")
         import traceback
@@ -309,7 +175,7 @@ async def extract_blog_post_urls(blog_url: str, max_pages: int = 50, cookies: Op
         return list(post_urls) if post_urls else []
 
 
-async def crawl_blog(url: str, retry_count: int = 2, cookies: Optional[str] = None) -> str:
+async def crawl_blog(url: str, retry_count: int = 2, cookies: Optional[str] = None, use_cache: bool = True) -> str:
     """
     블로그 URL에서 텍스트를 크롤링합니다.
     네이버 블로그, 티스토리 등 지원
@@ -319,163 +185,119 @@ async def crawl_blog(url: str, retry_count: int = 2, cookies: Optional[str] = No
         url: 블로그 포스트 URL
         retry_count: 재시도 횟수
         cookies: 네이버 로그인 쿠키 (비공개 글 접근용, 선택사항)
+        use_cache: 크롤링 캐시 사용 여부 (False면 캐시를 무시하고 새로 크롤링)
     """
+    # 네이버 포스트 URL은 iframe 없이 본문을 바로 받을 수 있는 PostView 주소로 변환
+    fetch_url = normalize_naver_post_url(url)
+    if fetch_url != url:
+        print(f"[크롤링] PostView URL로 변환: {url} -> {fetch_url}")
+    
+    # 크롤링 캐시 확인 (TTL 이내면 네트워크 요청 없이 사용, 지났으면 조건부 요청으로 재검증)
+    cached = await asyncio.to_thread(crawl_cache.get, fetch_url, cookies) if use_cache else None
+    if cached and cached['fresh']:
+        print(f"[크롤링] 캐시 사용: {len(cached['text'])}자 ({fetch_url})")
+        return cached['text']
+    
+    html_hash = ""
+    etag = None
+    last_modified = None
+    
+    async def remember(content_text: str) -> str:
+        """추출 결과를 캐시에 저장하고 그대로 반환"""
+        await asyncio.to_thread(crawl_cache.put, fetch_url, content_text, html_hash, etag, last_modified, cookies)
+        return content_text
+    
     for attempt in range(retry_count + 1):
         try:
-            print(f"[크롤링] 시도 {attempt + 1}/{retry_count + 1}: {url} (쿠키 사용: {'예' if cookies else '아니오'})")
+            print(f"[크롤링] 시도 {attempt + 1}/{retry_count + 1}: {fetch_url} (쿠키 사용: {'예' if cookies else '아니오'})")
+            
+            # User-Agent 및 쿠키 설정 (봇 차단 방지)
+            headers = build_crawl_headers(cookies)
             
-            # User-Agent 설정 (봇 차단 방지)
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
-                'Referer': 'https://blog.naver.com/'
-            }
+            # 공유 클라이언트로 본문이 있는 PostView 주소를 바로 요청
+            client = get_crawl_client()
+            request_headers = dict(headers)
+            if cached:
+                if cached.get('etag'):
+                    request_headers['If-None-Match'] = cached['etag']
+                if cached.get('last_modified'):
+                    request_headers['If-Modified-Since'] = cached['last_modified']
+            response = await client.get(fetch_url, headers=request_headers)
             
-            # 쿠키 추가
-            if cookies:
-                headers['Cookie'] = cookies
+            # 변경되지 않은 포스트는 캐시된 텍스트 재사용
+            if cached and response.status_code == 304:
+                print(f"[크롤링] 변경 없음 (304) - 캐시 사용: {len(cached['text'])}자")
+                await asyncio.to_thread(crawl_cache.touch, fetch_url, cookies)
+                return cached['text']
             
-            async with httpx.AsyncClient(timeout=httpx.Timeout(15.0), follow_redirects=True) as client:
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
-                html = response.text
+            response.raise_for_status()
+            html = response.text
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            html_hash = content_hash(html)
             
-            soup = BeautifulSoup(html, 'html.parser')
+            # 검증 헤더가 없어도 HTML이 그대로면 파싱 생략
+            if cached and cached.get('html_hash') == html_hash:
+                print(f"[크롤링] HTML 변경 없음 - 캐시 사용: {len(cached['text'])}자")
+                await asyncio.to_thread(crawl_cache.touch, fetch_url, cookies)
+                return cached['text']
             
             # 네이버 블로그 처리
-            if 'blog.naver.com' in url or 'm.blog.naver.com' in url:
-                # 네이버 블로그는 iframe 구조이므로 직접 본문 찾기
-                # 여러 가능한 선택자 시도 (최신 구조 포함)
-                content_selectors = [
-                    '#postViewArea',  # 일반적인 본문 영역
-                    '.se-main-container',  # 스마트에디터
-                    '.se-component',  # 스마트에디터 컴포넌트
-                    '.se-section-text',  # 스마트에디터 텍스트 섹션
-                    '.post-view',  # 구버전
-                    '#postView',  # 다른 버전
-                    '.post_ct',  # 또 다른 버전
-                    '.post-content',  # 추가 선택자
-                    '.post-body',  # 추가 선택자
-                    'article',  # 시맨틱 태그
-                ]
-                
-                content_text = ""
-                for selector in content_selectors:
-                    content = soup.select_one(selector)
-                    if content:
-                        # 스크립트와 스타일 태그 제거
-                        for script in content(['script', 'style', 'noscript']):
-                            script.decompose()
-                        content_text = content.get_text(separator='\n', strip=True)
-                        if len(content_text) > 100:  # 충분한 텍스트가 있으면 사용
-                            print(f"[크롤링] 선택자 '{selector}'로 성공: {len(content_text)}자")
-                            break
+            parsed = None
+            if 'blog.naver.com' in fetch_url:
+                # 네이버 블로그는 iframe 구조이므로 직접 본문 찾기 (파싱은 CPU 워커 풀에서 실행)
+                parsed = await run_cpu_bound(parse_naver_post, html, url)
+                content_text = parsed['text']
+                if parsed['selector']:
+                    print(f"[크롤링] 선택자 '{parsed['selector']}'로 성공: {len(content_text)}자")
                 
                 # iframe 내부 내용이 있는 경우 (모바일 버전 또는 최신 구조)
-                if not content_text or len(content_text) < 100:
-                    # 여러 iframe 찾기 시도
-                    iframes = soup.find_all('iframe')
-                    iframe_src_list = []
-                    
-                    for iframe in iframes:
-                        iframe_id = iframe.get('id', '')
-                        iframe_src = iframe.get('src') or iframe.get('data-src')
-                        # mainFrame 또는 postViewFrame 우선
-                        if iframe_id in ['mainFrame', 'postViewFrame'] or iframe_src:
-                            if iframe_src:
-                                iframe_src_list.append((iframe_id, iframe_src))
-                    
-                    # id='mainFrame' 우선, 없으면 첫 번째 iframe
-                    iframe_to_use = None
-                    for iframe_id, iframe_src in iframe_src_list:
-                        if iframe_id == 'mainFrame':
-                            iframe_to_use = iframe_src
-                            break
-                    if not iframe_to_use and iframe_src_list:
-                        iframe_to_use = iframe_src_list[0][1]
+                if parsed['iframe_src']:
+                    iframe_to_use = parsed['iframe_src']
+                    if not iframe_to_use.startswith('http'):
+                        iframe_url = 'https://blog.naver.com' + iframe_to_use
+                    else:
+                        iframe_url = iframe_to_use
                     
-                    if iframe_to_use:
-                        if not iframe_to_use.startswith('http'):
-                            iframe_url = 'https://blog.naver.com' + iframe_to_use
-                        else:
-                            iframe_url = iframe_to_use
-                        
-                        print(f"[크롤링] iframe URL 발견: {iframe_url}")
-                        try:
-                            async with httpx.AsyncClient(timeout=httpx.Timeout(15.0)) as iframe_client:
-                                iframe_response = await iframe_client.get(iframe_url, headers=headers)
-                                iframe_response.raise_for_status()
-                                iframe_html = iframe_response.text
-                                iframe_soup = BeautifulSoup(iframe_html, 'html.parser')
-                                
-                                for selector in content_selectors:
-                                    content = iframe_soup.select_one(selector)
-                                    if content:
-                                        for script in content(['script', 'style', 'noscript']):
-                                            script.decompose()
-                                        content_text = content.get_text(separator='\n', strip=True)
-                                        if len(content_text) > 100:
-                                            print(f"[크롤링] iframe 내부 '{selector}'로 성공: {len(content_text)}자")
-                                            break
-                        except Exception as e:
-                            print(f"[크롤링] iframe 크롤링 실패: {str(e)}")
-                            continue
+                    print(f"[크롤링] iframe URL 발견: {iframe_url}")
+                    try:
+                        iframe_response = await client.get(iframe_url, headers=headers)
+                        iframe_response.raise_for_status()
+                        iframe_html = iframe_response.text
+                        iframe_text, iframe_selector = await run_cpu_bound(parse_naver_iframe, iframe_html)
+                        if iframe_text is not None:
+                            content_text = iframe_text
+                        if iframe_selector:
+                            print(f"[크롤링] iframe 내부 '{iframe_selector}'로 성공: {len(content_text)}자")
+                    except Exception as e:
+                        print(f"[크롤링] iframe 크롤링 실패: {str(e)}")
+                        continue
                 
                 if content_text and len(content_text) > 50:
                     print(f"[크롤링] 성공: {len(content_text)}자 추출")
-                    return content_text
+                    return await remember(content_text)
                 else:
                     # 전체 본문에서 텍스트 추출 시도 (최후의 수단)
-                    body = soup.find('body')
-                    if body:
-                        for script in body(['script', 'style', 'noscript', 'header', 'footer', 'nav', 'aside']):
-                            script.decompose()
-                        content_text = body.get_text(separator='\n', strip=True)
-                        # 너무 짧은 줄 제거 및 정리
-                        lines = [line.strip() for line in content_text.split('\n') if len(line.strip()) > 10]
-                        content_text = '\n'.join(lines)
-                        if len(content_text) > 100:
-                            print(f"[크롤링] body에서 텍스트 추출 성공: {len(content_text)}자")
-                            return content_text
+                    content_text = parsed['body_text']
+                    if len(content_text) > 100:
+                        print(f"[크롤링] body에서 텍스트 추출 성공: {len(content_text)}자")
+                        return await remember(content_text)
                     
                     # 텍스트를 찾지 못한 경우 재시도
                     if attempt < retry_count:
                         await asyncio.sleep(1.0)
                         continue
-                
-            # 티스토리 블로그 처리
-            elif 'tistory.com' in url:
-                content = soup.select_one('.entry-content, .article-content, #content')
-                if content:
-                    for script in content(['script', 'style', 'noscript']):
-                        script.decompose()
-                    content_text = content.get_text(separator='\n', strip=True)
-                    if len(content_text) > 50:
-                        print(f"[크롤링] 성공 (티스토리): {len(content_text)}자 추출")
-                        return content_text
-            
-            # 일반적인 블로그 처리 (article, main 태그 등)
-            article = soup.find('article') or soup.find('main') or soup.find(class_=re.compile(r'content|post|article', re.I))
-            if article:
-                for script in article(['script', 'style', 'noscript']):
-                    script.decompose()
-                content_text = article.get_text(separator='\n', strip=True)
-                if len(content_text) > 100:
-                    print(f"[크롤링] 성공 (일반): {len(content_text)}자 추출")
-                    return content_text
             
-            # 최후의 수단: body 전체에서 텍스트 추출
-            body = soup.find('body')
-            if body:
-                for script in body(['script', 'style', 'noscript', 'header', 'footer', 'nav', 'aside']):
-                    script.decompose()
-                content_text = body.get_text(separator='\n', strip=True)
-                lines = [line.strip() for line in content_text.split('\n') if len(line.strip()) > 10]
-                content_text = '\n'.join(lines)
-                if len(content_text) > 100:
-                    print(f"[크롤링] 성공 (body 전체): {len(content_text)}자 추출")
-                    return content_text
+            # 티스토리 및 일반적인 블로그 처리 (article, main 태그, body 전체 순서)
+            # 네이버 포스트는 parse_naver_post가 같은 HTML에서 함께 추출한 결과 사용
+            if parsed is not None and parsed['generic'] is not None:
+                content_text, method = parsed['generic']
+            else:
+                content_text, method = await run_cpu_bound(parse_generic_post, html, url)
+            if content_text:
+                method_label = {"tistory": "티스토리", "general": "일반", "body": "body 전체"}[method]
+                print(f"[크롤링] 성공 ({method_label}): {len(content_text)}자 추출")
+                return await remember(content_text)
             
             # 텍스트를 찾지 못한 경우 재시도
             if attempt < retry_count:
@@ -507,16 +329,6 @@ async def crawl_blog(url: str, retry_count: int = 2, cookies: Optional[str] = No
     # 모든 재시도 실패
     return ""
 
-# Gemini API 설정은 요청 시마다 확인
-def configure_gemini():
-    """Gemini API 설정 (요청 시마다 최신 설정 로드)"""
-    settings = get_settings()
-    if settings.google_api_key:
-        genai.configure(api_key=settings.google_api_key)
-        return True
-    return False
-
-
 class DraftRequest(BaseModel):
     topic: str
     keywords: Optional[list[str]] = None
@@ -524,6 +336,8 @@ class DraftRequest(BaseModel):
     content_instruction: Optional[str] = None  # 글의 내용 지시사항 (구체적인 사건, 경험 등)
     tone: Optional[str] = "informative"
     length: Optional[str] = "medium"
+    # True이면 이미지를 기다리지 않고 백그라운드 작업으로 생성 (초안에는 플레이스홀더, image_job_id로 상태 확인 후 교체)
+    background_image: bool = False
 
 
 class DraftResponse(BaseModel):
@@ -531,18 +345,23 @@ class DraftResponse(BaseModel):
     draft: str
     word_count: int
     medical_violations: list[str] = []
+    image_job_id: Optional[str] = None  # 백그라운드 이미지 작업 ID (GET /ai/image/jobs/{image_job_id})
+    image_placeholder: Optional[str] = None  # 초안에 들어간 플레이스홀더 마크다운 (완료 후 실제 이미지 마크다운으로 교체)
 
 
 class ImageRequest(BaseModel):
     prompt: str
     context: Optional[str] = None
     article_text: Optional[str] = None  # 현재 글 내용 (컨텍스트용)
+    fresh: bool = False  # True이면 같은 프롬프트로 생성한 이미지가 있어도 새 이미지 생성
 
 
 class ImageResponse(BaseModel):
     prompt: str
-    image_url: Optional[str] = None
-    preview_url: Optional[str] = None
+    image_url: Optional[str] = None  # 본문용 이미지 (WebP 변형, 없으면 원본)
+    preview_url: Optional[str] = None  # 미리보기용 썸네일 (없으면 image_url)
+    original_url: Optional[str] = None  # 원본 크기 PNG
+    variants: dict = {}  # 변형 이름(original, thumb, web 등) -> URL
     markdown: str  # 마크다운 형식으로 삽입할 이미지 코드
 
 
@@ -550,6 +369,7 @@ class TableRequest(BaseModel):
     description: str  # 표에 들어갈 내용 설명
     context: Optional[str] = None  # 현재 글 내용 (컨텍스트용)
     table_type: Optional[str] = "statistics"  # statistics, anatomy, comparison 등
+    refresh: bool = False  # True이면 캐시된 결과를 무시하고 새로 생성
 
 
 class TableResponse(BaseModel):
@@ -576,6 +396,7 @@ class LearningDataRequest(BaseModel):
     personal_info: Optional[str] = None  # 개인 정보
     clinic_info: Optional[str] = None  # 한의원 정보
     cookies: Optional[str] = None  # 네이버 로그인 쿠키 (비공개 글 접근용)
+    refresh_cache: Optional[bool] = False  # True면 크롤링 캐시를 무시하고 새로 크롤링
 
 
 class LearningDataResponse(BaseModel):
@@ -584,6 +405,7 @@ class LearningDataResponse(BaseModel):
     learned_count: int  # 학습된 텍스트 개수
     extracted_count: int  # 이번에 추출된 텍스트 개수
     preview_texts: Optional[List[str]] = None  # 추출된 텍스트 미리보기 (각각 처음 200자)
+    duplicate_count: int = 0  # 중복이라 저장하지 않은 텍스트 개수
 
 
 class RevisionRequest(BaseModel):
@@ -599,76 +421,38 @@ class RevisionResponse(BaseModel):
     medical_violations: list[str] = []  # 의료법 위반 단어/문장 목록
 
 
-# 의료법 위반 단어 목록 (기본 검사용)
-MEDICAL_VIOLATION_WORDS = [
-    "완치", "치료", "100%", "보장", "확실", "무조건",
-    "최고", "최강", "유일", "독점", "비밀", "특허",
-    "당장", "지금", "급하게", "즉시", "당일"
-]
 
 
-async def check_medical_violations_with_gemini(text: str) -> list[str]:
+def _split_paragraphs(text: str) -> list[str]:
     """
-    제미나이를 사용하여 의료법 위반 가능성을 검사합니다.
-    광고법 및 의료법 위반 사례를 학습한 AI가 더 정확한 검사를 수행합니다.
+    검사 단위(빈 줄로 나뉜 문단)로 나눕니다 (같은 문단은 한 번만).
+    짧은 줄도 같은 문단의 다른 줄과 함께 Gemini 검사에 포함됩니다.
     """
-    try:
-        settings = get_settings()
-        if not settings.google_api_key:
-            print("[의료법 검사] Gemini API 키가 없어 기본 검사만 수행합니다.")
-            return check_medical_violations(text)
-        
-        configure_gemini()
-        
-        # 제미나이 모델 선택
-        try:
-            # 먼저 사용 가능한 모델 목록 확인
-            try:
-                available_models = genai.list_models()
-                model_names_found = []
-                for model_info in available_models:
-                    if 'generateContent' in model_info.supported_generation_methods:
-                        model_name = model_info.name.replace('models/', '')
-                        model_names_found.append(model_name)
-                
-                # 사용 가능한 모델이 있으면 첫 번째 모델 사용
-                if model_names_found:
-                    model_name = model_names_found[0]
-                    print(f"[의료법 검사] 사용 가능한 모델 선택: {model_name}")
-                    model = genai.GenerativeModel(model_name)
-                else:
-                    raise Exception("사용 가능한 모델이 없습니다.")
-            except Exception as list_error:
-                print(f"[의료법 검사] 모델 목록 조회 실패, 기본 모델 시도: {str(list_error)}")
-                # 기본 모델 시도 (안정적인 이름만 사용)
-                model_names = [
-                    'gemini-1.5-flash',
-                    'gemini-1.5-pro',
-                    'gemini-pro',
-                ]
-                model = None
-                for model_name in model_names:
-                    try:
-                        print(f"[의료법 검사] 모델 시도: {model_name}")
-                        model = genai.GenerativeModel(model_name)
-                        print(f"[의료법 검사] 모델 성공: {model_name}")
-                        break
-                    except Exception as e:
-                        print(f"[의료법 검사] 모델 실패 ({model_name}): {str(e)}")
-                        continue
-                
-                if model is None:
-                    print("[의료법 검사] 모델을 찾을 수 없어 기본 검사만 수행합니다.")
-                    return check_medical_violations(text)
-        except Exception as e:
-            print(f"[의료법 검사] 모델 초기화 실패: {str(e)}")
-            return check_medical_violations(text)
-        
-        # 의료법 위반 검사 프롬프트
-        prompt = f"""당신은 의료광고법 및 의료법 전문가입니다. 다음 블로그 글을 검토하여 의료법 위반 소지가 있는 부분을 찾아주세요.
+    paragraphs = []
+    for block in re.split(r'\n\s*\n', text):
+        paragraph = '\n'.join(line.strip() for line in block.split('\n') if line.strip())
+        if paragraph and paragraph not in paragraphs:
+            paragraphs.append(paragraph)
+    return paragraphs
+
+
+def _paragraph_cache_key(model_name: str, paragraph: str) -> str:
+    """문단별 Gemini 의료법 검사 결과의 캐시 키 (app.core.result_cache)"""
+    return make_cache_key("violations", model_name, paragraph)
 
-[검사할 블로그 글]
-{text}
+
+async def _check_paragraphs_with_gemini(model, paragraphs: list[str]) -> tuple[list[list[str]], list[str]]:
+    """
+    여러 문단을 한 번의 Gemini 호출로 검사합니다 (문단마다 번호를 붙여 결과를 문단별로 나눔).
+
+    Returns:
+        (문단별 위반 사항 목록, 문단 번호를 알 수 없는 위반 사항 목록)
+    """
+    numbered_text = "\n\n".join(f"[{i}] {paragraph}" for i, paragraph in enumerate(paragraphs, 1))
+    prompt = f"""당신은 의료광고법 및 의료법 전문가입니다. 다음 블로그 글을 검토하여 의료법 위반 소지가 있는 부분을 찾아주세요.
+
+[검사할 블로그 글 - 문단마다 [번호]가 붙어 있습니다]
+{numbered_text}
 
 [의료법 위반 기준]
 1. 치료 효과에 대한 과장된 표현 (완치, 100% 효과, 보장 등)
@@ -684,28 +468,119 @@ async def check_medical_violations_with_gemini(text: str) -> list[str]:
 
 [검사 지시사항]
 - 위반 소지가 있는 단어, 문장, 표현을 정확히 찾아주세요.
-- 위반 소지가 있는 부분만 간단하게 나열해주세요 (한 줄에 하나씩).
+- 위반 소지가 있는 부분만 간단하게 나열해주세요 (한 줄에 하나씩, "[문단 번호] 표현" 형식).
 - 위반 사항이 없으면 "위반 사항 없음"이라고만 답변하세요.
 - 의심스러운 부분이지만 명확하지 않은 경우는 포함하지 마세요.
 - 전문적이고 객관적으로 판단해주세요.
 
 위반 소지가 있는 부분:"""
 
-        response = model.generate_content(prompt)
-        result = response.text.strip()
+    response = await generate_content(model, prompt)
+    result = response.text.strip()
+    
+    # 결과 파싱
+    per_paragraph = [[] for _ in paragraphs]
+    unattributed = []
+    if result and result != "위반 사항 없음":
+        # 줄바꿈으로 구분된 위반 사항들을 리스트로 변환 (문단별 "[2] 위반 사항 없음" 같은 줄은 제외)
+        lines = [line.strip() for line in result.split('\n') if line.strip() and "위반 사항 없음" not in line]
+        for line in lines:
+            numbered = re.match(r'^[-*\s]*\[?(\d+)\]\s*(.+)$', line)
+            if numbered and 1 <= int(numbered.group(1)) <= len(paragraphs):
+                cleaned = numbered.group(2).strip()
+                if cleaned:
+                    per_paragraph[int(numbered.group(1)) - 1].append(cleaned)
+                continue
+            # 불필요한 접두사 제거 (예: "- ", "1. ", 등)
+            cleaned = line.lstrip('0123456789.-) ').strip()
+            if cleaned:
+                unattributed.append(cleaned)
+    return per_paragraph, unattributed
+
+
+# 검사 대상이 아닌 마크다운 이미지/링크 주소와 URL
+_MARKDOWN_MEDIA_PATTERN = re.compile(r'!\[[^\]]*\]\([^)]*\)|\]\([^)]*\)|https?://\S+')
+
+
+def _settled_by_scanner(scanner, paragraph: str) -> bool:
+    """
+    기본 사전 검사만으로 결론이 나는 문단인지 확인합니다 (Gemini 검사 생략).
+    - 검사할 글자가 없는 문단 (이미지 마크다운, URL, 구분선 등)
+    - 심각도 high 표현(완치, 100%, 보장 등)이 있어 이미 위반으로 표시되는 문단
+    """
+    checkable = _MARKDOWN_MEDIA_PATTERN.sub('', paragraph)
+    if not re.search(r'[0-9a-zA-Z가-힣]', checkable):
+        return True
+    return any(match["severity"] == "high" for match in scanner.scan(paragraph))
+
+
+async def check_medical_violations_with_gemini(text: str, refresh: bool = False) -> list[str]:
+    """
+    제미나이를 사용하여 의료법 위반 가능성을 검사합니다.
+    광고법 및 의료법 위반 사례를 학습한 AI가 더 정확한 검사를 수행합니다.
+
+    단계별로 검사합니다.
+    1. 기본 사전 검사(app.core.violation_scanner)를 먼저 수행하고 결과를 포함합니다.
+       사전 검사만으로 결론이 나는 문단(_settled_by_scanner)은 Gemini로 보내지 않습니다.
+    2. 이전에 검사한 문단은 캐시된 결과를 사용합니다 (같은 글을 다시 검사하거나 일부만 고친 경우).
+    3. 새로 쓰였거나 바뀐 문단만 모아서 한 번의 Gemini 호출로 검사합니다 (남은 문단이 없으면 호출하지 않음).
+
+    refresh=True이면 캐시를 무시하고 모든 문단을 다시 검사합니다.
+    """
+    try:
+        scanner = get_violation_scanner()
+        local_violations = scanner.matched_words(text)
         
-        # 결과 파싱
-        violations = []
-        if result and result != "위반 사항 없음" and "위반 사항 없음" not in result:
-            # 줄바꿈으로 구분된 위반 사항들을 리스트로 변환
-            lines = [line.strip() for line in result.split('\n') if line.strip()]
-            for line in lines:
-                # 불필요한 접두사 제거 (예: "- ", "1. ", 등)
-                cleaned = line.lstrip('0123456789.-) ').strip()
-                if cleaned and cleaned != "위반 사항 없음":
-                    violations.append(cleaned)
-        
-        print(f"[의료법 검사] Gemini 검사 완료: {len(violations)}개 위반 사항 발견")
+        settings = get_settings()
+        if not settings.google_api_key:
+            print("[의료법 검사] Gemini API 키가 없어 기본 검사만 수행합니다.")
+            return local_violations
+        
+        paragraphs = [paragraph for paragraph in _split_paragraphs(text) if not _settled_by_scanner(scanner, paragraph)]
+        if not paragraphs:
+            print(f"[의료법 검사] 기본 검사로 완료: {len(local_violations)}개 위반 사항 발견 (Gemini 검사 생략)")
+            return local_violations
+        
+        # 제미나이 모델 선택 (캐시된 모델 사용)
+        try:
+            model = await get_gemini_model(settings.google_api_key)
+        except Exception as e:
+            print(f"[의료법 검사] 모델 초기화 실패: {str(e)}")
+            return local_violations
+        
+        results: dict[str, list[str]] = {}
+        
+        def lookup_cached() -> dict:
+            cached = {}
+            for paragraph in paragraphs:
+                paragraph_violations = result_cache.get(_paragraph_cache_key(model.model_name, paragraph))
+                if paragraph_violations is not None:
+                    cached[paragraph] = paragraph_violations
+            return cached
+        
+        if not refresh:
+            results.update(await asyncio.to_thread(lookup_cached))
+        uncached = [paragraph for paragraph in paragraphs if paragraph not in results]
+        
+        unattributed = []
+        if uncached:
+            per_paragraph, unattributed = await _check_paragraphs_with_gemini(model, uncached)
+            results.update(zip(uncached, per_paragraph))
+            # 문단 번호 없이 답한 항목이 있으면 어느 문단 결과인지 알 수 없으므로 캐시하지 않음
+            if not unattributed:
+                def store_results():
+                    for paragraph, paragraph_violations in zip(uncached, per_paragraph):
+                        result_cache.put(_paragraph_cache_key(model.model_name, paragraph), paragraph_violations)
+                
+                await asyncio.to_thread(store_results)
+        
+        violations = list(local_violations)
+        for violation in [v for paragraph in paragraphs for v in results[paragraph]] + unattributed:
+            if violation not in violations:
+                violations.append(violation)
+        
+        print(f"[의료법 검사] Gemini 검사 완료: {len(violations)}개 위반 사항 발견 "
+              f"(Gemini 대상 문단 {len(paragraphs)}개 중 새로 검사 {len(uncached)}개, 나머지는 캐시)")
         return violations
         
     except Exception as e:
@@ -715,19 +590,91 @@ async def check_medical_violations_with_gemini(text: str) -> list[str]:
 
 
 def check_medical_violations(text: str) -> list[str]:
-    """의료법 위반 단어 검사 (기본 검사)"""
-    violations = []
-    text_lower = text.lower()
-    for word in MEDICAL_VIOLATION_WORDS:
-        if word.lower() in text_lower:
-            violations.append(word)
-    return violations
+    """의료법 위반 단어 검사 (기본 검사, 위반 사전은 app.core.violation_scanner)"""
+    return get_violation_scanner().matched_words(text)
 
 
-@router.post("/ai/draft", response_model=DraftResponse)
-async def generate_draft(request: DraftRequest) -> DraftResponse:
+class StreamingViolationChecker:
     """
-    Gemini API를 사용한 블로그 초안 생성
+    스트리밍으로 생성 중인 글의 의료법 위반 검사를 생성과 동시에 진행합니다.
+    - 완성된 문단(줄바꿈까지)이 들어올 때마다 기본 단어 검사를 바로 수행합니다 (local_violations).
+    - 완성된 문단이 GEMINI_CHECK_MIN_CHARS 이상 모이면 Gemini 검사를 백그라운드로 시작합니다.
+    - finish()는 남은 부분을 검사하고 모든 Gemini 검사 결과를 합쳐 반환합니다.
+    전체 지연 시간이 "생성 시간 + 검사 시간"에서 "생성 시간 + 마지막 문단 검사 시간"으로 줄어듭니다.
+    """
+    GEMINI_CHECK_MIN_CHARS = 400
+
+    def __init__(self):
+        self.text = ""
+        self.local_violations: list[str] = []
+        self._checked_upto = 0
+        self._pending = ""
+        self._tasks: list[asyncio.Task] = []
+
+    def feed(self, chunk: str) -> list[str]:
+        """생성된 조각을 추가합니다. 새로 발견된 기본 검사 위반 단어를 반환합니다."""
+        self.text += chunk
+        boundary = self.text.rfind('\n', self._checked_upto)
+        if boundary <= self._checked_upto:
+            return []
+        completed = self.text[self._checked_upto:boundary]
+        self._checked_upto = boundary
+        return self._check_completed(completed, final=False)
+
+    def _check_completed(self, completed: str, final: bool) -> list[str]:
+        new_violations = [word for word in check_medical_violations(completed) if word not in self.local_violations]
+        self.local_violations.extend(new_violations)
+        self._pending += completed
+        if self._pending.strip() and (final or len(self._pending.strip()) >= self.GEMINI_CHECK_MIN_CHARS):
+            self._tasks.append(asyncio.create_task(check_medical_violations_with_gemini(self._pending)))
+            self._pending = ""
+        return new_violations
+
+    async def finish(self) -> list[str]:
+        """남은 부분까지 검사하고 전체 위반 사항을 반환합니다 (중복 제거, 발견 순서 유지)."""
+        self._check_completed(self.text[self._checked_upto:], final=True)
+        self._checked_upto = len(self.text)
+        violations = []
+        for result in await asyncio.gather(*self._tasks):
+            for violation in result:
+                if violation not in violations:
+                    violations.append(violation)
+        return violations
+
+    def cancel(self):
+        """생성이 실패한 경우 진행 중인 검사를 취소합니다."""
+        for task in self._tasks:
+            task.cancel()
+
+
+# 초안과 함께 생성하는 이미지의 전체 대기 시간 (텍스트 생성 타임아웃과 별도)
+DRAFT_IMAGE_TIMEOUT = float(os.getenv("DRAFT_IMAGE_TIMEOUT", "300"))
+
+
+async def _run_image_job(prompt: str, context: Optional[str], media_base_url: Optional[str] = None) -> dict:
+    """백그라운드 이미지 작업 (app.core.image_jobs): 이미지를 생성하고 작업 결과를 반환합니다."""
+    image_url, markdown, image_variants = await _generate_image_internal(
+        prompt=prompt, article_text="", context=context or "", media_base_url=media_base_url
+    )
+    return {"image_url": image_url, "markdown": markdown, "variants": image_variants}
+
+
+def _image_job_placeholder(job_id: str, image_description: str) -> str:
+    """백그라운드 이미지 작업의 플레이스홀더 마크다운 (작업 ID를 포함하므로 초안마다 유일 - 에디터가 이 문자열을 교체)"""
+    alt = image_description or '이미지'
+    return f"![{alt}](https://placehold.co/800x450/E2E8F0/475569?text=Generating+image#image-job-{job_id})"
+
+
+async def _generate_draft_events(request: DraftRequest, media_base_url: Optional[str] = None) -> AsyncIterator[dict]:
+    """
+    블로그 초안을 생성하면서 이벤트를 생성합니다.
+    /ai/draft 와 /ai/draft/stream 이 함께 사용합니다.
+    media_base_url: 생성된 이미지 URL 앞부분 (image_store.media_base_url)
+
+    이벤트 형식:
+        {"type": "chunk", "text": 생성된 텍스트 조각}
+        {"type": "violation", "words": 생성 중 새로 발견된 의료법 위반 단어 (기본 검사)}
+        {"type": "done", "result": DraftResponse 필드 - 이미지가 삽입된 최종 초안과 전체 위반 사항}
     """
     # 매번 최신 설정 로드
     settings = get_settings()
@@ -739,110 +686,24 @@ async def generate_draft(request: DraftRequest) -> DraftResponse:
             detail="Gemini API key가 설정되지 않았습니다. .env 파일에 GOOGLE_API_KEY를 추가해주세요."
         )
     
-    # Gemini API 설정
-    configure_gemini()
-    
+    # 텍스트와 동시에 진행하는 이미지 생성 작업 (초안이 완성되지 않으면 아래 finally에서 취소)
+    image_task = None
     try:
-        # 사용 가능한 모델 목록 확인
+        # 모델 선택 (API 키별로 한 번만 모델 목록을 조회하고 캐시된 모델 사용)
         try:
-            available_models = genai.list_models()
-            print(f"[AI] 사용 가능한 모델 목록:")
-            model_names_found = []
-            for model_info in available_models:
-                if 'generateContent' in model_info.supported_generation_methods:
-                    model_name = model_info.name.replace('models/', '')
-                    model_names_found.append(model_name)
-                    print(f"  - {model_name}")
-            
-            # 사용 가능한 모델이 있으면 첫 번째 모델 사용
-            if model_names_found:
-                model_name = model_names_found[0]
-                print(f"[AI] 선택된 모델: {model_name}")
-                model = genai.GenerativeModel(model_name)
-            else:
-                # 기본 모델 시도 (안정적인 이름만 사용)
-                model_names = [
-                    'gemini-1.5-flash',
-                    'gemini-1.5-pro',
-                    'gemini-pro',
-                ]
-                model = None
-                for model_name in model_names:
-                    try:
-                        print(f"[AI] 모델 시도: {model_name}")
-                        model = genai.GenerativeModel(model_name)
-                        print(f"[AI] 모델 성공: {model_name}")
-                        break
-                    except Exception as e:
-                        print(f"[AI] 모델 실패 ({model_name}): {str(e)}")
-                        continue
-                
-                if model is None:
-                    raise HTTPException(
-                        status_code=500,
-                        detail="사용 가능한 Gemini 모델을 찾을 수 없습니다. API 키를 확인하거나 다른 모델을 시도해주세요."
-                    )
+            model = await get_gemini_model(settings.google_api_key)
         except Exception as e:
-            print(f"[AI] 모델 목록 조회 실패, 기본 모델 시도: {str(e)}")
-            # 모델 목록 조회 실패 시 기본 모델 시도
-            try:
-                model = genai.GenerativeModel('gemini-1.5-flash')
-            except Exception:
-                try:
-                    model = genai.GenerativeModel('gemini-pro')
-                except Exception as final_error:
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"모델 초기화 실패: {str(final_error)}"
-                    )
+            raise HTTPException(
+                status_code=500,
+                detail=f"모델 초기화 실패: {str(e)}"
+            )
         
         # 프롬프트 구성 (스타일별)
         keywords_text = ", ".join(request.keywords) if request.keywords else ""
         
-        # 학습 데이터 로드
-        learning_data = load_learning_data()
-        learning_context = ""
-        has_learning_data = False
-        
-        if learning_data:
-            # "종성이가 씀 !" 스타일(박원장 스타일)일 때만 학습된 어투 강력하게 반영
-            if request.tone == 'personal' and learning_data.get('blog_texts'):
-                has_learning_data = True
-                learning_context += f"\n\n=== [학습된 블로그 어투 예시 - 반드시 이 어투를 따라야 함] ===\n"
-                # 최근 5개 텍스트 사용 (더 많은 예시 제공)
-                sample_texts = learning_data['blog_texts'][-5:]
-                for i, text in enumerate(sample_texts, 1):
-                    # 각 텍스트의 충분한 부분 제공 (800자)
-                    text_preview = text[:800] + "..." if len(text) > 800 else text
-                    learning_context += f"\n[예시 {i} - 학습된 어투]\n{text_preview}\n"
-                learning_context += "\n=== 위 예시들의 어투, 문장 구조, 표현 방식을 정확히 따라야 합니다 ===\n"
-            
-            # 스타일 규칙 반영 (영구적으로 저장된 스타일 규칙)
-            style_rules = learning_data.get('style_rules', [])
-            if style_rules:
-                learning_context += f"\n\n=== [학습된 스타일 규칙 - 반드시 준수해야 함] ===\n"
-                for i, rule in enumerate(style_rules, 1):
-                    learning_context += f"{i}. {rule}\n"
-                learning_context += "\n[중요] 매우 중요: 위의 스타일 규칙을 반드시 준수하여 작성하세요. 이 규칙들은 사용자가 퇴고를 통해 영구적으로 설정한 것이므로 절대 위반하지 마세요.\n"
-            
-            # 퇴고 패턴에서 학습된 선호사항 반영
-            revision_patterns = learning_data.get('revision_patterns', [])
-            if revision_patterns:
-                # 최근 퇴고 패턴들의 지시사항 분석
-                recent_instructions = [p.get('revision_instruction', '') for p in revision_patterns[-10:]]
-                if recent_instructions:
-                    learning_context += f"\n\n=== [퇴고 패턴에서 학습된 선호사항] ===\n"
-                    learning_context += "사용자가 자주 요청하는 수정 사항:\n"
-                    for i, instruction in enumerate(recent_instructions[-5:], 1):  # 최근 5개
-                        learning_context += f"{i}. {instruction}\n"
-                    learning_context += "\n위의 선호사항을 참고하여 초안을 작성하세요.\n"
-            
-            # 개인 정보와 한의원 정보는 모든 스타일에서 활용
-            if learning_data.get('personal_info'):
-                learning_context += f"\n[개인 정보 - 글에 자연스럽게 반영]\n{learning_data['personal_info']}\n"
-            
-            if learning_data.get('clinic_info'):
-                learning_context += f"\n[한의원 정보 - 글에 자연스럽게 반영]\n{learning_data['clinic_info']}\n"
+        # 학습 데이터 기반 컨텍스트 (어투 예시는 주제/키워드와 비슷한 학습 글로 선택)
+        style_query = " ".join([request.topic] + (request.keywords or []))
+        learning_context, has_learning_data = await asyncio.to_thread(get_draft_learning_context, request.tone, style_query)
         
         # 스타일별 프롬프트 설정
         style_prompts = {
@@ -918,6 +779,7 @@ async def generate_draft(request: DraftRequest) -> DraftResponse:
         # 이미지 생성 요청이 있으면 이미지 생성
         generated_image_markdown = ""
         image_description = ""
+        image_job_id = None
         if has_image_request:
             print("[AI] 글쓰기 지시사항에 이미지 생성 요청이 감지되었습니다. 이미지를 생성합니다.")
             print(f"[AI] 글쓰기 지시사항: {request.writing_instruction}")
@@ -1014,22 +876,23 @@ async def generate_draft(request: DraftRequest) -> DraftResponse:
                 print(f"[AI] 추출된 이미지 설명: {image_description}")
                 print(f"[AI] 이미지 생성 프롬프트: {image_prompt_text}")
                 
-                # 이미지 생성 (내부 함수 사용)
-                try:
-                    image_url, generated_image_markdown = await _generate_image_internal(
-                        prompt=image_prompt_text,
-                        article_text="",
-                        context=request.writing_instruction
-                    )
-                    print(f"[AI] 이미지 생성 완료: {image_url}")
-                    print(f"[AI] 생성된 마크다운: {generated_image_markdown}")
-                except Exception as img_error:
-                    print(f"[AI] 이미지 생성 실패 (초안 생성은 계속 진행): {str(img_error)}")
-                    import traceback
-                    print(traceback.format_exc())
-                    # 이미지 생성 실패 시 빈 값으로 설정 (나중에 플레이스홀더 삽입)
-                    generated_image_markdown = ""
-                    image_url = None
+                if request.background_image:
+                    # 이미지를 기다리지 않고 백그라운드 작업으로 생성 (초안에는 플레이스홀더를 넣고, 완료되면 에디터에서 교체)
+                    image_job_id = image_jobs.submit(_run_image_job(image_prompt_text, request.writing_instruction, media_base_url))
+                    generated_image_markdown = _image_job_placeholder(image_job_id, image_description)
+                    print(f"[AI] 백그라운드 이미지 작업 시작: {image_job_id}")
+                else:
+                    # 이미지 생성 (내부 함수 사용) - 이미지 프롬프트는 요청 내용만으로 정해지므로
+                    # 초안 텍스트를 기다리지 않고 텍스트 생성과 동시에 진행 (텍스트 생성 후 결과를 합침)
+                    image_task = asyncio.create_task(asyncio.wait_for(
+                        _generate_image_internal(
+                            prompt=image_prompt_text,
+                            article_text="",
+                            context=request.writing_instruction,
+                            media_base_url=media_base_url
+                        ),
+                        timeout=DRAFT_IMAGE_TIMEOUT
+                    ))
             except Exception as e:
                 print(f"[AI] 이미지 생성 과정에서 오류 발생 (초안 생성은 계속 진행): {str(e)}")
                 import traceback
@@ -1118,15 +981,30 @@ async def generate_draft(request: DraftRequest) -> DraftResponse:
         print(f"[AI] 프롬프트 미리보기: {prompt[:200]}...")
         
         # Gemini API 호출에 타임아웃 설정 (120초로 증가 - 지시사항이 없을 때도 안정적으로 처리)
+        # 스트리밍으로 받으면서 완성된 문단부터 의료법 위반 검사를 함께 진행
         print(f"[AI] Gemini API 호출 시작 (타임아웃: 120초)")
+        violation_checker = StreamingViolationChecker()
         try:
-            response = await asyncio.wait_for(
-                asyncio.to_thread(model.generate_content, prompt),
-                timeout=120.0  # 90초에서 120초로 증가
-            )
-            draft_text = response.text
+            async for chunk in stream_content(model, prompt, timeout=120.0):  # 90초에서 120초로 증가
+                new_violations = violation_checker.feed(chunk)
+                yield {"type": "chunk", "text": chunk}
+                if new_violations:
+                    yield {"type": "violation", "words": new_violations}
+            draft_text = violation_checker.text
             print(f"[AI] Gemini API 호출 완료 (생성된 텍스트 길이: {len(draft_text)}자)")
             
+            # 텍스트와 동시에 진행한 이미지 생성 결과 기다리기
+            if image_task is not None:
+                try:
+                    image_url, generated_image_markdown, _ = await image_task
+                    print(f"[AI] 이미지 생성 완료: {image_url}")
+                except Exception as img_error:
+                    print(f"[AI] 이미지 생성 실패 (초안 생성은 계속 진행): {type(img_error).__name__}: {str(img_error)}")
+                    import traceback
+                    print(traceback.format_exc())
+                    # 이미지 생성 실패 시 빈 값으로 설정 (아래에서 플레이스홀더 삽입)
+                    generated_image_markdown = ""
+            
             # 이미지 생성 요청이 있었는지 확인
             if has_image_request:
                 print(f"[AI] 이미지 생성 요청 상태 확인:")
@@ -1170,6 +1048,7 @@ async def generate_draft(request: DraftRequest) -> DraftResponse:
                     draft_text = '\n'.join(lines)
                     print(f"[AI] 플레이스홀더 이미지를 초안에 삽입했습니다. (위치: {insert_position}번째 줄)")
         except asyncio.TimeoutError:
+            violation_checker.cancel()
             print("[AI] Gemini API 호출 타임아웃 (120초 초과)")
             print(f"[AI] 프롬프트 길이: {len(prompt)}자")
             print(f"[AI] 프롬프트 내용: {prompt[:500]}...")
@@ -1177,28 +1056,271 @@ async def generate_draft(request: DraftRequest) -> DraftResponse:
                 status_code=504,
                 detail="초안 생성 시간이 초과되었습니다 (120초). 프롬프트가 너무 복잡하거나 Gemini API 응답이 지연되고 있습니다. 글쓰기 지시사항을 간단히 하거나 다시 시도해주세요."
             )
+        except BaseException:
+            violation_checker.cancel()
+            raise
         
-        # 의료법 위반 단어 검사
-        violations = await check_medical_violations_with_gemini(draft_text)
+        # 의료법 위반 검사 (생성 중 시작된 검사 결과 + 마지막 문단 검사)
+        violations = await violation_checker.finish()
         
-        return DraftResponse(
+        result = DraftResponse(
             topic=request.topic,
             draft=draft_text,
             word_count=len(draft_text),
-            medical_violations=violations
+            medical_violations=violations,
+            image_job_id=image_job_id,
+            image_placeholder=generated_image_markdown if image_job_id else None
         )
+        yield {"type": "done", "result": result.model_dump()}
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"초안 생성 중 오류가 발생했습니다: {str(e)}"
         )
+    finally:
+        # 프롬프트 구성 중 오류, 텍스트 생성 실패/타임아웃, 클라이언트 연결 종료 등으로
+        # 결과를 기다리지 않게 된 이미지 생성은 취소
+        # (같은 이미지를 기다리는 다른 요청이 없을 때만 실제 생성이 멈추고, 이미 보낸 Imagen 호출은 중단되지 않음)
+        if image_task is not None:
+            if not image_task.done():
+                image_task.cancel()
+            elif not image_task.cancelled():
+                image_task.exception()  # 확인하지 않은 예외 경고 방지
+
+
+def _ndjson_stream(events: AsyncIterator[dict], error_label: str) -> StreamingResponse:
+    """
+    이벤트를 NDJSON(한 줄에 JSON 하나)으로 전송합니다.
+    오류가 나면 마지막 줄에 {"type": "error", "status": HTTP 상태 코드, "detail": 오류 내용}을 보냅니다.
+    """
+    async def event_stream():
+        try:
+            async for event in events:
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        except HTTPException as e:
+            yield json.dumps({"type": "error", "status": e.status_code, "detail": e.detail}, ensure_ascii=False) + "\n"
+        except Exception as e:
+            print(f"[{error_label}] 오류 발생: {str(e)}")
+            yield json.dumps({"type": "error", "status": 500, "detail": f"{error_label} 중 오류가 발생했습니다: {str(e)}"}, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+
+@router.post("/ai/draft", response_model=DraftResponse)
+async def generate_draft(request: DraftRequest, http_request: Request) -> DraftResponse:
+    """
+    Gemini API를 사용한 블로그 초안 생성
+    """
+    result = None
+    async for event in _generate_draft_events(request, image_store.media_base_url(str(http_request.base_url))):
+        if event["type"] == "done":
+            result = event["result"]
+    return DraftResponse(**result)
+
+
+@router.post("/ai/draft/stream")
+async def generate_draft_stream(request: DraftRequest, http_request: Request) -> StreamingResponse:
+    """
+    /ai/draft 의 스트리밍 버전입니다.
+    생성되는 텍스트 조각("chunk")을 바로 전송하고, 마지막 줄에 최종 초안/위반 사항("done") 또는 오류("error")를 보냅니다.
+    """
+    media_base_url = image_store.media_base_url(str(http_request.base_url))
+    return _ndjson_stream(_generate_draft_events(request, media_base_url), "초안 생성")
+
+
+# 진행 중인 Imagen 생성 작업 (캐시 키 -> 작업): 같은 이미지를 동시에 요청하면 한 번만 생성
+_image_generation_tasks: dict[str, asyncio.Task] = {}
+# 생성 작업별로 결과를 기다리는 요청 수 (0이 되면 작업 취소)
+_image_generation_waiters: dict[asyncio.Task, int] = {}
+
+
+def _image_cache_key(model_name: str, image_prompt: str) -> str:
+    """이미지 캐시 키: (모델, 영어 프롬프트, 가로세로 비율, 해상도)"""
+    params = imagen_generation_params(model_name)
+    return make_cache_key("image", model_name, image_prompt, params["aspect_ratio"], params.get("sample_image_size", ""))
+
+
+def _load_cached_image(cache_key: str) -> Optional[dict]:
+    """캐시된 이미지 이름 dict (파일이 하나라도 없으면 None)"""
+    image_names = result_cache.get(cache_key)
+    if image_names and all(image_store.path(name) for name in image_names.values()):
+        return image_names
+    return None
+
+
+async def _generate_imagen_image(model, model_name: str, image_prompt: str) -> Optional[dict]:
+    """
+    Imagen으로 이미지를 생성하고 저장합니다.
+    Returns: 변형 이름(original, thumb, web 등) -> 저장된 이미지 이름 dict (실패 시 None)
+    """
+    # 이미지 생성 (동기 함수)
+    def generate_image_sync():
+        """동기 함수로 이미지 생성"""
+        try:
+            log_to_file(f"[이미지 생성] generate_images 호출 시작: {image_prompt[:50]}...")
+            # 모델별 파라미터 (Imagen 4.0 / Ultra 모델은 2K 해상도 + 프롬프트 향상)
+            generate_params = imagen_generation_params(model_name)
+            log_to_file(f"[이미지 생성] 사용할 파라미터: {list(generate_params.keys())}")
+            result = model.generate_images(prompt=image_prompt, **generate_params)
+            log_to_file(f"[이미지 생성] generate_images 호출 완료")
+            return result
+        except Exception as e:
+            log_to_file(f"[이미지 생성] generate_images 오류: {type(e).__name__}: {str(e)}")
+            import traceback
+            log_to_file(f"[이미지 생성] generate_images 트레이스백: {traceback.format_exc()}")
+            if type(e).__name__ == 'NotFound':
+                # 모델이 더 이상 제공되지 않으면 다음 요청에서 다시 선택
+                imagen_registry.invalidate()
+            return None
+    
+    # 비동기로 실행 (타임아웃: 4분)
+    log_to_file(f"[이미지 생성] 이미지 생성 시작 (타임아웃: 4분)")
+    try:
+        result = await asyncio.wait_for(
+            asyncio.to_thread(generate_image_sync),
+            timeout=240.0  # 4분
+        )
+    except asyncio.TimeoutError:
+        log_to_file("[이미지 생성] 이미지 생성 타임아웃 (4분 초과)")
+        result = None
+    
+    if result:
+        log_to_file(f"[이미지 생성] 결과 타입: {type(result)}")
+        # 결과에서 이미지 추출
+        image = None
+        if hasattr(result, 'images') and len(result.images) > 0:
+            image = result.images[0]
+            log_to_file(f"[이미지 생성] images 속성에서 이미지 추출 성공")
+        elif hasattr(result, '_images') and len(result._images) > 0:
+            image = result._images[0]
+            log_to_file(f"[이미지 생성] _images 속성에서 이미지 추출 성공")
+        
+        if image:
+            image_bytes = None
+            # 방법 1: 이미지 객체에서 직접 바이트 가져오기
+            if hasattr(image, '_image_bytes'):
+                image_bytes = image._image_bytes
+                log_to_file(f"[이미지 생성] _image_bytes 속성에서 바이트 추출")
+            elif hasattr(image, 'image_bytes'):
+                image_bytes = image.image_bytes
+                log_to_file(f"[이미지 생성] image_bytes 속성에서 바이트 추출")
+            elif hasattr(image, 'bytes'):
+                image_bytes = image.bytes
+                log_to_file(f"[이미지 생성] bytes 속성에서 바이트 추출")
+            elif hasattr(image, '_pil_image'):
+                # PIL Image 객체가 있는 경우
+                from io import BytesIO
+                buffer = BytesIO()
+                image._pil_image.save(buffer, format="PNG")
+                image_bytes = buffer.getvalue()
+                log_to_file(f"[이미지 생성] _pil_image에서 바이트 추출")
+            else:
+                # 방법 2: save() 메서드 사용 (format 파라미터 없이)
+                try:
+                    from io import BytesIO
+                    buffer = BytesIO()
+                    image.save(buffer)  # format 파라미터 없이
+                    image_bytes = buffer.getvalue()
+                    log_to_file(f"[이미지 생성] save() 메서드로 바이트 추출 (format 없이)")
+                except Exception as save_error:
+                    log_to_file(f"[이미지 생성] 이미지 저장 실패: {type(save_error).__name__}: {str(save_error)}")
+                    log_to_file(f"[이미지 생성] 이미지 객체 속성: {dir(image)}")
+                    raise save_error
+            
+            if image_bytes:
+                # base64 data URL 대신 로컬 저장소에 저장하고 짧은 URL로 참조
+                image_name = await asyncio.to_thread(image_store.save, image_bytes, "png")
+                log_to_file(f"[이미지 생성] [성공] Vertex AI 성공! (이미지 크기: {len(image_bytes)} bytes, 저장: {image_name})")
+                # 썸네일/WebP 변형 생성
+                image_names = await create_image_variants(image_bytes)
+                image_names["original"] = image_name
+                return image_names
+            else:
+                log_to_file(f"[이미지 생성] 이미지 바이트를 추출하지 못했습니다.")
+        else:
+            log_to_file(f"[이미지 생성] Vertex AI 결과에 images 속성이 없습니다.")
+            log_to_file(f"[이미지 생성] 결과 속성: {dir(result) if hasattr(result, '__dict__') else 'N/A'}")
+            if hasattr(result, '__dict__'):
+                log_to_file(f"[이미지 생성] 결과 내용: {str(result.__dict__)[:500]}")
+    else:
+        log_to_file(f"[이미지 생성] Vertex AI에서 이미지를 생성하지 못했습니다 (결과 없음).")
+    return None
 
 
-async def _generate_image_internal(prompt: str, article_text: str = "", context: str = "") -> tuple[str, str]:
+async def _get_or_generate_imagen_image(model, model_name: str, image_prompt: str, fresh: bool = False) -> Optional[dict]:
+    """
+    같은 (모델, 프롬프트, 비율, 해상도)로 생성한 이미지가 있으면 재사용하고, 없으면 생성합니다.
+    같은 이미지를 생성 중인 요청이 있으면 그 결과를 함께 사용합니다.
+    fresh=True이면 캐시를 무시하고 새 이미지를 생성합니다 (결과는 캐시에 덮어씀).
+    """
+    cache_key = _image_cache_key(model_name, image_prompt)
+    if not fresh:
+        image_names = await asyncio.to_thread(_load_cached_image, cache_key)
+        if image_names:
+            log_to_file(f"[이미지 생성] 캐시된 이미지 사용 (Imagen 호출 생략): {image_names['original']}")
+            return image_names
+        task = _image_generation_tasks.get(cache_key)
+        if task is not None:
+            log_to_file("[이미지 생성] 같은 이미지를 생성 중인 요청이 있어 결과를 함께 사용합니다.")
+            return await _wait_image_generation(cache_key, task)
+
+    async def generate_and_cache() -> Optional[dict]:
+        image_names = await _generate_imagen_image(model, model_name, image_prompt)
+        if image_names:
+            await asyncio.to_thread(result_cache.put, cache_key, image_names)
+        return image_names
+
+    def forget_task(finished: asyncio.Task):
+        if _image_generation_tasks.get(cache_key) is finished:
+            del _image_generation_tasks[cache_key]
+
+    task = asyncio.create_task(generate_and_cache())
+    _image_generation_tasks[cache_key] = task
+    task.add_done_callback(forget_task)
+    return await _wait_image_generation(cache_key, task)
+
+
+async def _wait_image_generation(cache_key: str, task: asyncio.Task) -> Optional[dict]:
+    """
+    공유된 이미지 생성 작업의 결과를 기다립니다.
+    한 요청이 취소되어도 같은 결과를 기다리는 다른 요청이 있으면 생성은 계속되고,
+    마지막으로 기다리던 요청까지 떠나면 생성 작업을 취소합니다.
+    (이미 Vertex AI에 보낸 generate_images 호출은 스레드에서 실행 중이라 중단되지 않지만,
+    아직 호출 전이면 호출하지 않고, 호출 후의 저장/변형 생성도 하지 않습니다.)
+    """
+    _image_generation_waiters[task] = _image_generation_waiters.get(task, 0) + 1
+    try:
+        return await asyncio.shield(task)
+    finally:
+        remaining = _image_generation_waiters[task] - 1
+        if remaining:
+            _image_generation_waiters[task] = remaining
+        else:
+            del _image_generation_waiters[task]
+            if not task.done():
+                # 취소된 작업에 새 요청이 합류하지 않도록 바로 목록에서 제거
+                if _image_generation_tasks.get(cache_key) is task:
+                    del _image_generation_tasks[cache_key]
+                task.cancel()
+                log_to_file("[이미지 생성] 결과를 기다리는 요청이 없어 이미지 생성을 취소합니다.")
+
+
+async def _generate_image_internal(
+    prompt: str,
+    article_text: str = "",
+    context: str = "",
+    fresh: bool = False,
+    media_base_url: Optional[str] = None
+) -> tuple[str, str, dict]:
     """
     이미지 생성 내부 함수 (재사용 가능)
-    Returns: (image_url, markdown) 튜플
+    Returns: (image_url, markdown, 이미지 변형 URL dict) 튜플
+    (변형: original, thumb, web 등 - 이미지를 생성하지 못해 플레이스홀더를 쓴 경우 빈 dict)
+    fresh=True이면 같은 프롬프트로 생성한 이미지가 있어도 새로 생성합니다.
+    media_base_url: 이미지 URL 앞부분 (요청한 서버 주소 기준, image_store.media_base_url)
     """
     log_to_file("=" * 80)
     log_to_file("[이미지 생성 내부 함수] 시작")
@@ -1269,7 +1391,7 @@ async def _generate_image_internal(prompt: str, article_text: str = "", context:
     
     # 이미지 생성 - 여러 방법 시도
     image_url = None
-    import base64
+    image_variants = {}
     
     # 방법 1: Vertex AI를 사용한 실제 이미지 생성 (설정된 경우)
     if settings.gcp_project_id:
@@ -1278,182 +1400,18 @@ async def _generate_image_internal(prompt: str, article_text: str = "", context:
                 log_to_file(f"[이미지 생성] GCP 프로젝트: {settings.gcp_project_id}")
                 log_to_file(f"[이미지 생성] GCP 위치: {settings.gcp_location}")
                 
-                # Vertex AI Python SDK 임포트 시도
-                try:
-                    from vertexai.preview.vision_models import ImageGenerationModel
-                    import vertexai
-                    log_to_file(f"[이미지 생성] Vertex AI SDK 임포트 성공")
-                except ImportError as import_error:
-                    log_to_file(f"[이미지 생성] Vertex AI SDK 임포트 실패: {str(import_error)}")
-                    log_to_file(f"[이미지 생성] pip install google-cloud-aiplatform 실행 필요")
-                    raise
-                
-                # Vertex AI 초기화
-                try:
-                    vertexai.init(project=settings.gcp_project_id, location=settings.gcp_location)
-                    log_to_file(f"[이미지 생성] Vertex AI 초기화 성공")
-                except Exception as init_error:
-                    log_to_file(f"[이미지 생성] Vertex AI 초기화 실패: {type(init_error).__name__}: {str(init_error)}")
-                    log_to_file(f"[이미지 생성] GCP 인증 확인 필요 (gcloud auth application-default login 또는 서비스 계정 키)")
-                    raise
-                
-                # Imagen 모델 초기화 (최신 모델 우선 시도)
-                model = None
-                selected_model_name = None
-                model_names = [
-                    "imagen-4.0-ultra-generate-001",  # 최신 Ultra 모델 (최고 품질)
-                    "imagen-4.0-generate-001",        # 최신 4.0 모델
-                    "imagegeneration@006",            # 이전 모델
-                    "imagen-3.0-generate-001"         # 대체 모델
-                ]
+                # Vertex AI 초기화 및 Imagen 모델 선택 (처음 한 번만, 이후 캐시된 모델 사용)
+                model, selected_model_name = await get_imagen_model(settings.gcp_project_id, settings.gcp_location)
+                log_to_file(f"[이미지 생성] 사용 모델: {selected_model_name}")
                 
-                log_to_file(f"[이미지 생성] Imagen 모델 선택 시작 (우선순위 순서)")
-                for idx, model_name in enumerate(model_names, 1):
-                    try:
-                        log_to_file(f"[이미지 생성] [{idx}/{len(model_names)}] 모델 시도: {model_name}")
-                        model = ImageGenerationModel.from_pretrained(model_name)
-                        selected_model_name = model_name
-                        log_to_file(f"[이미지 생성] [성공] Imagen 모델 초기화 성공: {model_name}")
-                        if 'ultra' in model_name.lower():
-                            log_to_file(f"[이미지 생성] [Ultra 모델] Ultra 모델 사용 중! (최고 품질)")
-                        break
-                    except Exception as model_error:
-                        error_str = str(model_error)
-                        log_to_file(f"[이미지 생성] [실패] 모델 시도 실패 ({model_name}): {type(model_error).__name__}: {error_str[:200]}")
-                        continue
-                
-                if model is None:
-                    raise Exception("사용 가능한 Imagen 모델을 찾을 수 없습니다.")
-                
-                log_to_file(f"[이미지 생성] 최종 선택된 모델: {selected_model_name}")
-                
-                # 이미지 생성 (동기 함수)
-                def generate_image_sync():
-                    """동기 함수로 이미지 생성"""
-                    try:
-                        log_to_file(f"[이미지 생성] generate_images 호출 시작: {image_prompt[:50]}...")
-                        
-                        # 이미지 생성 파라미터 (품질 향상)
-                        generate_params = {
-                            "prompt": image_prompt,
-                            "number_of_images": 1,
-                            "aspect_ratio": "16:9",
-                            "safety_filter_level": "block_some"
-                        }
-                        
-                        # Imagen 4.0 모델인 경우 품질 향상 파라미터 추가 시도
-                        # 모델 이름 확인 (여러 방법 시도)
-                        model_name_str = ""
-                        if hasattr(model, '_model_name'):
-                            model_name_str = str(model._model_name)
-                        elif hasattr(model, 'model_name'):
-                            model_name_str = str(model.model_name)
-                        elif hasattr(model, '__class__'):
-                            model_name_str = str(model.__class__)
-                        
-                        log_to_file(f"[이미지 생성] 모델 정보: {model_name_str}")
-                        
-                        # Imagen 4.0 모델 감지 시 고품질 파라미터 추가
-                        is_ultra = 'ultra' in model_name_str.lower()
-                        is_4_0 = '4.0' in model_name_str
-                        
-                        if is_ultra or is_4_0:
-                            if is_ultra:
-                                log_to_file(f"[이미지 생성] [Ultra 모델] Ultra 모델 감지 - 최고 품질 파라미터 적용")
-                            else:
-                                log_to_file(f"[이미지 생성] 4.0 모델 감지 - 고품질 파라미터 적용")
-                            
-                            try:
-                                generate_params["sample_image_size"] = "2K"  # 고해상도 (2K)
-                                log_to_file(f"[이미지 생성] [성공] 2K 해상도 파라미터 추가")
-                            except Exception as e:
-                                log_to_file(f"[이미지 생성] [경고] sample_image_size 파라미터 추가 실패: {str(e)}")
-                            
-                            try:
-                                generate_params["enhance_prompt"] = True  # 프롬프트 향상 활성화
-                                log_to_file(f"[이미지 생성] [성공] 프롬프트 향상 파라미터 추가")
-                            except Exception as e:
-                                log_to_file(f"[이미지 생성] [경고] enhance_prompt 파라미터 추가 실패: {str(e)}")
-                            
-                            log_to_file(f"[이미지 생성] 고품질 파라미터 적용 완료")
-                        
-                        log_to_file(f"[이미지 생성] 사용할 파라미터: {list(generate_params.keys())}")
-                        result = model.generate_images(**generate_params)
-                        log_to_file(f"[이미지 생성] generate_images 호출 완료")
-                        return result
-                    except Exception as e:
-                        log_to_file(f"[이미지 생성] generate_images 오류: {type(e).__name__}: {str(e)}")
-                        import traceback
-                        log_to_file(f"[이미지 생성] generate_images 트레이스백: {traceback.format_exc()}")
-                        return None
-                
-                # 비동기로 실행 (타임아웃: 4분)
-                log_to_file(f"[이미지 생성] 이미지 생성 시작 (타임아웃: 4분)")
-                try:
-                    result = await asyncio.wait_for(
-                        asyncio.to_thread(generate_image_sync),
-                        timeout=240.0  # 4분
-                    )
-                except asyncio.TimeoutError:
-                    log_to_file("[이미지 생성] 이미지 생성 타임아웃 (4분 초과)")
-                    result = None
-                
-                if result:
-                    log_to_file(f"[이미지 생성] 결과 타입: {type(result)}")
-                    # 결과에서 이미지 추출
-                    image = None
-                    if hasattr(result, 'images') and len(result.images) > 0:
-                        image = result.images[0]
-                        log_to_file(f"[이미지 생성] images 속성에서 이미지 추출 성공")
-                    elif hasattr(result, '_images') and len(result._images) > 0:
-                        image = result._images[0]
-                        log_to_file(f"[이미지 생성] _images 속성에서 이미지 추출 성공")
-                    
-                    if image:
-                        image_bytes = None
-                        # 방법 1: 이미지 객체에서 직접 바이트 가져오기
-                        if hasattr(image, '_image_bytes'):
-                            image_bytes = image._image_bytes
-                            log_to_file(f"[이미지 생성] _image_bytes 속성에서 바이트 추출")
-                        elif hasattr(image, 'image_bytes'):
-                            image_bytes = image.image_bytes
-                            log_to_file(f"[이미지 생성] image_bytes 속성에서 바이트 추출")
-                        elif hasattr(image, 'bytes'):
-                            image_bytes = image.bytes
-                            log_to_file(f"[이미지 생성] bytes 속성에서 바이트 추출")
-                        elif hasattr(image, '_pil_image'):
-                            # PIL Image 객체가 있는 경우
-                            from io import BytesIO
-                            buffer = BytesIO()
-                            image._pil_image.save(buffer, format="PNG")
-                            image_bytes = buffer.getvalue()
-                            log_to_file(f"[이미지 생성] _pil_image에서 바이트 추출")
-                        else:
-                            # 방법 2: save() 메서드 사용 (format 파라미터 없이)
-                            try:
-                                from io import BytesIO
-                                buffer = BytesIO()
-                                image.save(buffer)  # format 파라미터 없이
-                                image_bytes = buffer.getvalue()
-                                log_to_file(f"[이미지 생성] save() 메서드로 바이트 추출 (format 없이)")
-                            except Exception as save_error:
-                                log_to_file(f"[이미지 생성] 이미지 저장 실패: {type(save_error).__name__}: {str(save_error)}")
-                                log_to_file(f"[이미지 생성] 이미지 객체 속성: {dir(image)}")
-                                raise save_error
-                        
-                        if image_bytes:
-                            image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-                            image_url = f"data:image/png;base64,{image_base64}"
-                            log_to_file(f"[이미지 생성] [성공] Vertex AI 성공! (이미지 크기: {len(image_bytes)} bytes)")
-                        else:
-                            log_to_file(f"[이미지 생성] 이미지 바이트를 추출하지 못했습니다.")
-                    else:
-                        log_to_file(f"[이미지 생성] Vertex AI 결과에 images 속성이 없습니다.")
-                        log_to_file(f"[이미지 생성] 결과 속성: {dir(result) if hasattr(result, '__dict__') else 'N/A'}")
-                        if hasattr(result, '__dict__'):
-                            log_to_file(f"[이미지 생성] 결과 내용: {str(result.__dict__)[:500]}")
+                # 같은 프롬프트로 생성한 이미지가 있으면 재사용 (fresh=True이면 새로 생성)
+                image_names = await _get_or_generate_imagen_image(model, selected_model_name, image_prompt, fresh=fresh)
+                if image_names:
+                    image_variants = {variant: image_store.url(name, media_base_url) for variant, name in image_names.items()}
+                    # 본문에는 원본 대신 크기를 줄인 web 변형 사용
+                    image_url = image_variants.get("web", image_variants["original"])
                 else:
-                    log_to_file(f"[이미지 생성] Vertex AI에서 이미지를 생성하지 못했습니다 (결과 없음).")
+                    log_to_file(f"[이미지 생성] Vertex AI에서 이미지를 생성하지 못했습니다.")
                     
             except ImportError as e:
                 log_to_file(f"[이미지 생성] Vertex AI SDK가 설치되지 않았습니다: {str(e)}")
@@ -1593,17 +1551,11 @@ async def _generate_image_internal(prompt: str, article_text: str = "", context:
     markdown = f"![{image_alt}]({image_url})"
     
     log_to_file(f"[이미지 생성] 최종 마크다운 생성: {markdown}")
-    return (image_url, markdown)
-    
-    except Exception as e:
-        log_to_file(f"[이미지 생성] 오류: {str(e)}")
-        import traceback
-        log_to_file(traceback.format_exc())
-        raise
+    return (image_url, markdown, image_variants)
 
 
 @router.post("/ai/image", response_model=ImageResponse)
-async def generate_image(request: ImageRequest) -> ImageResponse:
+async def generate_image(request: ImageRequest, http_request: Request) -> ImageResponse:
     """
     Gemini API를 사용한 이미지 생성 프롬프트 생성 및 이미지 생성
     """
@@ -1615,10 +1567,12 @@ async def generate_image(request: ImageRequest) -> ImageResponse:
     log_to_file(f"[이미지 생성 API] 컨텍스트: {request.context[:100] if request.context else '없음'}...")
     log_to_file("=" * 80 + "\n")
     try:
-        image_url, markdown = await _generate_image_internal(
+        image_url, markdown, image_variants = await _generate_image_internal(
             prompt=request.prompt,
             article_text=request.article_text or "",
-            context=request.context or ""
+            context=request.context or "",
+            fresh=request.fresh,
+            media_base_url=image_store.media_base_url(str(http_request.base_url))
         )
         
         # 프롬프트 추출 (마크다운에서)
@@ -1634,7 +1588,9 @@ async def generate_image(request: ImageRequest) -> ImageResponse:
         return ImageResponse(
             prompt=image_prompt,
             image_url=image_url,
-            preview_url=image_url,
+            preview_url=image_variants.get("thumb", image_url),
+            original_url=image_variants.get("original"),
+            variants=image_variants,
             markdown=markdown
         )
     except Exception as e:
@@ -1647,6 +1603,18 @@ async def generate_image(request: ImageRequest) -> ImageResponse:
         )
 
 
+@router.get("/ai/image/jobs/{job_id}")
+async def get_image_job(job_id: str) -> dict:
+    """
+    백그라운드 이미지 생성 작업 상태 (/ai/draft의 background_image 옵션)
+    status가 "done"이면 result.markdown으로 초안의 image_placeholder를 교체합니다.
+    """
+    job = image_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="이미지 작업을 찾을 수 없습니다 (만료되었거나 서버가 재시작됨).")
+    return job
+
+
 @router.post("/ai/table", response_model=TableResponse)
 async def generate_table(request: TableRequest) -> TableResponse:
     """
@@ -1661,44 +1629,23 @@ async def generate_table(request: TableRequest) -> TableResponse:
             detail="Gemini API key가 설정되지 않았습니다."
         )
     
-    configure_gemini()
-    
     try:
-        # 먼저 사용 가능한 모델 목록 확인
+        # 모델 선택 (캐시된 모델 사용)
         try:
-            available_models = genai.list_models()
-            model_names_found = []
-            for model_info in available_models:
-                if 'generateContent' in model_info.supported_generation_methods:
-                    model_name = model_info.name.replace('models/', '')
-                    model_names_found.append(model_name)
-            
-            # 사용 가능한 모델이 있으면 첫 번째 모델 사용
-            if model_names_found:
-                model_name = model_names_found[0]
-                model = genai.GenerativeModel(model_name)
-            else:
-                raise Exception("사용 가능한 모델이 없습니다.")
-        except Exception as list_error:
-            # 기본 모델 시도 (안정적인 이름만 사용)
-            model_names = [
-                'gemini-1.5-flash',
-                'gemini-1.5-pro',
-                'gemini-pro',
-            ]
-            model = None
-            for model_name in model_names:
-                try:
-                    model = genai.GenerativeModel(model_name)
-                    break
-                except Exception as e:
-                    continue
-            
-            if model is None:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"사용 가능한 Gemini 모델을 찾을 수 없습니다: {str(list_error)}"
-                )
+            model = await get_gemini_model(settings.google_api_key)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"사용 가능한 Gemini 모델을 찾을 수 없습니다: {str(e)}"
+            )
+        
+        # 같은 요청(설명, 표 타입, 글 내용)으로 생성한 표가 있으면 재사용
+        cache_key = make_cache_key("table", model.model_name, request.description, request.table_type, request.context)
+        if not request.refresh:
+            cached = await asyncio.to_thread(result_cache.get, cache_key)
+            if cached is not None:
+                print("[표 생성] 캐시된 결과 사용")
+                return TableResponse(**cached)
         
         # 표 타입별 프롬프트 설정
         table_type_prompts = {
@@ -1735,7 +1682,7 @@ async def generate_table(request: TableRequest) -> TableResponse:
 
 표:"""
         
-        response = model.generate_content(prompt)
+        response = await generate_content(model, prompt)
         table_markdown = response.text.strip()
         
         # 마크다운에서 표 부분만 추출 (표가 여러 개일 경우 첫 번째만)
@@ -1779,11 +1726,21 @@ async def generate_table(request: TableRequest) -> TableResponse:
             html_lines.append('</table>')
             html_table = '\n'.join(html_lines)
         
-        return TableResponse(
+        table_response = TableResponse(
             markdown=table_markdown,
             html=html_table
         )
+        await asyncio.to_thread(result_cache.put, cache_key, table_response.model_dump())
+        return table_response
     
+    except asyncio.TimeoutError:
+        print("[표 생성] Gemini API 호출 타임아웃")
+        raise HTTPException(
+            status_code=504,
+            detail="표 생성 시간이 초과되었습니다. 잠시 후 다시 시도해주세요."
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"[표 생성] 오류: {str(e)}")
         import traceback
@@ -1835,18 +1792,172 @@ async def crawl_blog_urls(request: BlogCrawlRequest) -> BlogCrawlResponse:
 
 
 @router.post("/ai/check-violations")
-async def check_violations(text: str) -> dict:
+async def check_violations(text: str, refresh: bool = False) -> dict:
     """
     텍스트의 의료법 위반 검사 (제미나이 사용)
+    refresh=true이면 캐시된 검사 결과를 무시하고 다시 검사합니다.
     """
-    violations = await check_medical_violations_with_gemini(text)
+    violations = await check_medical_violations_with_gemini(text, refresh=refresh)
     return {
         "text": text,
         "violations": violations,
-        "has_violations": len(violations) > 0
+        "has_violations": len(violations) > 0,
+        # 기본 사전 검사의 일치 위치 (에디터 강조 표시용): word, start, end, category, severity
+        "matches": get_violation_scanner().scan(text)
     }
 
 
+def _dedupe_post_urls(urls: List[str]) -> List[str]:
+    """같은 포스트를 가리키는 URL을 제거합니다 (순서 유지, 네이버 포스트는 blogId/logNo 기준)."""
+    seen = set()
+    unique_urls = []
+    for url in urls:
+        url = url.strip()
+        if not url:
+            continue
+        key = parse_naver_post_id(url) or url
+        if key in seen:
+            continue
+        seen.add(key)
+        unique_urls.append(url)
+    if len(unique_urls) < len(urls):
+        print(f"[학습] 중복 URL {len(urls) - len(unique_urls)}개 제외")
+    return unique_urls
+
+
+async def _learn_writing_style_events(request: LearningDataRequest) -> AsyncIterator[dict]:
+    """
+    블로그 텍스트 학습을 진행하면서 진행 상황 이벤트를 생성합니다.
+    /ai/learn 과 /ai/learn/stream 이 함께 사용합니다.
+
+    이벤트 형식:
+        {"type": "start", "total": 크롤링할 URL 수}
+        {"type": "post", "index": 순번, "total": 전체, "url": URL, "status": "success" | "too_short" | "failed",
+         "char_count": 추출 글자 수, "elapsed": 크롤링 소요 시간(초), "error": 실패 사유(실패 시)}
+        {"type": "done", "result": LearningDataResponse 필드}
+    """
+    extracted_texts = []
+    all_blog_urls = []
+    
+    # 블로그 메인 URL에서 모든 포스트 URL 추출
+    if request.blog_main_url:
+        try:
+            print(f"[학습] 블로그 메인 URL에서 포스트 추출 시작: {request.blog_main_url}")
+            # 148개 글이 있으므로 충분히 큰 페이지 수로 설정 (페이지당 약 10개 가정)
+            post_urls = await extract_blog_post_urls(
+                request.blog_main_url.strip(), 
+                max_pages=200,  # 충분히 큰 페이지 수로 설정
+                cookies=request.cookies
+            )
+            if post_urls and len(post_urls) > 0:
+                all_blog_urls.extend(post_urls)
+                print(f"[학습] {len(post_urls)}개의 포스트 URL 추출 완료")
+            else:
+                print(f"[학습] 포스트 URL을 찾을 수 없습니다. 메인 URL 자체를 크롤링 시도합니다.")
+                # 포스트 URL을 찾지 못하면 메인 URL 자체를 크롤링 시도
+                all_blog_urls.append(request.blog_main_url.strip())
+        except Exception as e:
+            print(f"[학습] 블로그 메인 URL 포스트 추출 실패: {str(e)}")
+            import traceback
+            print(traceback.format_exc())
+            # 실패해도 메인 URL 자체를 크롤링 시도
+            print(f"[학습] 메인 URL 자체를 크롤링 시도합니다.")
+            all_blog_urls.append(request.blog_main_url.strip())
+    
+    # 기존 블로그 URL 목록 추가
+    if request.blog_urls:
+        all_blog_urls.extend(request.blog_urls)
+    
+    # 같은 포스트를 가리키는 URL 제거 (/{id}/{logNo} 와 PostView.naver?logNo= 형식 등)
+    all_blog_urls = _dedupe_post_urls(all_blog_urls)
+    
+    yield {"type": "start", "total": len(all_blog_urls)}
+    
+    # 블로그 URL 크롤링
+    if all_blog_urls:
+        print(f"[학습] 총 {len(all_blog_urls)}개의 URL 크롤링 시작")
+        success_count = 0
+        fail_count = 0
+        
+        for i, url in enumerate(all_blog_urls, 1):
+            if url.strip():
+                started = time.monotonic()
+                event = {"type": "post", "index": i, "total": len(all_blog_urls), "url": url.strip(), "char_count": 0}
+                try:
+                    print(f"[학습] [{i}/{len(all_blog_urls)}] URL 크롤링 시작: {url}")
+                    text = await crawl_blog(url.strip(), cookies=request.cookies, use_cache=not request.refresh_cache)
+                    event["char_count"] = len(text.strip()) if text else 0
+                    if text and len(text.strip()) > 50:
+                        extracted_texts.append(text.strip())
+                        success_count += 1
+                        event["status"] = "success"
+                        print(f"[학습] URL에서 텍스트 추출 성공: {len(text)}자 (성공: {success_count}, 실패: {fail_count})")
+                    else:
+                        fail_count += 1
+                        event["status"] = "too_short"
+                        print(f"[학습] URL에서 추출한 텍스트가 너무 짧음: {len(text) if text else 0}자 (성공: {success_count}, 실패: {fail_count})")
+                except Exception as e:
+                    fail_count += 1
+                    event["status"] = "failed"
+                    event["error"] = str(e)
+                    print(f"[학습] URL 크롤링 실패 ({url}): {str(e)} (성공: {success_count}, 실패: {fail_count})")
+                    # URL 크롤링 실패해도 계속 진행
+                event["elapsed"] = round(time.monotonic() - started, 2)
+                yield event
+                # API 제한 방지를 위해 요청 간 간격
+                if i < len(all_blog_urls):
+                    await asyncio.sleep(0.5)
+        
+        print(f"[학습] 크롤링 완료: 성공 {success_count}개, 실패 {fail_count}개, 총 {len(extracted_texts)}개 텍스트 추출")
+    
+    # 직접 입력한 블로그 텍스트 추가
+    if request.blog_texts:
+        for text in request.blog_texts:
+            if text.strip():
+                extracted_texts.append(text.strip())
+    
+    # 추출된 텍스트를 학습 데이터에 추가 (최소 50자 이상만 저장, 기존 데이터는 다시 쓰지 않음)
+    new_texts = [text.strip() for text in extracted_texts if text.strip() and len(text.strip()) > 50]
+    # 이미 학습된 글 또는 이번에 중복 추출된 글(거의 같은 글 포함)은 저장하지 않음
+    learned_count, duplicate_count = await learning_store.write(add_unique_blog_texts, new_texts)
+    if duplicate_count:
+        print(f"[학습] 중복 텍스트 {duplicate_count}개 제외")
+    
+    # 개인 정보 / 한의원 정보 업데이트
+    if request.personal_info or request.clinic_info:
+        await learning_store.write(
+            learning_store.update_profile,
+            (request.personal_info or "").strip() or None,
+            (request.clinic_info or "").strip() or None
+        )
+    print(f"[학습] 데이터 저장 완료")
+    
+    message_parts = []
+    if request.blog_main_url:
+        message_parts.append(f"블로그 메인 URL에서 {len(all_blog_urls)}개의 포스트 추출")
+    if request.blog_urls:
+        message_parts.append(f"{len(request.blog_urls)}개의 개별 포스트 URL")
+    if request.blog_texts:
+        message_parts.append(f"{len(request.blog_texts)}개의 직접 입력 텍스트 (통으로 학습)")
+    
+    message = f"{', '.join(message_parts)}가 학습되었습니다. (총 {len(extracted_texts)}개 텍스트 추출)"
+    if duplicate_count:
+        message += f" - 이미 학습된 중복 텍스트 {duplicate_count}개는 제외했습니다."
+    
+    # 추출된 텍스트 미리보기 (각각 처음 200자)
+    preview_texts = [text[:200] + "..." if len(text) > 200 else text for text in extracted_texts[:5]]  # 최대 5개만
+    
+    result = LearningDataResponse(
+        success=True,
+        message=message,
+        learned_count=learned_count,
+        extracted_count=len(extracted_texts),
+        preview_texts=preview_texts if preview_texts else None,
+        duplicate_count=duplicate_count
+    )
+    yield {"type": "done", "result": result.model_dump()}
+
+
 @router.post("/ai/learn", response_model=LearningDataResponse)
 async def learn_writing_style(request: LearningDataRequest) -> LearningDataResponse:
     """
@@ -1855,118 +1966,11 @@ async def learn_writing_style(request: LearningDataRequest) -> LearningDataRespo
     블로그 메인 URL을 제공하면 모든 포스트를 자동으로 추출하여 학습합니다.
     """
     try:
-        # 기존 학습 데이터 로드
-        learning_data = load_learning_data()
-        
-        # 새로운 데이터 추가
-        if 'blog_texts' not in learning_data:
-            learning_data['blog_texts'] = []
-        
-        extracted_texts = []
-        all_blog_urls = []
-        
-        # 블로그 메인 URL에서 모든 포스트 URL 추출
-        if request.blog_main_url:
-            try:
-                print(f"[학습] 블로그 메인 URL에서 포스트 추출 시작: {request.blog_main_url}")
-                # 148개 글이 있으므로 충분히 큰 페이지 수로 설정 (페이지당 약 10개 가정)
-                post_urls = await extract_blog_post_urls(
-                    request.blog_main_url.strip(), 
-                    max_pages=200,  # 충분히 큰 페이지 수로 설정
-                    cookies=request.cookies
-                )
-                if post_urls and len(post_urls) > 0:
-                    all_blog_urls.extend(post_urls)
-                    print(f"[학습] {len(post_urls)}개의 포스트 URL 추출 완료")
-                else:
-                    print(f"[학습] 포스트 URL을 찾을 수 없습니다. 메인 URL 자체를 크롤링 시도합니다.")
-                    # 포스트 URL을 찾지 못하면 메인 URL 자체를 크롤링 시도
-                    all_blog_urls.append(request.blog_main_url.strip())
-            except Exception as e:
-                print(f"[학습] 블로그 메인 URL 포스트 추출 실패: {str(e)}")
-                import traceback
-                print(traceback.format_exc())
-                # 실패해도 메인 URL 자체를 크롤링 시도
-                print(f"[학습] 메인 URL 자체를 크롤링 시도합니다.")
-                all_blog_urls.append(request.blog_main_url.strip())
-        
-        # 기존 블로그 URL 목록 추가
-        if request.blog_urls:
-            all_blog_urls.extend(request.blog_urls)
-        
-        # 블로그 URL 크롤링
-        if all_blog_urls:
-            print(f"[학습] 총 {len(all_blog_urls)}개의 URL 크롤링 시작")
-            success_count = 0
-            fail_count = 0
-            
-            for i, url in enumerate(all_blog_urls, 1):
-                if url.strip():
-                    try:
-                        print(f"[학습] [{i}/{len(all_blog_urls)}] URL 크롤링 시작: {url}")
-                        text = await crawl_blog(url.strip(), cookies=request.cookies)
-                        if text and len(text.strip()) > 50:
-                            extracted_texts.append(text.strip())
-                            success_count += 1
-                            print(f"[학습] URL에서 텍스트 추출 성공: {len(text)}자 (성공: {success_count}, 실패: {fail_count})")
-                        else:
-                            fail_count += 1
-                            print(f"[학습] URL에서 추출한 텍스트가 너무 짧음: {len(text) if text else 0}자 (성공: {success_count}, 실패: {fail_count})")
-                        # API 제한 방지를 위해 요청 간 간격
-                        if i < len(all_blog_urls):
-                            await asyncio.sleep(0.5)
-                    except Exception as e:
-                        fail_count += 1
-                        print(f"[학습] URL 크롤링 실패 ({url}): {str(e)} (성공: {success_count}, 실패: {fail_count})")
-                        # URL 크롤링 실패해도 계속 진행
-            
-            print(f"[학습] 크롤링 완료: 성공 {success_count}개, 실패 {fail_count}개, 총 {len(extracted_texts)}개 텍스트 추출")
-        
-        # 직접 입력한 블로그 텍스트 추가
-        if request.blog_texts:
-            for text in request.blog_texts:
-                if text.strip():
-                    extracted_texts.append(text.strip())
-        
-        # 추출된 텍스트를 학습 데이터에 추가
-        for text in extracted_texts:
-            if text.strip() and len(text.strip()) > 50:  # 최소 50자 이상만 저장
-                learning_data['blog_texts'].append(text.strip())
-        
-        # 개인 정보 업데이트
-        if request.personal_info:
-            learning_data['personal_info'] = request.personal_info.strip()
-        
-        # 한의원 정보 업데이트
-        if request.clinic_info:
-            learning_data['clinic_info'] = request.clinic_info.strip()
-        
-        # 업데이트 시간 기록
-        learning_data['updated_at'] = datetime.now().isoformat()
-        
-        # 저장
-        save_learning_data(learning_data)
-        
-        message_parts = []
-        if request.blog_main_url:
-            message_parts.append(f"블로그 메인 URL에서 {len(all_blog_urls)}개의 포스트 추출")
-        if request.blog_urls:
-            message_parts.append(f"{len(request.blog_urls)}개의 개별 포스트 URL")
-        if request.blog_texts:
-            message_parts.append(f"{len(request.blog_texts)}개의 직접 입력 텍스트 (통으로 학습)")
-        
-        message = f"{', '.join(message_parts)}가 학습되었습니다. (총 {len(extracted_texts)}개 텍스트 추출)"
-        
-        # 추출된 텍스트 미리보기 (각각 처음 200자)
-        preview_texts = [text[:200] + "..." if len(text) > 200 else text for text in extracted_texts[:5]]  # 최대 5개만
-        
-        return LearningDataResponse(
-            success=True,
-            message=message,
-            learned_count=len(learning_data['blog_texts']),
-            extracted_count=len(extracted_texts),
-            preview_texts=preview_texts if preview_texts else None
-        )
+        result = None
+        async for event in _learn_writing_style_events(request):
+            if event["type"] == "done":
+                result = event["result"]
+        return LearningDataResponse(**result)
     except Exception as e:
         print(f"[학습] 오류 발생: {str(e)}")
         raise HTTPException(
@@ -1975,12 +1979,41 @@ async def learn_writing_style(request: LearningDataRequest) -> LearningDataRespo
         )
 
 
+@router.post("/ai/learn/compact")
+async def compact_learning_data_endpoint():
+    """
+    이미 저장된 학습 글 중 중복(거의 같은 글 포함)을 정리합니다.
+    중복 중에서는 가장 최근에 학습된 글을 남깁니다.
+    """
+    try:
+        before, after = await learning_store.write(compact_learning_data)
+        return {
+            "success": True,
+            "before_count": before,
+            "after_count": after,
+            "removed_count": before - after,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"학습 데이터 정리 실패: {str(e)}")
+
+
+@router.post("/ai/learn/stream")
+async def learn_writing_style_stream(request: LearningDataRequest) -> StreamingResponse:
+    """
+    /ai/learn 의 스트리밍 버전입니다.
+    포스트 하나를 크롤링할 때마다 진행 상황을 NDJSON(한 줄에 JSON 하나)으로 전송하고,
+    마지막 줄에 학습 결과("done") 또는 오류("error") 이벤트를 보냅니다.
+    """
+    return _ndjson_stream(_learn_writing_style_events(request), "학습")
+
+
 @router.get("/ai/learning-status")
 async def get_learning_status() -> dict:
     """
     현재 학습 상태를 조회합니다.
     """
-    learning_data = load_learning_data()
+    # 스냅샷을 다시 읽어야 하면 디스크 I/O가 생기므로 이벤트 루프 밖에서 실행
+    learning_data = await asyncio.to_thread(load_learning_data)
     blog_texts = learning_data.get('blog_texts', [])
     revision_patterns = learning_data.get('revision_patterns', [])
     style_rules = learning_data.get('style_rules', [])
@@ -2027,10 +2060,10 @@ async def get_learning_status() -> dict:
     }
 
 
-@router.post("/ai/revise", response_model=RevisionResponse)
-async def revise_draft(request: RevisionRequest) -> RevisionResponse:
+async def _revise_draft_events(request: RevisionRequest) -> AsyncIterator[dict]:
     """
-    초안을 퇴고 지시사항에 따라 수정합니다.
+    초안을 퇴고하면서 이벤트를 생성합니다. /ai/revise 와 /ai/revise/stream 이 함께 사용합니다.
+    이벤트 형식은 _generate_draft_events와 같습니다 ("done"의 result는 RevisionResponse 필드).
     """
     # 매번 최신 설정 로드
     settings = get_settings()
@@ -2042,73 +2075,18 @@ async def revise_draft(request: RevisionRequest) -> RevisionResponse:
             detail="Gemini API key가 설정되지 않았습니다. .env 파일에 GOOGLE_API_KEY를 추가해주세요."
         )
     
-    # Gemini API 설정
-    configure_gemini()
-    
     try:
-        # 사용 가능한 모델 목록 확인
+        # 모델 선택 (캐시된 모델 사용)
         try:
-            available_models = genai.list_models()
-            model_names_found = []
-            for model_info in available_models:
-                if 'generateContent' in model_info.supported_generation_methods:
-                    model_name = model_info.name.replace('models/', '')
-                    model_names_found.append(model_name)
-            
-            if model_names_found:
-                model_name = model_names_found[0]
-                model = genai.GenerativeModel(model_name)
-            else:
-                # 기본 모델 시도 (안정적인 이름만 사용)
-                model_names = [
-                    'gemini-1.5-flash',
-                    'gemini-1.5-pro',
-                    'gemini-pro',
-                ]
-                model = None
-                for model_name in model_names:
-                    try:
-                        model = genai.GenerativeModel(model_name)
-                        break
-                    except Exception as e:
-                        continue
-                
-                if model is None:
-                    raise HTTPException(
-                        status_code=500,
-                        detail="사용 가능한 Gemini 모델을 찾을 수 없습니다."
-                    )
+            model = await get_gemini_model(settings.google_api_key)
         except Exception as e:
-            # 기본 모델 시도
-            try:
-                model = genai.GenerativeModel('gemini-1.5-flash')
-            except Exception:
-                try:
-                    model = genai.GenerativeModel('gemini-pro')
-                except Exception as final_error:
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"모델 초기화 실패: {str(final_error)}"
-                    )
-        
-        # 학습 데이터 로드 (퇴고 시에도 학습된 어투 반영)
-        learning_data = load_learning_data()
-        learning_context = ""
-        if learning_data:
-            # 스타일 규칙 반영 (영구적으로 저장된 스타일 규칙)
-            style_rules = learning_data.get('style_rules', [])
-            if style_rules:
-                learning_context += f"\n\n=== [학습된 스타일 규칙 - 반드시 준수해야 함] ===\n"
-                for i, rule in enumerate(style_rules, 1):
-                    learning_context += f"{i}. {rule}\n"
-                learning_context += "\n[중요] 매우 중요: 위의 스타일 규칙을 반드시 준수하여 퇴고하세요. 이 규칙들은 사용자가 이전 퇴고를 통해 영구적으로 설정한 것이므로 절대 위반하지 마세요.\n"
-            
-            if learning_data.get('blog_texts'):
-                learning_context += f"\n\n[학습된 블로그 어투 예시 - 참고용]\n"
-                sample_texts = learning_data['blog_texts'][-3:]
-                for i, text in enumerate(sample_texts, 1):
-                    text_preview = text[:500] + "..." if len(text) > 500 else text
-                    learning_context += f"예시 {i}:\n{text_preview}\n\n"
+            raise HTTPException(
+                status_code=500,
+                detail=f"모델 초기화 실패: {str(e)}"
+            )
+        
+        # 학습 데이터 기반 컨텍스트 (퇴고 시에도 학습된 어투 반영, 학습 데이터가 바뀔 때만 다시 만듦)
+        learning_context = await asyncio.to_thread(get_revision_learning_context)
         
         # 퇴고 프롬프트 구성
         prompt = f"""다음은 블로그 초안입니다. 사용자의 퇴고 지시사항에 따라 수정해주세요.
@@ -2129,11 +2107,21 @@ async def revise_draft(request: RevisionRequest) -> RevisionResponse:
 
 수정된 초안:"""
         
-        response = model.generate_content(prompt)
-        revised_text = response.text
-        
-        # 의료법 위반 검사 (제미나이 사용)
-        violations = await check_medical_violations_with_gemini(revised_text)
+        # 스트리밍으로 받으면서 완성된 문단부터 의료법 위반 검사를 함께 진행
+        violation_checker = StreamingViolationChecker()
+        try:
+            async for chunk in stream_content(model, prompt):
+                new_violations = violation_checker.feed(chunk)
+                yield {"type": "chunk", "text": chunk}
+                if new_violations:
+                    yield {"type": "violation", "words": new_violations}
+        except BaseException:
+            violation_checker.cancel()
+            raise
+        revised_text = violation_checker.text
+        
+        # 의료법 위반 검사 (제미나이 사용, 생성 중 시작된 검사 결과 + 마지막 문단 검사)
+        violations = await violation_checker.finish()
         if violations:
             print(f"[퇴고] 의료법 위반 소지 감지: {violations}")
         else:
@@ -2143,61 +2131,46 @@ async def revise_draft(request: RevisionRequest) -> RevisionResponse:
         learning_saved = False
         if request.save_for_learning:
             try:
-                learning_data = load_learning_data()
-                
-                # revision_patterns 초기화
-                if 'revision_patterns' not in learning_data:
-                    learning_data['revision_patterns'] = []
-                
-                # 퇴고 패턴 저장 (원본, 수정본, 지시사항)
+                # 퇴고 패턴 저장 (원본, 수정본, 지시사항) - 최대 50개까지만 보관
                 revision_pattern = {
                     'original_draft': request.original_draft,
                     'revised_draft': revised_text,
                     'revision_instruction': request.revision_instruction,
                     'created_at': datetime.now().isoformat()
                 }
-                
-                learning_data['revision_patterns'].append(revision_pattern)
-                
-                # 최대 50개까지만 저장 (오래된 것부터 삭제)
-                if len(learning_data['revision_patterns']) > 50:
-                    learning_data['revision_patterns'] = learning_data['revision_patterns'][-50:]
+                pattern_count = await learning_store.write(learning_store.add_revision_pattern, revision_pattern)
                 
                 # 스타일 규칙 추출 및 저장 (퇴고 지시사항에서 스타일 관련 규칙 추출)
                 style_keywords = ['반말', '존댓말', 'ㅋㅋ', '이모티콘', '종성이', '박원장', '스타일', '어투', '톤']
                 if any(keyword in request.revision_instruction for keyword in style_keywords):
-                    # 스타일 규칙 저장
-                    if 'style_rules' not in learning_data:
-                        learning_data['style_rules'] = []
-                    
-                    # 중복 체크 (같은 규칙이 이미 있으면 추가하지 않음)
+                    # 중복 체크 (같은 규칙이 이미 있으면 추가하지 않음), 최대 20개까지만 보관
                     style_rule = request.revision_instruction.strip()
-                    if style_rule not in learning_data['style_rules']:
-                        learning_data['style_rules'].append(style_rule)
-                        # 최대 20개까지만 저장
-                        if len(learning_data['style_rules']) > 20:
-                            learning_data['style_rules'] = learning_data['style_rules'][-20:]
+                    if await learning_store.write(learning_store.add_style_rule, style_rule):
                         print(f"[퇴고 학습] 스타일 규칙 저장: {style_rule[:50]}...")
                 
-                # 업데이트 시간 기록
-                learning_data['updated_at'] = datetime.now().isoformat()
-                
-                # 저장
-                save_learning_data(learning_data)
                 learning_saved = True
-                print(f"[퇴고 학습] 퇴고 패턴 저장 완료 (총 {len(learning_data['revision_patterns'])}개)")
+                print(f"[퇴고 학습] 퇴고 패턴 저장 완료 (총 {pattern_count}개)")
             except Exception as e:
                 print(f"[퇴고 학습] 저장 실패: {str(e)}")
                 import traceback
                 print(traceback.format_exc())
         
-        return RevisionResponse(
+        result = RevisionResponse(
             revised_draft=revised_text,
             word_count=len(revised_text),
             learning_saved=learning_saved,
             medical_violations=violations
         )
+        yield {"type": "done", "result": result.model_dump()}
     
+    except asyncio.TimeoutError:
+        print("[퇴고] Gemini API 호출 타임아웃")
+        raise HTTPException(
+            status_code=504,
+            detail="퇴고 시간이 초과되었습니다. 잠시 후 다시 시도해주세요."
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"[퇴고] 오류 발생: {str(e)}")
         import traceback
@@ -2207,3 +2180,23 @@ async def revise_draft(request: RevisionRequest) -> RevisionResponse:
             detail=f"퇴고 중 오류가 발생했습니다: {str(e)}"
         )
 
+
+@router.post("/ai/revise", response_model=RevisionResponse)
+async def revise_draft(request: RevisionRequest) -> RevisionResponse:
+    """
+    초안을 퇴고 지시사항에 따라 수정합니다.
+    """
+    result = None
+    async for event in _revise_draft_events(request):
+        if event["type"] == "done":
+            result = event["result"]
+    return RevisionResponse(**result)
+
+
+@router.post("/ai/revise/stream")
+async def revise_draft_stream(request: RevisionRequest) -> StreamingResponse:
+    """
+    /ai/revise 의 스트리밍 버전입니다 (이벤트 형식은 /ai/draft/stream 과 같음).
+    """
+    return _ndjson_stream(_revise_draft_events(request), "퇴고")
+
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from app.core.image_store import image_store, media_type
+
+router = APIRouter()
+
+# 이름이 내용 해시이므로 같은 URL의 내용은 바뀌지 않음 -> 1년간 캐시
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/media/{name}")
+async def get_media(name: str, request: Request):
+    """
+    생성된 이미지를 반환합니다 (app.core.image_store).
+    """
+    path = image_store.path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="이미지를 찾을 수 없습니다.")
+
+    etag = f'"{name}"'
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type(name), headers=headers)
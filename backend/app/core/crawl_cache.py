@@ -0,0 +1,182 @@
+"""
+크롤링 결과 디스크 캐시 (내용 주소 기반)
+
+같은 포스트를 다시 크롤링할 때 네트워크/파싱 비용을 줄이기 위한 캐시입니다.
+(예: 중간에 실패한 /ai/learn 작업을 다시 실행하는 경우)
+
+저장 구조 (CRAWL_CACHE_DIR, 기본값: 프로젝트 루트/crawl_cache):
+    entries/{sha256(정규화된 URL [+ 쿠키 해시])}.json  - URL, ETag, Last-Modified, HTML 해시, 텍스트 해시, 시간 정보
+    blobs/{sha256(추출 텍스트)}.txt      - 추출된 본문 텍스트 (같은 내용은 한 번만 저장)
+
+- TTL(CRAWL_CACHE_TTL, 초) 이내의 항목은 네트워크 요청 없이 바로 사용합니다.
+- TTL이 지난 항목은 ETag/Last-Modified로 조건부 요청을 보내 재검증합니다 (304면 재사용).
+- 200 응답이라도 HTML 해시가 같으면 파싱을 건너뛰고 캐시된 텍스트를 사용합니다.
+- 로그인 쿠키로 가져온 결과는 쿠키별로 따로 저장합니다 (비공개 글이 쿠키 없는 요청에 쓰이지 않도록).
+- 전체 텍스트 크기는 메모리에서 저장할 때마다 더해 두고(처음 한 번만 디스크에서 계산),
+  CRAWL_CACHE_MAX_MB를 넘을 때만 가장 오래 사용하지 않은 항목부터 상한의 80%까지 삭제합니다.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+# backend/app/core/crawl_cache.py -> backend/app/core -> backend/app -> backend -> 프로젝트 루트
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent.parent.parent / "crawl_cache"
+CRAWL_CACHE_DIR = Path(os.getenv("CRAWL_CACHE_DIR", str(DEFAULT_CACHE_DIR)))
+CRAWL_CACHE_TTL = int(os.getenv("CRAWL_CACHE_TTL", str(24 * 60 * 60)))  # 기본 1일
+CRAWL_CACHE_MAX_BYTES = int(float(os.getenv("CRAWL_CACHE_MAX_MB", "200")) * 1024 * 1024)
+
+
+def content_hash(text: str) -> str:
+    """텍스트의 SHA-256 해시"""
+    return hashlib.sha256(text.encode('utf-8', errors='replace')).hexdigest()
+
+
+class CrawlCache:
+    def __init__(self, cache_dir: Path = CRAWL_CACHE_DIR, ttl: int = CRAWL_CACHE_TTL, max_bytes: int = CRAWL_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.entries_dir = cache_dir / "entries"
+        self.blobs_dir = cache_dir / "blobs"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._approx_bytes: Optional[int] = None  # 블롭 전체 크기 추정치 (처음 저장할 때 계산)
+
+    def _entry_path(self, url: str, cookies: Optional[str] = None) -> Path:
+        # 쿠키로 가져온 결과(비공개 글 포함 가능)는 쿠키가 같은 요청만 사용
+        key = f"{url}\n{content_hash(cookies)}" if cookies else url
+        return self.entries_dir / f"{content_hash(key)}.json"
+
+    def _blob_path(self, text_hash: str) -> Path:
+        return self.blobs_dir / f"{text_hash}.txt"
+
+    def _write_text(self, path: Path, text: str):
+        # 임시 파일에 쓴 뒤 교체 (중간에 중단되어도 깨진 항목이 남지 않도록)
+        # 같은 항목을 동시에 쓰는 경우에도 서로의 임시 파일을 건드리지 않도록 프로세스/스레드별 이름 사용
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _write_json(self, path: Path, data: dict):
+        self._write_text(path, json.dumps(data, ensure_ascii=False))
+
+    def get(self, url: str, cookies: Optional[str] = None) -> Optional[dict]:
+        """
+        캐시 항목을 조회합니다 (cookies: 크롤링에 사용하는 로그인 쿠키, 없으면 비로그인 결과).
+
+        Returns:
+            항목 dict ('text', 'fresh', 'etag', 'last_modified', 'html_hash' 포함) 또는 None
+        """
+        entry_path = self._entry_path(url, cookies)
+        if not entry_path.exists():
+            return None
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            text = self._blob_path(entry['text_hash']).read_text(encoding='utf-8')
+        except Exception as e:
+            print(f"[크롤링 캐시] 항목 읽기 실패, 무시합니다 ({url}): {str(e)}")
+            return None
+        entry['text'] = text
+        entry['fresh'] = (time.time() - entry.get('validated_at', 0)) < self.ttl
+        return entry
+
+    def put(self, url: str, text: str, html_hash: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None, cookies: Optional[str] = None):
+        """추출된 텍스트와 재검증 정보를 저장합니다."""
+        try:
+            self.entries_dir.mkdir(parents=True, exist_ok=True)
+            self.blobs_dir.mkdir(parents=True, exist_ok=True)
+            text_hash = content_hash(text)
+            blob_path = self._blob_path(text_hash)
+            added_bytes = 0
+            if not blob_path.exists():
+                self._write_text(blob_path, text)
+                added_bytes = len(text.encode('utf-8'))
+            now = time.time()
+            self._write_json(self._entry_path(url, cookies), {
+                'url': url,
+                'auth': bool(cookies),
+                'text_hash': text_hash,
+                'html_hash': html_hash,
+                'etag': etag,
+                'last_modified': last_modified,
+                'size': len(text.encode('utf-8')),
+                'fetched_at': now,
+                'validated_at': now,
+            })
+
+            with self._lock:
+                if self._approx_bytes is None:
+                    self._approx_bytes = sum(p.stat().st_size for p in self.blobs_dir.glob("*.txt"))
+                else:
+                    self._approx_bytes += added_bytes
+                over_limit = self._approx_bytes > self.max_bytes
+            if over_limit:
+                self._enforce_size_limit()
+        except Exception as e:
+            # 캐시 저장 실패는 크롤링 결과에 영향을 주지 않음
+            print(f"[크롤링 캐시] 저장 실패 ({url}): {str(e)}")
+
+    def touch(self, url: str, cookies: Optional[str] = None):
+        """재검증에 성공한 항목의 검증 시간을 갱신합니다 (304 또는 HTML 해시 일치)."""
+        entry_path = self._entry_path(url, cookies)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            entry['validated_at'] = time.time()
+            self._write_json(entry_path, entry)
+        except Exception as e:
+            print(f"[크롤링 캐시] 갱신 실패 ({url}): {str(e)}")
+
+    def _enforce_size_limit(self):
+        """전체 텍스트 크기가 상한을 넘으면 오래된 항목부터 상한의 80%까지 삭제합니다."""
+        entries = []
+        for entry_path in self.entries_dir.glob("*.json"):
+            try:
+                with open(entry_path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                entries.append((entry.get('validated_at', 0), entry_path, entry))
+            except Exception:
+                entry_path.unlink(missing_ok=True)
+
+        # 같은 텍스트를 여러 URL이 공유할 수 있으므로 블롭 단위로 크기 계산
+        blob_sizes = {}
+        for _, _, entry in entries:
+            blob_sizes[entry['text_hash']] = entry.get('size', 0)
+        total = sum(blob_sizes.values())
+        if total <= self.max_bytes:
+            with self._lock:
+                self._approx_bytes = total
+            return
+
+        entries.sort(key=lambda item: item[0])
+        remaining_refs = {}
+        for _, _, entry in entries:
+            remaining_refs[entry['text_hash']] = remaining_refs.get(entry['text_hash'], 0) + 1
+
+        removed = 0
+        target = self.max_bytes * 0.8
+        for _, entry_path, entry in entries:
+            if total <= target:
+                break
+            entry_path.unlink(missing_ok=True)
+            removed += 1
+            text_hash = entry['text_hash']
+            remaining_refs[text_hash] -= 1
+            if remaining_refs[text_hash] == 0:
+                self._blob_path(text_hash).unlink(missing_ok=True)
+                total -= blob_sizes[text_hash]
+        with self._lock:
+            self._approx_bytes = total
+        print(f"[크롤링 캐시] 크기 제한 초과 - {removed}개 항목 삭제 (현재 {total / 1024 / 1024:.1f}MB)")
+
+
+crawl_cache = CrawlCache()
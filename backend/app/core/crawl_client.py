@@ -0,0 +1,97 @@
+"""
+블로그 크롤링용 공유 HTTP 클라이언트 및 네이버 포스트 URL 정규화
+
+- 모든 크롤링 요청은 하나의 httpx.AsyncClient를 재사용합니다 (연결 풀 재사용).
+  쿠키는 요청 헤더로만 전달하며, 응답 쿠키는 저장하지 않습니다 (사용자 간 쿠키 섞임 방지).
+- 네이버 포스트 URL은 본문이 바로 들어있는 PostView 주소로 변환한 뒤 요청합니다.
+  (blog.naver.com/{id}/{logNo} 바깥 페이지 -> mainFrame iframe 두 번 요청하던 것을 한 번으로)
+- NAVER_CRAWL_MOBILE=true 이면 더 가벼운 모바일 페이지(m.blog.naver.com)를 사용합니다.
+"""
+import os
+import re
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+NAVER_CRAWL_MOBILE = os.getenv("NAVER_CRAWL_MOBILE", "false").strip().lower() in ("1", "true", "yes")
+
+# User-Agent 설정 (봇 차단 방지)
+CRAWL_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Referer': 'https://blog.naver.com/'
+}
+
+_crawl_client: Optional[httpx.AsyncClient] = None
+
+
+def build_crawl_headers(cookies: Optional[str] = None) -> dict:
+    """크롤링 요청 헤더를 만듭니다 (네이버 로그인 쿠키는 비공개 글 접근용, 선택사항)."""
+    headers = dict(CRAWL_HEADERS)
+    if cookies:
+        headers['Cookie'] = cookies
+    return headers
+
+
+def get_crawl_client() -> httpx.AsyncClient:
+    """크롤링용 공유 클라이언트를 반환합니다 (처음 호출 시 생성)."""
+    global _crawl_client
+    if _crawl_client is None or _crawl_client.is_closed:
+        # 모든 도메인의 쿠키 저장을 거부하는 쿠키 저장소
+        cookie_jar = CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+        _crawl_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(15.0),
+            follow_redirects=True,
+            cookies=cookie_jar,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        )
+    return _crawl_client
+
+
+async def close_crawl_client():
+    """앱 종료 시 공유 클라이언트를 닫습니다."""
+    global _crawl_client
+    if _crawl_client is not None:
+        await _crawl_client.aclose()
+        _crawl_client = None
+
+
+def parse_naver_post_id(url: str) -> Optional[Tuple[str, str]]:
+    """
+    네이버 블로그 포스트 URL에서 (blogId, logNo)를 추출합니다.
+    지원 형식: /{id}/{logNo}, PostView.naver?blogId=&logNo= (.nhn 포함), 모바일(m.blog.naver.com)
+    포스트 URL이 아니면 None을 반환합니다.
+    """
+    parsed = urlparse(url.strip())
+    if not parsed.netloc.endswith('blog.naver.com'):
+        return None
+
+    if 'PostView' in parsed.path:
+        query = parse_qs(parsed.query)
+        blog_id = query.get('blogId', [None])[0]
+        log_no = query.get('logNo', [None])[0]
+        if blog_id and log_no and log_no.isdigit():
+            return blog_id, log_no
+        return None
+
+    match = re.match(r'^/([^/?]+)/(\d+)/?$', parsed.path)
+    if match:
+        return match.group(1), match.group(2)
+    return None
+
+
+def normalize_naver_post_url(url: str, mobile: Optional[bool] = None) -> str:
+    """
+    네이버 포스트 URL을 PostView 주소로 변환합니다. 네이버 포스트가 아니면 그대로 반환합니다.
+    예: https://blog.naver.com/abc/223 -> https://blog.naver.com/PostView.naver?blogId=abc&logNo=223
+    """
+    post_id = parse_naver_post_id(url)
+    if not post_id:
+        return url
+    blog_id, log_no = post_id
+    use_mobile = NAVER_CRAWL_MOBILE if mobile is None else mobile
+    host = 'm.blog.naver.com' if use_mobile else 'blog.naver.com'
+    return f'https://{host}/PostView.naver?blogId={blog_id}&logNo={log_no}'
@@ -0,0 +1,195 @@
+"""
+학습된 블로그 글 중복 제거 (SimHash)
+
+같은 포스트를 여러 번 학습하면(재동기화, /{id}/{logNo}와 PostView.naver?logNo= 두 가지 URL 형식 등)
+같은 글이 여러 번 저장되어 프롬프트 예시와 검색 인덱스가 낭비됩니다.
+- 글마다 64비트 SimHash(공백 정규화 후 글자 3-gram)를 계산하고,
+  해밍 거리가 SIMHASH_MAX_DISTANCE 이하이면 같은 글(거의 같은 글)로 봅니다.
+- 64비트를 8비트씩 8구간으로 나눈 버킷으로 후보만 비교합니다 (거리 7 이하면 최소 한 구간은 일치하므로
+  SIMHASH_MAX_DISTANCE는 0~7까지 허용, 기본값 3).
+- 기존 학습 글의 SimHash는 글 내용 해시별로 기억해 두고, 새로 추가된 글만 계산합니다.
+- 학습 시(ingest)에는 새 글을 기존 글/같은 요청의 글과 비교해 중복을 건너뜁니다
+  (add_unique_blog_texts, 저장과 같은 쓰기 구간에서 실행되어 동시에 학습해도 중복이 저장되지 않음).
+- 이미 저장된 중복은 한 번에 정리할 수 있습니다:
+    cd backend && python -m app.core.dedup
+  또는 POST /api/ai/learn/compact
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from app.core.learning_store import learning_store
+
+_BANDS = 8
+_BAND_BITS = 64 // _BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+SIMHASH_MAX_DISTANCE = int(os.getenv("SIMHASH_MAX_DISTANCE", "3"))
+# 버킷 검색은 거리가 구간 수 - 1 이하일 때만 항상 후보를 찾을 수 있음
+if not 0 <= SIMHASH_MAX_DISTANCE <= _BANDS - 1:
+    print(f"[중복 제거] SIMHASH_MAX_DISTANCE={SIMHASH_MAX_DISTANCE}는 지원하지 않습니다 (0~{_BANDS - 1}) - {_BANDS - 1}을 사용합니다.")
+    SIMHASH_MAX_DISTANCE = _BANDS - 1
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def simhash(text: str) -> int:
+    """글의 64비트 SimHash를 계산합니다."""
+    normalized = _WHITESPACE_PATTERN.sub(' ', text).strip().lower()
+    if len(normalized) < 3:
+        shingles = Counter([normalized])
+    else:
+        shingles = Counter(normalized[i:i + 3] for i in range(len(normalized) - 2))
+
+    vector = [0] * 64
+    for shingle, weight in shingles.items():
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            if value >> bit & 1:
+                vector[bit] += weight
+            else:
+                vector[bit] -= weight
+
+    signature = 0
+    for bit in range(64):
+        if vector[bit] > 0:
+            signature |= 1 << bit
+    return signature
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class NearDuplicateIndex:
+    """SimHash 버킷 색인 (추가한 글 번호를 기억하고 거의 같은 글을 찾음)"""
+
+    def __init__(self, max_distance: int = SIMHASH_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.signatures: List[int] = []
+        self._buckets: Dict[Tuple[int, int], List[int]] = {}
+
+    def _bands(self, signature: int):
+        for band in range(_BANDS):
+            yield band, (signature >> (band * _BAND_BITS)) & _BAND_MASK
+
+    def find(self, signature: int) -> Optional[int]:
+        """거의 같은 글의 번호를 반환합니다 (없으면 None)."""
+        for key in self._bands(signature):
+            for doc_id in self._buckets.get(key, ()):
+                if hamming_distance(signature, self.signatures[doc_id]) <= self.max_distance:
+                    return doc_id
+        return None
+
+    def add(self, signature: int) -> int:
+        doc_id = len(self.signatures)
+        self.signatures.append(signature)
+        for key in self._bands(signature):
+            self._buckets.setdefault(key, []).append(doc_id)
+        return doc_id
+
+
+_index: Optional[NearDuplicateIndex] = None
+_index_keys: List[str] = []
+_index_version = -1
+_signatures: Dict[str, int] = {}  # 글 내용 해시 -> SimHash
+_index_lock = threading.Lock()
+
+
+def _text_key(text: str) -> str:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _get_corpus_index() -> NearDuplicateIndex:
+    """
+    현재 학습 글의 중복 색인
+    학습 데이터 버전이 바뀌어도 학습 글이 그대로이면(퇴고 패턴/규칙 저장 등) 기존 색인을 사용하고,
+    글이 추가/삭제되었으면 기억해 둔 SimHash로 색인을 다시 만듭니다 (새 글만 SimHash 계산).
+    """
+    global _index, _index_keys, _index_version, _signatures
+    learning_data, version = learning_store.versioned_snapshot()
+    with _index_lock:
+        if _index is not None and _index_version == version:
+            return _index
+        texts = learning_data.get('blog_texts', [])
+        keys = [_text_key(text) for text in texts]
+        if _index is None or keys != _index_keys:
+            signatures = {}
+            index = NearDuplicateIndex()
+            for key, text in zip(keys, texts):
+                signature = _signatures.get(key)
+                if signature is None:
+                    signature = simhash(text)
+                signatures[key] = signature
+                index.add(signature)
+            # 삭제된 글의 SimHash는 버림
+            _index, _index_keys, _signatures = index, keys, signatures
+        _index_version = version
+        return _index
+
+
+def filter_near_duplicates(texts: List[str]) -> Tuple[List[str], int]:
+    """
+    기존 학습 글 및 서로 간에 거의 같은 글을 제외합니다.
+
+    Returns:
+        (새로 저장할 글 목록, 건너뛴 중복 수)
+    """
+    corpus_index = _get_corpus_index()
+    batch_index = NearDuplicateIndex()
+    unique_texts = []
+    for text in texts:
+        signature = simhash(text)
+        if corpus_index.find(signature) is not None or batch_index.find(signature) is not None:
+            continue
+        batch_index.add(signature)
+        unique_texts.append(text)
+    with _index_lock:
+        # 저장되면 다음 색인 갱신 때 다시 계산하지 않도록 기억해 둠 (저장되지 않으면 갱신 때 버려짐)
+        _signatures.update((_text_key(text), simhash_value) for text, simhash_value in zip(unique_texts, batch_index.signatures))
+    return unique_texts, len(texts) - len(unique_texts)
+
+
+def add_unique_blog_texts(texts: List[str]) -> Tuple[int, int]:
+    """
+    중복을 제외하고 학습 글을 저장합니다.
+    learning_store.write 안에서 실행해야 합니다 (중복 확인과 저장 사이에 다른 학습 요청의 저장이 끼어들지 않도록).
+    예: await learning_store.write(add_unique_blog_texts, texts)
+
+    Returns:
+        (저장 후 전체 학습 글 수, 건너뛴 중복 수)
+    """
+    unique_texts, duplicate_count = filter_near_duplicates(texts)
+    if not unique_texts:
+        # 모두 중복이면 저장하지 않음 (스냅샷/색인도 그대로 유지)
+        return len(learning_store.snapshot().get('blog_texts', [])), duplicate_count
+    return learning_store.add_blog_texts(unique_texts), duplicate_count
+
+
+def select_unique_indices(texts: List[str]) -> List[int]:
+    """
+    중복을 제외하고 남길 글 번호를 반환합니다 (원래 순서 유지).
+    중복 중에서는 가장 최근에 학습된(뒤쪽) 글을 남깁니다.
+    """
+    index = NearDuplicateIndex()
+    keep = []
+    for doc_id in range(len(texts) - 1, -1, -1):
+        signature = simhash(texts[doc_id])
+        if index.find(signature) is None:
+            index.add(signature)
+            keep.append(doc_id)
+    keep.reverse()
+    return keep
+
+
+def compact_learning_data() -> Tuple[int, int]:
+    """저장된 학습 글의 중복을 정리합니다. (정리 전 글 수, 정리 후 글 수)를 반환합니다."""
+    before, after = learning_store.compact_blog_texts(select_unique_indices)
+    print(f"[중복 제거] 학습 글 정리 완료: {before}개 -> {after}개 ({before - after}개 삭제)")
+    return before, after
+
+
+if __name__ == "__main__":
+    compact_learning_data()
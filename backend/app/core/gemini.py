@@ -0,0 +1,285 @@
+"""
+Gemini 모델 선택 및 인스턴스 캐시
+
+기존에는 AI 요청마다 genai.list_models()(전체 모델 목록 조회, 네트워크 왕복)를 호출한 뒤 모델을 만들었습니다.
+- API 키별로 사용할 모델 이름을 한 번만 결정하고 GenerativeModel 인스턴스를 재사용합니다.
+- 결정 결과는 GEMINI_MODEL_TTL(초)이 지나면 오래된 것으로 보고,
+  다음 요청은 기존 모델을 그대로 쓰면서 백그라운드 스레드에서 모델 목록을 다시 조회합니다.
+- GEMINI_MODEL을 지정하면 목록 조회 없이 해당 모델을 사용합니다.
+
+Gemini SDK 호출은 모두 동기(블로킹) 함수이므로, AI 엔드포인트는 generate_content()를 통해 호출합니다.
+- 전용 스레드 풀(GEMINI_MAX_CONCURRENCY개)에서 실행하여 이벤트 루프를 막지 않습니다.
+- 동시에 진행 중인 Gemini 호출 수를 GEMINI_MAX_CONCURRENCY로 제한합니다 (나머지는 대기).
+  호출 자리는 스레드의 SDK 호출이 실제로 끝날 때 반환하므로,
+  타임아웃/연결 종료로 기다리지 않게 된 호출이 스레드 풀을 채워 다른 호출이 멈추는 일이 없습니다.
+- 호출마다 타임아웃을 적용합니다 (기본 GEMINI_TIMEOUT초, 초과 시 asyncio.TimeoutError).
+- stream_content()는 stream=True 응답을 조각 단위로 전달합니다 (생성이 끝나기 전에 후처리 시작 가능).
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+from app.core.config import get_settings
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "").strip()
+GEMINI_MODEL_TTL = int(os.getenv("GEMINI_MODEL_TTL", str(6 * 60 * 60)))  # 기본 6시간
+
+GEMINI_MAX_CONCURRENCY = max(1, int(os.getenv("GEMINI_MAX_CONCURRENCY", "4")))
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "120"))
+
+# 모델 목록 조회 실패 시 사용할 기본 모델 (안정적인 이름만 사용)
+FALLBACK_MODEL_NAMES = [
+    'gemini-1.5-flash',
+    'gemini-1.5-pro',
+    'gemini-pro',
+]
+
+
+class GeminiModelRegistry:
+    """API 키별 모델 이름 / GenerativeModel 인스턴스 캐시"""
+
+    def __init__(self, ttl: int = GEMINI_MODEL_TTL):
+        self.ttl = ttl
+        self._resolved: Dict[str, Tuple[str, float]] = {}  # API 키 -> (모델 이름, 결정 시각)
+        self._models: Dict[Tuple[str, str], genai.GenerativeModel] = {}
+        self._configured_key: Optional[str] = None
+        self._lock = threading.Lock()
+        self._resolve_lock = threading.Lock()
+        self._refreshing = set()
+
+    def configure(self, api_key: str):
+        """API 키를 설정합니다."""
+        # genai.configure는 전역 설정이므로 키가 바뀔 때만 다시 호출
+        if self._configured_key != api_key:
+            genai.configure(api_key=api_key)
+            self._configured_key = api_key
+
+    def _list_model_name(self) -> str:
+        """모델 목록에서 generateContent를 지원하는 첫 번째 모델을 고릅니다 (네트워크 호출)."""
+        if GEMINI_MODEL:
+            return GEMINI_MODEL
+        try:
+            for model_info in genai.list_models():
+                if 'generateContent' in model_info.supported_generation_methods:
+                    return model_info.name.replace('models/', '')
+            print("[Gemini] 사용 가능한 모델이 없어 기본 모델을 사용합니다.")
+        except Exception as e:
+            print(f"[Gemini] 모델 목록 조회 실패, 기본 모델 사용: {str(e)}")
+        return FALLBACK_MODEL_NAMES[0]
+
+    def _refresh_in_background(self, api_key: str):
+        def refresh():
+            try:
+                with self._lock:
+                    self.configure(api_key)
+                model_name = self._list_model_name()
+                with self._lock:
+                    self._resolved[api_key] = (model_name, time.time())
+                print(f"[Gemini] 모델 다시 확인 완료: {model_name}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(api_key)
+
+        with self._lock:
+            if api_key in self._refreshing:
+                return
+            self._refreshing.add(api_key)
+        threading.Thread(target=refresh, name="gemini-model-refresh", daemon=True).start()
+
+    def resolve_model_name(self, api_key: str) -> str:
+        """사용할 모델 이름을 반환합니다. 처음 한 번만 모델 목록을 조회합니다 (블로킹 - 스레드에서 호출)."""
+        with self._lock:
+            self.configure(api_key)
+            resolved = self._resolved.get(api_key)
+        if resolved:
+            model_name, resolved_at = resolved
+            if time.time() - resolved_at > self.ttl:
+                self._refresh_in_background(api_key)
+            return model_name
+
+        # 동시에 들어온 첫 요청들은 한 번의 모델 목록 조회 결과를 함께 사용
+        with self._resolve_lock:
+            resolved = self._resolved.get(api_key)
+            if resolved:
+                return resolved[0]
+            model_name = self._list_model_name()
+            with self._lock:
+                self._resolved[api_key] = (model_name, time.time())
+        print(f"[Gemini] 선택된 모델: {model_name}")
+        return model_name
+
+    def get_model(self, api_key: str) -> genai.GenerativeModel:
+        """캐시된 GenerativeModel 인스턴스를 반환합니다 (블로킹 - 스레드에서 호출)."""
+        model_name = self.resolve_model_name(api_key)
+        with self._lock:
+            model = self._models.get((api_key, model_name))
+            if model is None:
+                model = genai.GenerativeModel(model_name)
+                self._models[(api_key, model_name)] = model
+            return model
+
+    def invalidate(self, api_key: Optional[str] = None):
+        """모델 선택 결과를 지웁니다 (모델을 찾을 수 없다는 오류 등 - 다음 요청에서 모델 목록을 다시 조회)."""
+        with self._lock:
+            if api_key is None:
+                self._resolved.clear()
+                self._models.clear()
+            else:
+                self._resolved.pop(api_key, None)
+                self._models = {key: model for key, model in self._models.items() if key[0] != api_key}
+
+
+model_registry = GeminiModelRegistry()
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        # 모델 조회용 여유 스레드 1개 포함
+        _executor = ThreadPoolExecutor(max_workers=GEMINI_MAX_CONCURRENCY + 1, thread_name_prefix="gemini")
+    return _executor
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+    return _semaphore
+
+
+async def _submit(func: Callable[[], Any]) -> asyncio.Future:
+    """
+    동시 실행 자리를 얻은 뒤 func를 전용 스레드 풀에서 시작합니다.
+    자리는 기다리는 쪽이 중단되어도 func가 실제로 끝날 때 반환합니다.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _get_semaphore()
+    await semaphore.acquire()
+    try:
+        future = loop.run_in_executor(_get_executor(), func)
+    except BaseException:
+        semaphore.release()
+        raise
+
+    def on_done(finished: asyncio.Future):
+        semaphore.release()
+        if not finished.cancelled():
+            finished.exception()  # 기다리지 않게 된 호출의 예외 경고 방지
+
+    future.add_done_callback(on_done)
+    return future
+
+
+def _invalidate_on_model_error(error: BaseException):
+    """모델이 없어졌거나 권한이 없다는 오류면 모델 선택 결과를 지웁니다 (TTL을 기다리지 않고 다시 선택)."""
+    if isinstance(error, (google_exceptions.NotFound, google_exceptions.PermissionDenied)):
+        print(f"[Gemini] 모델 오류로 모델을 다시 선택합니다: {type(error).__name__}: {str(error)}")
+        model_registry.invalidate()
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, timeout: Optional[float] = GEMINI_TIMEOUT, **kwargs: Any) -> Any:
+    """
+    블로킹 Gemini SDK 함수를 전용 스레드 풀에서 실행합니다 (동시 실행 수 제한 + 타임아웃).
+    타임아웃이 지나면 asyncio.TimeoutError가 발생합니다 (스레드의 SDK 호출은 자체 타임아웃으로 종료).
+    """
+    future = await _submit(lambda: func(*args, **kwargs))
+    if timeout is None:
+        return await future
+    # 타임아웃으로 future가 취소되면 자리가 바로 반환되므로 shield로 보호
+    return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+
+
+async def get_gemini_model(api_key: Optional[str] = None) -> genai.GenerativeModel:
+    """
+    Gemini 모델을 반환합니다 (api_key가 없으면 현재 설정의 키 사용).
+    처음 호출 시 모델 목록 조회가 필요하므로 이벤트 루프 밖(스레드)에서 실행합니다.
+    """
+    api_key = api_key or get_settings().google_api_key
+    if not api_key:
+        raise RuntimeError("Gemini API key가 설정되지 않았습니다.")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), model_registry.get_model, api_key)
+
+
+async def generate_content(model: genai.GenerativeModel, prompt: Any, timeout: Optional[float] = GEMINI_TIMEOUT, **kwargs: Any):
+    """
+    model.generate_content를 이벤트 루프 밖에서 실행합니다.
+    SDK 요청에도 같은 타임아웃을 넘겨, 시간 초과된 호출이 스레드를 계속 점유하지 않도록 합니다.
+    """
+    if timeout is not None:
+        kwargs.setdefault('request_options', {'timeout': timeout})
+    try:
+        return await run_blocking(model.generate_content, prompt, timeout=timeout, **kwargs)
+    except Exception as e:
+        _invalidate_on_model_error(e)
+        raise
+
+
+async def stream_content(model: genai.GenerativeModel, prompt: Any, timeout: Optional[float] = GEMINI_TIMEOUT, **kwargs: Any) -> AsyncIterator[str]:
+    """
+    model.generate_content(stream=True)의 텍스트 조각을 도착하는 대로 반환합니다.
+    스트림 읽기는 전용 스레드 풀에서 진행하고, timeout은 전체 생성 시간 기준입니다 (초과 시 asyncio.TimeoutError).
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+    stop = threading.Event()
+    if timeout is not None:
+        kwargs.setdefault('request_options', {'timeout': timeout})
+
+    def produce():
+        try:
+            response = model.generate_content(prompt, stream=True, **kwargs)
+            for chunk in response:
+                if stop.is_set():
+                    break
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # 안전 필터 등으로 내용이 없는 조각
+                    continue
+                loop.call_soon_threadsafe(queue.put_nowait, text)
+            loop.call_soon_threadsafe(queue.put_nowait, finished)
+        except BaseException as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+
+    deadline = loop.time() + timeout if timeout is not None else None
+    # 동시 실행 자리는 produce가 끝날 때 반환 (중단된 스트림도 스레드가 멈출 때까지 자리를 차지)
+    await _submit(produce)
+    try:
+        while True:
+            if deadline is None:
+                item = await queue.get()
+            else:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                item = await asyncio.wait_for(queue.get(), timeout=remaining)
+            if item is finished:
+                break
+            if isinstance(item, BaseException):
+                _invalidate_on_model_error(item)
+                raise item
+            if item:
+                yield item
+    finally:
+        # 중간에 중단되면(타임아웃, 클라이언트 연결 종료 등) 스레드도 다음 조각에서 멈춤
+        stop.set()
+
+
+def shutdown_gemini_executor():
+    """앱 종료 시 Gemini 스레드 풀을 정리합니다."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
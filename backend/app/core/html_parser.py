@@ -0,0 +1,332 @@
+"""
+블로그 HTML 파싱 및 본문/링크 추출
+
+- 파서 백엔드 선택: HTML_PARSER 환경 변수 ("auto", "lxml", "html.parser")
+  기본값 auto는 lxml(C 기반, 더 빠름)이 설치되어 있으면 lxml을, 없으면 내장 html.parser를 사용합니다.
+- 잘못된 네이버 마크업은 파서마다 트리를 다르게 보정하므로, 본문 텍스트는 블록 태그 경계에서만 줄을 바꾸고
+  공백을 정규화하여 두 파서의 추출 결과가 같도록 합니다. (backend/tests/test_html_parser.py 참고)
+- 이 모듈의 추출 함수들은 모두 동기 함수이며 HTML 문자열만 입력으로 받습니다.
+  (네트워크 요청 없음 - 이벤트 루프 밖의 워커에서 실행하기 위함)
+"""
+import os
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+from bs4.element import PreformattedString
+
+# 네이버 블로그 본문 선택자 (우선순위 순서, 최신 구조 포함)
+NAVER_CONTENT_SELECTORS = [
+    '#postViewArea',  # 일반적인 본문 영역
+    '.se-main-container',  # 스마트에디터
+    '.se-component',  # 스마트에디터 컴포넌트
+    '.se-section-text',  # 스마트에디터 텍스트 섹션
+    '.post-view',  # 구버전
+    '#postView',  # 다른 버전
+    '.post_ct',  # 또 다른 버전
+    '.post-content',  # 추가 선택자
+    '.post-body',  # 추가 선택자
+    'article',  # 시맨틱 태그
+]
+
+# 본문 추출 시 제거할 태그
+STRIP_TAGS = ['script', 'style', 'noscript']
+# body 전체에서 추출할 때 추가로 제거할 태그
+BODY_STRIP_TAGS = ['script', 'style', 'noscript', 'header', 'footer', 'nav', 'aside']
+# 텍스트 추출 시 앞뒤에서 줄을 바꾸는 블록 태그 (span, b 등 인라인 태그 경계에서는 줄을 바꾸지 않음)
+BLOCK_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'br', 'caption', 'dd', 'div', 'dl', 'dt',
+    'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'td', 'th', 'tr', 'ul',
+])
+
+_INLINE_SPACE_PATTERN = re.compile(r'[^\S\n]+')  # 줄바꿈을 제외한 공백 (&nbsp; 포함)
+_BARE_AMPERSAND_PATTERN = re.compile(r'&(?=[A-Za-z][A-Za-z0-9_]*=)')  # 세미콜론 없이 "이름=" 이 이어지는 &
+_ZERO_WIDTH_PATTERN = re.compile('[\u200b\u200c\u200d\ufeff]')  # 스마트에디터 빈 문단 등
+
+
+@lru_cache(maxsize=1)
+def get_parser_backend() -> str:
+    """사용할 BeautifulSoup 트리 빌더 이름을 반환합니다 (프로세스당 1회 결정)."""
+    requested = os.getenv("HTML_PARSER", "auto").strip().lower()
+    if requested in ("auto", "lxml"):
+        try:
+            import lxml  # noqa: F401
+            return "lxml"
+        except ImportError:
+            if requested == "lxml":
+                print("[HTML 파서] lxml이 설치되지 않아 html.parser를 사용합니다. (pip install lxml)")
+    elif requested != "html.parser":
+        print(f"[HTML 파서] 알 수 없는 HTML_PARSER 값: {requested} - html.parser를 사용합니다.")
+    return "html.parser"
+
+
+def make_soup(html: str) -> BeautifulSoup:
+    """설정된 파서 백엔드로 HTML을 파싱합니다."""
+    backend = get_parser_backend()
+    if backend == "html.parser":
+        # html.parser는 "?blogId=a&currentPage=2"의 "&curren"을 문자 참조(¤)로 바꾸므로
+        # (lxml과 브라우저는 그대로 둠) URL 파라미터 앞의 &를 미리 이스케이프
+        html = _BARE_AMPERSAND_PATTERN.sub('&amp;', html)
+    return BeautifulSoup(html, backend)
+
+
+def normalize_text(text: str) -> str:
+    """줄마다 공백을 하나로 합치고 앞뒤 공백/빈 줄/폭 없는 문자를 제거합니다."""
+    text = _ZERO_WIDTH_PATTERN.sub('', text)
+    lines = (_INLINE_SPACE_PATTERN.sub(' ', line).strip() for line in text.split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def _element_text(element, strip_tags: List[str]) -> str:
+    """
+    요소에서 불필요한 태그를 제거하고 텍스트를 추출합니다.
+    블록 태그 경계에서만 줄을 바꾸므로, 파서가 인라인 태그를 다르게 보정해도 같은 텍스트가 나옵니다.
+    """
+    for tag in element(strip_tags):
+        tag.decompose()
+    parts = []
+    # 깊게 중첩된(닫히지 않은) 마크업에서도 재귀 한도에 걸리지 않도록 스택으로 순회
+    stack = [(iter(element.children), False)]
+    while stack:
+        children, is_block = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if is_block:
+                parts.append('\n')
+        elif isinstance(child, Tag):
+            child_is_block = child.name in BLOCK_TAGS
+            if child_is_block:
+                parts.append('\n')
+            stack.append((iter(child.children), child_is_block))
+        elif isinstance(child, NavigableString) and not isinstance(child, PreformattedString):
+            # 주석, CDATA, doctype 등은 제외
+            parts.append(str(child))
+    return normalize_text(''.join(parts))
+
+
+def _body_text(soup: BeautifulSoup) -> str:
+    """최후의 수단: body 전체에서 텍스트 추출 (너무 짧은 줄 제거)"""
+    body = soup.find('body')
+    if not body:
+        return ""
+    content_text = _element_text(body, BODY_STRIP_TAGS)
+    lines = [line.strip() for line in content_text.split('\n') if len(line.strip()) > 10]
+    return '\n'.join(lines)
+
+
+def select_content_text(soup: BeautifulSoup, selectors: List[str] = NAVER_CONTENT_SELECTORS) -> Tuple[str, Optional[str]]:
+    """
+    선택자를 순서대로 시도하여 본문 텍스트를 추출합니다.
+    100자를 넘는 텍스트를 찾으면 중단하고, 그렇지 않으면 마지막으로 매칭된 텍스트를 반환합니다.
+
+    Returns:
+        (본문 텍스트, 성공한 선택자 또는 None)
+    """
+    content_text = ""
+    for selector in selectors:
+        content = soup.select_one(selector)
+        if content:
+            content_text = _element_text(content, STRIP_TAGS)
+            if len(content_text) > 100:  # 충분한 텍스트가 있으면 사용
+                return content_text, selector
+    return content_text, None
+
+
+def find_post_iframe_src(soup: BeautifulSoup) -> Optional[str]:
+    """본문 iframe 주소를 찾습니다 (id='mainFrame' 우선, 없으면 첫 번째 iframe)."""
+    iframe_src_list = []
+    for iframe in soup.find_all('iframe'):
+        iframe_id = iframe.get('id', '')
+        iframe_src = iframe.get('src') or iframe.get('data-src')
+        if iframe_src:
+            iframe_src_list.append((iframe_id, iframe_src))
+
+    for iframe_id, iframe_src in iframe_src_list:
+        if iframe_id == 'mainFrame':
+            return iframe_src
+    if iframe_src_list:
+        return iframe_src_list[0][1]
+    return None
+
+
+def parse_naver_post(html: str, url: str = "") -> dict:
+    """
+    네이버 블로그 포스트 페이지를 파싱합니다.
+
+    Returns:
+        {
+            'text': 선택자로 추출한 본문 (없으면 ""),
+            'selector': 성공한 선택자,
+            'iframe_src': 본문이 부족할 때 따라갈 iframe 주소,
+            'body_text': 본문이 부족할 때 사용할 body 전체 텍스트,
+            'generic': 본문이 부족할 때 사용할 parse_generic_post 결과 (같은 HTML을 다시 파싱하지 않도록 함께 추출),
+        }
+    """
+    soup = make_soup(html)
+    content_text, selector = select_content_text(soup)
+    result = {'text': content_text, 'selector': selector, 'iframe_src': None, 'body_text': "", 'generic': None}
+
+    # 본문이 부족한 경우에만 iframe 주소와 body 텍스트를 준비 (iframe 구조 또는 모바일 버전)
+    if not content_text or len(content_text) < 100:
+        result['iframe_src'] = find_post_iframe_src(soup)
+        # body 텍스트 추출이 header/nav 등을 지우므로 일반 블로그 추출을 먼저 수행
+        result['generic'] = _generic_post_text(soup, url)
+        result['body_text'] = _body_text(soup)
+    return result
+
+
+def parse_naver_iframe(html: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    iframe(PostView) 페이지에서 본문을 추출합니다.
+
+    Returns:
+        (본문 텍스트 - 선택자가 하나도 매칭되지 않으면 None, 성공한 선택자)
+    """
+    soup = make_soup(html)
+    matched = False
+    content_text = ""
+    for selector in NAVER_CONTENT_SELECTORS:
+        content = soup.select_one(selector)
+        if content:
+            matched = True
+            content_text = _element_text(content, STRIP_TAGS)
+            if len(content_text) > 100:
+                return content_text, selector
+    return (content_text if matched else None), None
+
+
+def parse_generic_post(html: str, url: str) -> Tuple[str, str]:
+    """
+    티스토리 및 일반 블로그 페이지에서 본문을 추출합니다.
+
+    Returns:
+        (본문 텍스트, 추출 방식 - "tistory", "general", "body" 또는 "")
+    """
+    return _generic_post_text(make_soup(html), url)
+
+
+def _generic_post_text(soup: BeautifulSoup, url: str) -> Tuple[str, str]:
+    # 티스토리 블로그 처리
+    if 'tistory.com' in url:
+        content = soup.select_one('.entry-content, .article-content, #content')
+        if content:
+            content_text = _element_text(content, STRIP_TAGS)
+            if len(content_text) > 50:
+                return content_text, "tistory"
+
+    # 일반적인 블로그 처리 (article, main 태그 등)
+    article = soup.find('article') or soup.find('main') or soup.find(class_=re.compile(r'content|post|article', re.I))
+    if article:
+        content_text = _element_text(article, STRIP_TAGS)
+        if len(content_text) > 100:
+            return content_text, "general"
+
+    # 최후의 수단: body 전체에서 텍스트 추출
+    content_text = _body_text(soup)
+    if len(content_text) > 100:
+        return content_text, "body"
+    return "", ""
+
+
+def _absolute_url(href: str) -> str:
+    return href if href.startswith('http') else f'https://blog.naver.com{href}'
+
+
+def parse_main_page_links(html: str) -> List[str]:
+    """블로그 메인 페이지에서 포스트 링크를 추출합니다."""
+    soup = make_soup(html)
+    urls = []
+    for link in soup.find_all('a', href=True):
+        href = link.get('href', '')
+        if 'PostView.naver' in href and 'logNo=' in href:
+            urls.append(_absolute_url(href))
+        elif re.search(r'blog\.naver\.com/[^/]+/\d+$', href):
+            urls.append(_absolute_url(href))
+    return urls
+
+
+def parse_iframe_links(html: str) -> List[str]:
+    """포스트 목록 iframe 페이지에서 포스트 링크를 추출합니다."""
+    soup = make_soup(html)
+    urls = []
+    for link in soup.find_all('a', href=True):
+        href = link.get('href', '')
+        if 'PostView.naver' in href and 'logNo=' in href:
+            urls.append(_absolute_url(href))
+        elif re.search(r'blog\.naver\.com/[^/]+/\d+', href):
+            urls.append(_absolute_url(href))
+    return urls
+
+
+def parse_post_list_page(html: str, blog_id: str) -> Tuple[List[str], List[str]]:
+    """
+    포스트 목록(PostList) 페이지에서 포스트 URL을 추출합니다.
+
+    Returns:
+        (발견된 포스트 URL 목록 - 발견 순서, 추가로 확인할 iframe 주소 목록)
+    """
+    soup = make_soup(html)
+    urls = []
+
+    # 방법 1: 모든 a 태그에서 PostView 링크 찾기
+    for link in soup.find_all('a', href=True):
+        href = link.get('href', '')
+
+        # PostView.naver 형식 (상대/절대 경로 모두 처리)
+        if 'PostView.naver' in href or 'PostView' in href:
+            if 'logNo=' in href or 'logNo' in href:
+                # 상대 경로 처리
+                if href.startswith('/'):
+                    full_url = f'https://blog.naver.com{href}'
+                elif href.startswith('http'):
+                    full_url = href
+                else:
+                    full_url = f'https://blog.naver.com/{href}'
+
+                # URL 정규화 (blogId와 logNo 추출)
+                if 'blogId=' in full_url and 'logNo=' in full_url:
+                    urls.append(full_url)
+
+        # /username/postId 형식
+        elif re.search(r'blog\.naver\.com/[^/]+/\d+', href) or re.search(r'^/\d+$', href):
+            if href.startswith('/'):
+                full_url = f'https://blog.naver.com/{blog_id}{href}'
+            elif href.startswith('http'):
+                full_url = href
+            else:
+                full_url = f'https://blog.naver.com/{blog_id}/{href}'
+            urls.append(full_url)
+
+    # 방법 2: data-log-no, data-post-no 등 속성에서 포스트 번호 추출
+    for attr_name in ['data-log-no', 'data-post-no', 'data-logno', 'logNo', 'postNo']:
+        for element in soup.find_all(attrs={attr_name: True}):
+            log_no = element.get(attr_name) or element.get(attr_name.replace('-', ''))
+            if log_no:
+                urls.append(f'https://blog.naver.com/PostView.naver?blogId={blog_id}&logNo={log_no}')
+
+    # 방법 3: onclick 속성에서 logNo 추출
+    for element in soup.find_all(attrs={'onclick': True}):
+        onclick = element.get('onclick', '')
+        log_no_match = re.search(r'logNo[=:](\d+)', onclick)
+        if log_no_match:
+            urls.append(f'https://blog.naver.com/PostView.naver?blogId={blog_id}&logNo={log_no_match.group(1)}')
+
+    # 방법 4: iframe 주소 수집 (PostList 페이지도 iframe 사용 가능 - 호출 측에서 가져옴)
+    iframe_srcs = []
+    for iframe in soup.find_all('iframe'):
+        iframe_src = iframe.get('src') or iframe.get('data-src')
+        if iframe_src:
+            if not iframe_src.startswith('http'):
+                iframe_src = 'https://blog.naver.com' + iframe_src
+            iframe_srcs.append(iframe_src)
+
+    # 방법 5: JavaScript 변수에서 logNo 추출
+    for script in soup.find_all('script'):
+        if script.string:
+            for log_no in re.findall(r'logNo["\']?\s*[:=]\s*["\']?(\d+)', script.string):
+                urls.append(f'https://blog.naver.com/PostView.naver?blogId={blog_id}&logNo={log_no}')
+
+    return urls, iframe_srcs
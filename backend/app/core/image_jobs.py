@@ -0,0 +1,85 @@
+"""
+백그라운드 이미지 생성 작업
+
+초안 생성 시 이미지 생성(최대 4분)을 기다리지 않도록, 이미지를 백그라운드 작업으로 생성합니다.
+- submit()으로 작업을 시작하면 바로 작업 ID를 반환하고, 생성은 이벤트 루프에서 계속 진행됩니다.
+- 초안에는 작업 ID가 들어간 플레이스홀더 이미지를 넣고,
+  에디터가 GET /api/ai/image/jobs/{작업 ID}로 상태를 확인해 완료되면 실제 이미지로 교체합니다.
+- 완료된 작업은 IMAGE_JOB_TTL(초)이 지나면 목록에서 삭제합니다 (메모리 저장, 서버 재시작 시 사라짐).
+"""
+import asyncio
+import os
+import time
+import uuid
+from typing import Awaitable, Dict, Optional
+
+IMAGE_JOB_TTL = int(os.getenv("IMAGE_JOB_TTL", str(60 * 60)))  # 기본 1시간
+
+
+class ImageJob:
+    def __init__(self, job_id: str, task: asyncio.Task):
+        self.job_id = job_id
+        self.task = task
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        """
+        작업 상태를 반환합니다.
+        status: "pending" (생성 중), "done" (result 포함), "failed" (error 포함)
+        """
+        if not self.task.done():
+            return {"job_id": self.job_id, "status": "pending", "elapsed": round(time.time() - self.created_at, 1)}
+        if self.task.cancelled():
+            return {"job_id": self.job_id, "status": "failed", "error": "작업이 취소되었습니다."}
+        error = self.task.exception()
+        if error is not None:
+            return {"job_id": self.job_id, "status": "failed", "error": str(error)}
+        return {"job_id": self.job_id, "status": "done", "result": self.task.result()}
+
+
+class ImageJobRegistry:
+    def __init__(self, ttl: int = IMAGE_JOB_TTL):
+        self.ttl = ttl
+        self._jobs: Dict[str, ImageJob] = {}
+
+    def _prune(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, work: Awaitable[dict]) -> str:
+        """작업을 시작하고 작업 ID를 반환합니다 (이벤트 루프 안에서 호출)."""
+        self._prune()
+        job_id = uuid.uuid4().hex
+        task = asyncio.ensure_future(work)
+        job = ImageJob(job_id, task)
+
+        def on_done(finished: asyncio.Task):
+            job.finished_at = time.time()
+            if not finished.cancelled() and finished.exception() is not None:
+                print(f"[이미지 작업] 실패 ({job_id}): {str(finished.exception())}")
+            else:
+                print(f"[이미지 작업] 완료 ({job_id}, {job.finished_at - job.created_at:.1f}초)")
+
+        task.add_done_callback(on_done)
+        self._jobs[job_id] = job
+        print(f"[이미지 작업] 시작 ({job_id})")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """작업 상태 (없거나 만료되었으면 None)"""
+        job = self._jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def cancel_all(self):
+        """앱 종료 시 진행 중인 작업을 취소합니다."""
+        for job in self._jobs.values():
+            job.task.cancel()
+
+
+image_jobs = ImageJobRegistry()
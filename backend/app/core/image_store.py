@@ -0,0 +1,86 @@
+"""
+생성된 이미지 로컬 저장소 (내용 주소 기반)
+
+기존에는 생성된 2K PNG 전체를 data:image/png;base64,... URL로 응답에 넣었기 때문에
+이미지 하나가 응답(image_url, preview_url, markdown)과 초안 본문, 이후 /ai/revise 요청/프롬프트마다 수 MB씩 포함되었습니다.
+- 이미지를 sha256(내용).{확장자} 이름으로 저장하고 짧은 URL(/api/media/{이름})로 참조합니다.
+- 같은 이미지는 한 번만 저장합니다.
+- 이름이 내용 해시이므로 내용이 바뀌지 않아 브라우저가 오래 캐시할 수 있습니다 (app.api.media).
+
+저장 구조 (IMAGE_STORE_DIR, 기본값: 프로젝트 루트/image_store):
+    {해시 앞 2글자}/{해시}.png
+MEDIA_BASE_URL: 이미지 URL 앞부분 (기본값: /api/media)
+    경로만 지정하면 요청을 받은 서버 주소(request.base_url)를 앞에 붙여 절대 URL을 만듭니다
+    (start_server.py가 8000번 포트가 사용 중이라 다른 포트로 시작해도 올바른 주소가 됨).
+    프록시 뒤에서 실행하는 경우 등에는 절대 URL(https://.../api/media)로 지정할 수 있습니다.
+"""
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+# backend/app/core/image_store.py -> backend/app/core -> backend/app -> backend -> 프로젝트 루트
+DEFAULT_STORE_DIR = Path(__file__).resolve().parent.parent.parent.parent / "image_store"
+IMAGE_STORE_DIR = Path(os.getenv("IMAGE_STORE_DIR", str(DEFAULT_STORE_DIR)))
+MEDIA_BASE_URL = os.getenv("MEDIA_BASE_URL", "/api/media").rstrip('/')
+
+MEDIA_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+
+# {sha256}.{확장자} 또는 {sha256}_{변형 이름}.{확장자} (썸네일 등)
+_IMAGE_NAME_PATTERN = re.compile(r'^([0-9a-f]{64})(?:_[a-z0-9_]+)?\.(png|jpg|webp|avif)$')
+
+
+class ImageStore:
+    def __init__(self, store_dir: Path = IMAGE_STORE_DIR, base_url: str = MEDIA_BASE_URL):
+        self.store_dir = store_dir
+        self.base_url = base_url
+
+    def _path(self, name: str) -> Path:
+        return self.store_dir / name[:2] / name
+
+    def save(self, data: bytes, extension: str = "png", variant: Optional[str] = None, digest: Optional[str] = None) -> str:
+        """
+        이미지를 저장하고 이름을 반환합니다 (이미 있으면 다시 쓰지 않음).
+        variant를 주면 원본 해시(digest)를 공유하는 변형 이미지로 저장합니다 (예: {해시}_thumb.webp).
+        """
+        digest = digest or hashlib.sha256(data).hexdigest()
+        name = f"{digest}_{variant}.{extension}" if variant else f"{digest}.{extension}"
+        path = self._path(name)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # 임시 파일에 쓴 뒤 교체 (요청 중인 파일이 일부만 쓰인 상태로 보이지 않도록)
+            tmp_path = path.with_name(f".{name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return name
+
+    def path(self, name: str) -> Optional[Path]:
+        """저장된 이미지 경로 (이름 형식이 잘못되었거나 없으면 None)"""
+        if not _IMAGE_NAME_PATTERN.match(name):
+            return None
+        path = self._path(name)
+        return path if path.is_file() else None
+
+    def url(self, name: str, base_url: Optional[str] = None) -> str:
+        """이미지 URL (base_url: media_base_url()로 만든 요청별 URL 앞부분, 없으면 MEDIA_BASE_URL)"""
+        return f"{base_url or self.base_url}/{name}"
+
+    def media_base_url(self, request_base_url: str) -> str:
+        """요청을 받은 서버 주소(request.base_url)로 이미지 URL 앞부분을 만듭니다 (MEDIA_BASE_URL이 절대 URL이면 그대로)."""
+        if re.match(r'^https?://', self.base_url):
+            return self.base_url
+        return f"{request_base_url.rstrip('/')}{self.base_url}"
+
+
+def media_type(name: str) -> str:
+    return MEDIA_TYPES.get(name.rsplit('.', 1)[-1], "application/octet-stream")
+
+
+image_store = ImageStore()
@@ -0,0 +1,93 @@
+"""
+생성된 이미지 변형(썸네일, WebP/AVIF) 만들기
+
+Imagen 결과는 원본 크기 PNG(4.0 모델은 2K)로 저장되지만,
+에디터 미리보기는 작은 이미지면 충분하고 블로그에 올릴 이미지는 네이버가 받는 크기면 충분합니다.
+- thumb: 가로 IMAGE_THUMB_WIDTH px WebP (미리보기용)
+- web: 가로 IMAGE_WEB_MAX_WIDTH px 이하 WebP (본문/업로드용)
+- web_avif: web과 같은 크기의 AVIF (IMAGE_AVIF=true이고 Pillow가 AVIF를 지원할 때만)
+변형은 원본과 같은 해시 이름으로 저장됩니다 ({해시}_thumb.webp 등, app.core.image_store).
+이미지 변환은 CPU 작업이므로 CPU 워커 풀(app.core.workers)에서 실행합니다.
+Pillow가 설치되어 있지 않으면 변형 없이 원본만 사용합니다 (pip install Pillow).
+"""
+import asyncio
+import hashlib
+import io
+import os
+from typing import Dict, Tuple
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+    features = None
+
+from app.core.image_store import image_store
+from app.core.workers import run_cpu_bound
+
+IMAGE_THUMB_WIDTH = int(os.getenv("IMAGE_THUMB_WIDTH", "480"))
+IMAGE_WEB_MAX_WIDTH = int(os.getenv("IMAGE_WEB_MAX_WIDTH", "1280"))
+IMAGE_WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", "82"))
+IMAGE_AVIF = os.getenv("IMAGE_AVIF", "false").strip().lower() in ("1", "true", "yes")
+
+
+def _resized(image, max_width: int):
+    if image.width <= max_width:
+        return image
+    height = round(image.height * max_width / image.width)
+    return image.resize((max_width, height), Image.LANCZOS)
+
+
+def _encode(image, image_format: str, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, quality=quality)
+    return buffer.getvalue()
+
+
+def render_image_variants(image_bytes: bytes) -> Dict[str, Tuple[str, bytes]]:
+    """
+    원본 이미지로 변형 이미지를 만듭니다 (워커 프로세스에서 실행되므로 모듈 최상위 함수).
+
+    Returns:
+        변형 이름 -> (확장자, 이미지 바이트)
+    """
+    with Image.open(io.BytesIO(image_bytes)) as source:
+        image = source.convert("RGBA" if "A" in source.getbands() else "RGB")
+
+    web = _resized(image, IMAGE_WEB_MAX_WIDTH)
+    variants = {
+        "thumb": ("webp", _encode(_resized(image, IMAGE_THUMB_WIDTH), "WEBP", 75)),
+        "web": ("webp", _encode(web, "WEBP", IMAGE_WEBP_QUALITY)),
+    }
+    if IMAGE_AVIF and features.check("avif"):
+        variants["web_avif"] = ("avif", _encode(web, "AVIF", 60))
+    return variants
+
+
+async def create_image_variants(image_bytes: bytes) -> Dict[str, str]:
+    """
+    변형 이미지를 만들어 원본과 함께 저장합니다.
+
+    Returns:
+        변형 이름 -> 저장된 이미지 이름 (image_store.url로 URL 변환, Pillow가 없거나 변환에 실패하면 빈 dict)
+    """
+    if Image is None:
+        return {}
+    try:
+        variants = await run_cpu_bound(render_image_variants, image_bytes)
+    except Exception as e:
+        print(f"[이미지 변형] 변환 실패, 원본만 사용합니다: {type(e).__name__}: {str(e)}")
+        return {}
+
+    digest = hashlib.sha256(image_bytes).hexdigest()
+
+    def save_variants() -> Dict[str, str]:
+        return {
+            variant: image_store.save(data, extension, variant=variant, digest=digest)
+            for variant, (extension, data) in variants.items()
+        }
+
+    names = await asyncio.to_thread(save_variants)
+    sizes = ", ".join(f"{variant} {len(data) // 1024}KB" for variant, (_, data) in variants.items())
+    print(f"[이미지 변형] 생성 완료 (원본 {len(image_bytes) // 1024}KB -> {sizes})")
+    return names
@@ -0,0 +1,167 @@
+"""
+Vertex AI Imagen 모델 선택 및 인스턴스 캐시
+
+기존에는 이미지 요청마다 vertexai.init()을 호출하고, 최대 4개 모델 이름으로 ImageGenerationModel.from_pretrained를
+차례로 시도했습니다 (생성 전에 수 초 소요, 실패한 모델도 매번 다시 시도).
+- Vertex AI 초기화는 (프로젝트, 위치)가 바뀔 때만 한 번 수행합니다.
+- 처음 성공한 모델을 기억해 두고 이후 요청은 바로 generate_images를 호출합니다.
+- 선택 결과는 IMAGEN_MODEL_TTL(초)이 지나면 백그라운드 스레드에서 다시 확인합니다
+  (더 높은 우선순위 모델이 사용 가능해졌는지 확인, 그동안 기존 모델 계속 사용).
+- IMAGEN_MODEL을 지정하면 해당 모델만 사용합니다.
+- IMAGEN_PRELOAD=true(기본값)이면 서버 시작 시 백그라운드에서 미리 초기화합니다 (GCP_PROJECT_ID가 있을 때).
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import vertexai
+    from vertexai.preview.vision_models import ImageGenerationModel
+except ImportError:
+    vertexai = None
+    ImageGenerationModel = None
+
+from app.core.config import get_settings
+
+IMAGEN_MODEL = os.getenv("IMAGEN_MODEL", "").strip()
+IMAGEN_MODEL_TTL = int(os.getenv("IMAGEN_MODEL_TTL", str(6 * 60 * 60)))  # 기본 6시간
+IMAGEN_PRELOAD = os.getenv("IMAGEN_PRELOAD", "true").strip().lower() in ("1", "true", "yes")
+
+# 우선순위 순서 (최신 모델 우선)
+IMAGEN_MODEL_NAMES = [
+    "imagen-4.0-ultra-generate-001",  # 최신 Ultra 모델 (최고 품질)
+    "imagen-4.0-generate-001",        # 최신 4.0 모델
+    "imagegeneration@006",            # 이전 모델
+    "imagen-3.0-generate-001",        # 대체 모델
+]
+
+
+def imagen_generation_params(model_name: str) -> Dict[str, Any]:
+    """모델별 generate_images 기본 파라미터 (prompt 제외)"""
+    params: Dict[str, Any] = {
+        "number_of_images": 1,
+        "aspect_ratio": "16:9",
+        "safety_filter_level": "block_some",
+    }
+    # Imagen 4.0 (Ultra 포함) 모델은 고품질 파라미터 사용
+    if '4.0' in model_name or 'ultra' in model_name.lower():
+        params["sample_image_size"] = "2K"  # 고해상도 (2K)
+        params["enhance_prompt"] = True  # 프롬프트 향상 활성화
+    return params
+
+
+class ImagenModelRegistry:
+    """(프로젝트, 위치)별 Imagen 모델 이름 / ImageGenerationModel 인스턴스 캐시"""
+
+    def __init__(self, ttl: int = IMAGEN_MODEL_TTL):
+        self.ttl = ttl
+        # (프로젝트, 위치) -> (모델 이름, 모델, 선택 시각)
+        self._selected: Dict[Tuple[str, str], Tuple[str, Any, float]] = {}
+        self._initialized: Optional[Tuple[str, str]] = None
+        self._lock = threading.Lock()
+        self._select_lock = threading.Lock()
+        self._refreshing = set()
+
+    def _init_vertex(self, project: str, location: str):
+        # vertexai.init은 전역 설정이므로 프로젝트/위치가 바뀔 때만 다시 호출
+        if self._initialized != (project, location):
+            vertexai.init(project=project, location=location)
+            self._initialized = (project, location)
+            print(f"[Imagen] Vertex AI 초기화 완료 (프로젝트: {project}, 위치: {location})")
+
+    def _probe_model(self) -> Tuple[str, Any]:
+        """우선순위 순서로 모델을 불러와 처음 성공한 모델을 반환합니다 (네트워크 호출)."""
+        model_names = [IMAGEN_MODEL] if IMAGEN_MODEL else IMAGEN_MODEL_NAMES
+        for model_name in model_names:
+            try:
+                model = ImageGenerationModel.from_pretrained(model_name)
+                print(f"[Imagen] 모델 선택: {model_name}")
+                return model_name, model
+            except Exception as e:
+                print(f"[Imagen] 모델 사용 불가 ({model_name}): {type(e).__name__}: {str(e)[:200]}")
+        raise RuntimeError("사용 가능한 Imagen 모델을 찾을 수 없습니다.")
+
+    def _refresh_in_background(self, key: Tuple[str, str]):
+        def refresh():
+            try:
+                model_name, model = self._probe_model()
+                with self._lock:
+                    self._selected[key] = (model_name, model, time.time())
+            except Exception as e:
+                print(f"[Imagen] 모델 다시 확인 실패, 기존 모델 계속 사용: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        threading.Thread(target=refresh, name="imagen-model-refresh", daemon=True).start()
+
+    def get_model(self, project: str, location: str) -> Tuple[Any, str]:
+        """
+        (ImageGenerationModel, 모델 이름)을 반환합니다 (블로킹 - 스레드에서 호출).
+        처음 한 번만 Vertex AI 초기화와 모델 선택을 수행합니다.
+        """
+        if vertexai is None:
+            raise ImportError("Vertex AI SDK가 설치되지 않았습니다 (pip install google-cloud-aiplatform)")
+
+        key = (project, location)
+        with self._lock:
+            selected = self._selected.get(key)
+        if selected:
+            model_name, model, selected_at = selected
+            if time.time() - selected_at > self.ttl:
+                self._refresh_in_background(key)
+            return model, model_name
+
+        # 동시에 들어온 첫 요청들은 한 번의 초기화/모델 선택 결과를 함께 사용
+        with self._select_lock:
+            with self._lock:
+                selected = self._selected.get(key)
+            if selected:
+                return selected[1], selected[0]
+            self._init_vertex(project, location)
+            model_name, model = self._probe_model()
+            with self._lock:
+                self._selected[key] = (model_name, model, time.time())
+        return model, model_name
+
+    def invalidate(self):
+        """모델 선택 결과를 지웁니다 (모델을 찾을 수 없다는 오류 등)."""
+        with self._lock:
+            self._selected.clear()
+
+
+imagen_registry = ImagenModelRegistry()
+
+
+async def get_imagen_model(project: Optional[str] = None, location: Optional[str] = None) -> Tuple[Any, str]:
+    """
+    Imagen 모델과 모델 이름을 반환합니다 (project/location이 없으면 현재 설정 사용).
+    처음 호출 시 초기화/모델 선택이 필요하므로 이벤트 루프 밖(스레드)에서 실행합니다.
+    """
+    settings = get_settings()
+    project = project or settings.gcp_project_id
+    location = location or settings.gcp_location
+    if not project:
+        raise RuntimeError("GCP_PROJECT_ID가 설정되지 않았습니다.")
+    return await asyncio.to_thread(imagen_registry.get_model, project, location)
+
+
+def preload_imagen_model():
+    """서버 시작 시 Imagen 모델을 백그라운드에서 미리 초기화합니다 (설정된 경우에만)."""
+    settings = get_settings()
+    if not IMAGEN_PRELOAD or not settings.gcp_project_id or vertexai is None:
+        return
+
+    def preload():
+        try:
+            imagen_registry.get_model(settings.gcp_project_id, settings.gcp_location)
+        except Exception as e:
+            print(f"[Imagen] 미리 초기화 실패 (첫 이미지 요청 때 다시 시도): {type(e).__name__}: {str(e)}")
+
+    threading.Thread(target=preload, name="imagen-preload", daemon=True).start()
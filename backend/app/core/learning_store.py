@@ -0,0 +1,525 @@
+"""
+학습 데이터 저장소
+
+LEARNING_STORE_BACKEND 환경 변수로 저장 방식을 선택합니다.
+- "sqlite" (기본값): learning_data.db
+    블로그 텍스트 / 퇴고 패턴 / 스타일 규칙을 별도 테이블에 저장합니다.
+    추가·수정 시 전체를 다시 쓰지 않고, 쓰기는 트랜잭션(BEGIN IMMEDIATE)으로 직렬화됩니다.
+    처음 사용할 때 기존 learning_data.json이 있으면 한 번만 가져옵니다 (원본 파일은 그대로 둠).
+- "json": 기존 learning_data.json 파일 (매번 전체 읽기/쓰기)
+
+두 저장소 모두 같은 메서드를 제공하며, load_all()은 기존 JSON과 같은 형태의 dict를 반환합니다.
+앱에서는 메모리 스냅샷(LearningDataRepository)으로 감싼 learning_store를 사용합니다.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+# backend/app/core/learning_store.py -> backend/app/core -> backend/app -> backend -> 프로젝트 루트
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+LEARNING_DATA_JSON_PATH = PROJECT_ROOT / "learning_data.json"
+LEARNING_DATA_DB_PATH = PROJECT_ROOT / "learning_data.db"
+LEARNING_STORE_BACKEND = os.getenv("LEARNING_STORE_BACKEND", "sqlite").strip().lower()
+
+MAX_REVISION_PATTERNS = 50  # 퇴고 패턴은 최근 50개까지만 보관
+MAX_STYLE_RULES = 20  # 스타일 규칙은 최근 20개까지만 보관
+
+# 학습 데이터 dict의 키 (쓰기 후에는 바뀐 키만 다시 읽음)
+LEARNING_SECTIONS = ('blog_texts', 'revision_patterns', 'style_rules', 'personal_info', 'clinic_info', 'updated_at')
+
+
+@contextmanager
+def interprocess_lock(lock_path: Path):
+    """프로세스 간 파일 잠금 (uvicorn 워커가 여러 개일 때 같은 파일을 동시에 수정하지 않도록)"""
+    with open(lock_path, 'a+') as f:
+        if sys.platform == 'win32':
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK은 약 10초 동안 재시도한 뒤 실패하므로 잠금을 얻을 때까지 반복
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class JsonLearningStore:
+    """
+    learning_data.json 파일 기반 저장소 (기존 방식)
+
+    쓰기는 "읽기-수정-쓰기" 전체를 스레드 잠금 + 파일 잠금(learning_data.json.lock)으로 감싸고,
+    임시 파일에 쓴 뒤 os.replace로 교체합니다. (중간에 중단되어도 파일이 잘리지 않음)
+    """
+
+    def __init__(self, path: Path = LEARNING_DATA_JSON_PATH):
+        self.path = path
+        self.lock_path = Path(f"{path}.lock")
+        self._thread_lock = threading.Lock()
+
+    def load_all(self) -> dict:
+        """학습 데이터를 로드합니다."""
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"[학습] 데이터 로드 실패: {str(e)}")
+                return {}
+        return {}
+
+    def load_sections(self, sections) -> dict:
+        """지정한 키만 로드합니다 (JSON 파일은 전체를 읽은 뒤 골라냄)."""
+        data = self.load_all()
+        return {key: data[key] for key in sections if key in data}
+
+    def _load_for_update(self) -> dict:
+        """
+        수정을 위해 학습 데이터를 로드합니다.
+        파일이 손상된 경우 빈 데이터로 덮어써서 학습 내용을 잃지 않도록 예외를 발생시킵니다.
+        """
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            raise RuntimeError(f"learning_data.json을 읽을 수 없어 저장을 중단합니다 (파일 확인 필요): {str(e)}")
+
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock, interprocess_lock(self.lock_path):
+            yield
+
+    def save_all(self, data: dict):
+        """학습 데이터를 저장합니다 (임시 파일에 쓴 뒤 원자적으로 교체)."""
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        print(f"[학습] 데이터 저장 완료")
+
+    def add_blog_texts(self, texts: List[str]) -> int:
+        """블로그 텍스트를 추가하고 전체 텍스트 수를 반환합니다."""
+        with self._locked():
+            data = self._load_for_update()
+            data.setdefault('blog_texts', []).extend(texts)
+            data['updated_at'] = datetime.now().isoformat()
+            self.save_all(data)
+            return len(data['blog_texts'])
+
+    def compact_blog_texts(self, select_indices: Callable[[List[str]], List[int]]) -> Tuple[int, int]:
+        """select_indices가 고른 블로그 텍스트만 남깁니다. (정리 전 수, 정리 후 수)를 반환합니다."""
+        with self._locked():
+            data = self._load_for_update()
+            texts = data.get('blog_texts', [])
+            kept = [texts[i] for i in select_indices(texts)]
+            if len(kept) != len(texts):
+                data['blog_texts'] = kept
+                data['updated_at'] = datetime.now().isoformat()
+                self.save_all(data)
+            return len(texts), len(kept)
+
+    def add_revision_pattern(self, pattern: dict) -> int:
+        """퇴고 패턴을 추가하고 보관 중인 패턴 수를 반환합니다."""
+        with self._locked():
+            data = self._load_for_update()
+            patterns = data.setdefault('revision_patterns', [])
+            patterns.append(pattern)
+            # 최대 개수까지만 저장 (오래된 것부터 삭제)
+            data['revision_patterns'] = patterns[-MAX_REVISION_PATTERNS:]
+            data['updated_at'] = datetime.now().isoformat()
+            self.save_all(data)
+            return len(data['revision_patterns'])
+
+    def add_style_rule(self, rule: str) -> bool:
+        """스타일 규칙을 추가합니다. 이미 있는 규칙이면 False를 반환합니다."""
+        with self._locked():
+            data = self._load_for_update()
+            rules = data.setdefault('style_rules', [])
+            if rule in rules:
+                return False
+            rules.append(rule)
+            data['style_rules'] = rules[-MAX_STYLE_RULES:]
+            data['updated_at'] = datetime.now().isoformat()
+            self.save_all(data)
+            return True
+
+    def update_profile(self, personal_info: Optional[str] = None, clinic_info: Optional[str] = None):
+        """개인 정보 / 한의원 정보를 업데이트합니다 (None이면 유지)."""
+        with self._locked():
+            data = self._load_for_update()
+            if personal_info:
+                data['personal_info'] = personal_info
+            if clinic_info:
+                data['clinic_info'] = clinic_info
+            data['updated_at'] = datetime.now().isoformat()
+            self.save_all(data)
+
+
+class SqliteLearningStore:
+    """SQLite 기반 저장소 (테이블 분리, 부분 추가/수정, 트랜잭션 쓰기)"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS blog_texts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            text TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS revision_patterns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            original_draft TEXT NOT NULL,
+            revised_draft TEXT NOT NULL,
+            revision_instruction TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS style_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            rule TEXT NOT NULL UNIQUE,
+            created_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, path: Path = LEARNING_DATA_DB_PATH, json_path: Path = LEARNING_DATA_JSON_PATH):
+        self.path = path
+        self.json_path = json_path
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # 요청마다 새 연결 사용 (스레드 간 공유하지 않음), 쓰기 잠금은 최대 30초 대기
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            self._initialize(conn)
+        return conn
+
+    def _initialize(self, conn: sqlite3.Connection):
+        """스키마 생성 및 기존 JSON 데이터 가져오기 (프로세스당 1회)"""
+        with self._init_lock:
+            if self._initialized:
+                return
+            conn.execute("PRAGMA journal_mode=WAL")  # 읽기와 쓰기가 서로 막지 않도록
+            conn.executescript(self.SCHEMA)
+            self._migrate_from_json(conn)
+            self._initialized = True
+
+    def _migrate_from_json(self, conn: sqlite3.Connection):
+        """기존 learning_data.json을 한 번만 가져옵니다."""
+        migrated = conn.execute("SELECT value FROM meta WHERE key = 'json_migrated_at'").fetchone()
+        if migrated or not self.json_path.exists():
+            return
+        try:
+            data = JsonLearningStore(self.json_path).load_all()
+            conn.execute("BEGIN IMMEDIATE")
+            now = datetime.now().isoformat()
+            conn.executemany(
+                "INSERT INTO blog_texts (text, created_at) VALUES (?, ?)",
+                [(text, now) for text in data.get('blog_texts', [])]
+            )
+            conn.executemany(
+                "INSERT INTO revision_patterns (original_draft, revised_draft, revision_instruction, created_at) VALUES (?, ?, ?, ?)",
+                [
+                    (p.get('original_draft', ''), p.get('revised_draft', ''), p.get('revision_instruction', ''), p.get('created_at', now))
+                    for p in data.get('revision_patterns', [])
+                ]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO style_rules (rule, created_at) VALUES (?, ?)",
+                [(rule, now) for rule in data.get('style_rules', [])]
+            )
+            for key in ('personal_info', 'clinic_info', 'updated_at'):
+                if data.get(key):
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, data[key]))
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated_at', ?)", (now,))
+            conn.execute("COMMIT")
+            print(f"[학습] learning_data.json 가져오기 완료 (블로그 텍스트 {len(data.get('blog_texts', []))}개)")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            print(f"[학습] learning_data.json 가져오기 실패: {str(e)}")
+            raise
+
+    def _write(self, func):
+        """쓰기 작업을 하나의 트랜잭션으로 실행합니다 (동시 쓰기는 SQLite 잠금으로 직렬화)."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            result = func(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('updated_at', ?)",
+                (datetime.now().isoformat(),)
+            )
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def load_all(self) -> dict:
+        """학습 데이터를 기존 JSON과 같은 형태의 dict로 로드합니다."""
+        return self.load_sections(LEARNING_SECTIONS)
+
+    def load_sections(self, sections) -> dict:
+        """지정한 키에 해당하는 테이블만 읽습니다 (비어 있는 키는 dict에 넣지 않음)."""
+        conn = self._connect()
+        try:
+            data = {}
+            if 'blog_texts' in sections:
+                blog_texts = [row['text'] for row in conn.execute("SELECT text FROM blog_texts ORDER BY id")]
+                if blog_texts:
+                    data['blog_texts'] = blog_texts
+            if 'revision_patterns' in sections:
+                revision_patterns = [
+                    dict(row) for row in conn.execute(
+                        "SELECT original_draft, revised_draft, revision_instruction, created_at FROM revision_patterns ORDER BY id"
+                    )
+                ]
+                if revision_patterns:
+                    data['revision_patterns'] = revision_patterns
+            if 'style_rules' in sections:
+                style_rules = [row['rule'] for row in conn.execute("SELECT rule FROM style_rules ORDER BY id")]
+                if style_rules:
+                    data['style_rules'] = style_rules
+            meta_keys = [key for key in ('personal_info', 'clinic_info', 'updated_at') if key in sections]
+            if meta_keys:
+                placeholders = ", ".join("?" for _ in meta_keys)
+                for row in conn.execute(f"SELECT key, value FROM meta WHERE key IN ({placeholders})", meta_keys):
+                    data[row['key']] = row['value']
+            return data
+        finally:
+            conn.close()
+
+    def add_blog_texts(self, texts: List[str]) -> int:
+        """블로그 텍스트를 추가하고 전체 텍스트 수를 반환합니다."""
+        def op(conn):
+            now = datetime.now().isoformat()
+            conn.executemany("INSERT INTO blog_texts (text, created_at) VALUES (?, ?)", [(text, now) for text in texts])
+            return conn.execute("SELECT COUNT(*) FROM blog_texts").fetchone()[0]
+        return self._write(op)
+
+    def compact_blog_texts(self, select_indices: Callable[[List[str]], List[int]]) -> Tuple[int, int]:
+        """select_indices가 고른 블로그 텍스트만 남깁니다. (정리 전 수, 정리 후 수)를 반환합니다."""
+        def op(conn):
+            rows = conn.execute("SELECT id, text FROM blog_texts ORDER BY id").fetchall()
+            keep = set(select_indices([row['text'] for row in rows]))
+            removed_ids = [(row['id'],) for i, row in enumerate(rows) if i not in keep]
+            conn.executemany("DELETE FROM blog_texts WHERE id = ?", removed_ids)
+            return len(rows), len(rows) - len(removed_ids)
+        before, after = self._write(op)
+        if after < before:
+            # 삭제된 공간을 파일에서 반환
+            conn = self._connect()
+            try:
+                conn.execute("VACUUM")
+            finally:
+                conn.close()
+        return before, after
+
+    def add_revision_pattern(self, pattern: dict) -> int:
+        """퇴고 패턴을 추가하고 보관 중인 패턴 수를 반환합니다."""
+        def op(conn):
+            conn.execute(
+                "INSERT INTO revision_patterns (original_draft, revised_draft, revision_instruction, created_at) VALUES (?, ?, ?, ?)",
+                (pattern['original_draft'], pattern['revised_draft'], pattern['revision_instruction'], pattern['created_at'])
+            )
+            # 최대 개수까지만 저장 (오래된 것부터 삭제)
+            conn.execute(
+                "DELETE FROM revision_patterns WHERE id NOT IN (SELECT id FROM revision_patterns ORDER BY id DESC LIMIT ?)",
+                (MAX_REVISION_PATTERNS,)
+            )
+            return conn.execute("SELECT COUNT(*) FROM revision_patterns").fetchone()[0]
+        return self._write(op)
+
+    def add_style_rule(self, rule: str) -> bool:
+        """스타일 규칙을 추가합니다. 이미 있는 규칙이면 False를 반환합니다."""
+        def op(conn):
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO style_rules (rule, created_at) VALUES (?, ?)",
+                (rule, datetime.now().isoformat())
+            )
+            conn.execute(
+                "DELETE FROM style_rules WHERE id NOT IN (SELECT id FROM style_rules ORDER BY id DESC LIMIT ?)",
+                (MAX_STYLE_RULES,)
+            )
+            return cursor.rowcount > 0
+        return self._write(op)
+
+    def update_profile(self, personal_info: Optional[str] = None, clinic_info: Optional[str] = None):
+        """개인 정보 / 한의원 정보를 업데이트합니다 (None이면 유지)."""
+        def op(conn):
+            if personal_info:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('personal_info', ?)", (personal_info,))
+            if clinic_info:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('clinic_info', ?)", (clinic_info,))
+        self._write(op)
+
+
+class LearningDataRepository:
+    """
+    학습 데이터 메모리 스냅샷
+
+    파싱된 학습 데이터를 메모리에 보관하고, 다음 경우에만 다시 읽습니다.
+    - 이 앱을 통해 쓰기가 일어난 경우 (쓰기 메서드가 바뀐 키만 바로 다시 읽음,
+      예: 블로그 텍스트를 추가해도 퇴고 패턴/스타일 규칙은 다시 읽지 않음)
+    - 저장 파일의 수정 시각/크기가 바뀐 경우 (다른 프로세스에서 수정 등)
+      파일 확인은 LEARNING_SNAPSHOT_CHECK_INTERVAL초(기본 2초)에 한 번만 하므로,
+      그 사이의 읽기는 디스크 I/O 없이 메모리에서 처리됩니다.
+
+    snapshot()이 반환하는 dict는 여러 요청이 공유하므로 수정하면 안 됩니다 (읽기 전용).
+    """
+
+    def __init__(self, store, check_interval: float = float(os.getenv("LEARNING_SNAPSHOT_CHECK_INTERVAL", "2"))):
+        self.store = store
+        self.check_interval = check_interval
+        self.version = 0  # 스냅샷을 다시 읽을 때마다 증가 (캐시 키로 사용 가능)
+        self._snapshot: Optional[dict] = None
+        self._current: Tuple[Optional[dict], int] = (None, 0)
+        self._signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._write_lock = asyncio.Lock()
+
+    def _watched_paths(self) -> List[Path]:
+        if isinstance(self.store, SqliteLearningStore):
+            # WAL 모드에서는 커밋이 -wal 파일에 먼저 기록됨
+            return [self.store.path, Path(f"{self.store.path}-wal")]
+        return [self.store.path]
+
+    def _file_signature(self) -> tuple:
+        signature = []
+        for path in self._watched_paths():
+            try:
+                stat = path.stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def snapshot(self) -> dict:
+        """학습 데이터 스냅샷을 반환합니다 (읽기 전용)."""
+        return self.versioned_snapshot()[0]
+
+    def versioned_snapshot(self) -> Tuple[dict, int]:
+        """(스냅샷, 버전)을 함께 반환합니다. 스냅샷에서 파생된 값을 캐시할 때 사용합니다."""
+        now = time.monotonic()
+        current = self._current  # (스냅샷, 버전)을 한 번에 읽어 서로 어긋나지 않도록
+        if current[0] is not None and now - self._checked_at < self.check_interval:
+            return current
+
+        with self._lock:
+            signature = self._file_signature()
+            self._checked_at = time.monotonic()
+            if self._snapshot is None or signature != self._signature:
+                self._snapshot = self.store.load_all()
+                # 로드 중 일어난 변경을 놓치지 않도록 로드 전에 구한 서명을 저장
+                self._signature = signature
+                self.version += 1
+                self._current = (self._snapshot, self.version)
+            return self._current
+
+    async def write(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        쓰기 메서드를 이벤트 루프 밖(스레드)에서 실행합니다.
+        같은 프로세스 안의 쓰기는 asyncio 잠금으로 한 번에 하나씩만 실행합니다.
+        예: await learning_store.write(learning_store.add_blog_texts, texts)
+        """
+        async with self._write_lock:
+            return await asyncio.to_thread(func, *args)
+
+    def invalidate(self):
+        """스냅샷을 무효화합니다 (다음 읽기에서 다시 로드)."""
+        with self._lock:
+            self._snapshot = None
+            self._current = (None, self.version)
+
+    def _write_sections(self, sections: Tuple[str, ...], func: Callable[..., Any], *args: Any) -> Any:
+        """쓰기를 실행한 뒤 바뀐 키만 다시 읽어 스냅샷에 반영합니다."""
+        signature = self._file_signature()
+        try:
+            return func(*args)
+        finally:
+            self._refresh_sections(sections, signature)
+
+    def _refresh_sections(self, sections: Tuple[str, ...], signature_before: tuple):
+        with self._lock:
+            if self._snapshot is None or signature_before != self._signature:
+                # 스냅샷이 없거나 그 사이 다른 프로세스의 변경이 있었으면 다음 읽기에서 전체를 다시 읽음
+                self._snapshot = None
+                self._current = (None, self.version)
+                return
+            signature = self._file_signature()
+            snapshot = {key: value for key, value in self._snapshot.items() if key not in sections}
+            snapshot.update(self.store.load_sections(sections))
+            # 기존 스냅샷을 사용 중인 요청이 있으므로 새 dict로 교체
+            self._snapshot = snapshot
+            self._signature = signature
+            self._checked_at = time.monotonic()
+            self.version += 1
+            self._current = (self._snapshot, self.version)
+
+    def load_all(self) -> dict:
+        return self.snapshot()
+
+    def add_blog_texts(self, texts: List[str]) -> int:
+        return self._write_sections(('blog_texts', 'updated_at'), self.store.add_blog_texts, texts)
+
+    def compact_blog_texts(self, select_indices: Callable[[List[str]], List[int]]) -> Tuple[int, int]:
+        return self._write_sections(('blog_texts', 'updated_at'), self.store.compact_blog_texts, select_indices)
+
+    def add_revision_pattern(self, pattern: dict) -> int:
+        return self._write_sections(('revision_patterns', 'updated_at'), self.store.add_revision_pattern, pattern)
+
+    def add_style_rule(self, rule: str) -> bool:
+        return self._write_sections(('style_rules', 'updated_at'), self.store.add_style_rule, rule)
+
+    def update_profile(self, personal_info: Optional[str] = None, clinic_info: Optional[str] = None):
+        self._write_sections(
+            ('personal_info', 'clinic_info', 'updated_at'), self.store.update_profile, personal_info, clinic_info
+        )
+
+
+def create_learning_store():
+    """LEARNING_STORE_BACKEND 설정에 맞는 저장소를 생성합니다."""
+    if LEARNING_STORE_BACKEND == "json":
+        print("[학습] 저장소: learning_data.json")
+        return JsonLearningStore()
+    if LEARNING_STORE_BACKEND != "sqlite":
+        print(f"[학습] 알 수 없는 LEARNING_STORE_BACKEND 값: {LEARNING_STORE_BACKEND} - sqlite를 사용합니다.")
+    return SqliteLearningStore()
+
+
+learning_store = LearningDataRepository(create_learning_store())
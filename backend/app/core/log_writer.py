@@ -0,0 +1,192 @@
+"""
+백엔드 로그 파일 기록 (백그라운드 쓰기)
+
+기존 log_to_file은 한 줄마다 파일을 열고 쓰고 os.fsync까지 한 뒤 콘솔에도 출력했기 때문에,
+요청마다 미들웨어 로그 5~10줄, 이미지 생성 로그 수십 줄이 이벤트 루프에서 디스크 동기화를 기다렸습니다.
+- log_to_file은 시각을 붙여 큐에 넣기만 하고 바로 반환합니다 (스레드에서 호출해도 안전).
+- 백그라운드 스레드가 쌓인 줄을 모아 한 번에 파일과 콘솔에 씁니다.
+- 파일이 LOG_FILE_MAX_MB를 넘으면 backend_logs.txt.1, .2 ... 로 돌려 LOG_FILE_BACKUPS개까지 보관합니다.
+- 큐가 LOG_QUEUE_SIZE줄을 넘으면 (디스크가 멈춘 경우 등) 새 줄을 버리고 버린 줄 수를 기록합니다.
+
+LOG_DURABILITY (기록 보장 수준):
+    none  - 파이썬 버퍼에만 쓰기 (가장 빠름, 프로세스가 비정상 종료되면 마지막 로그 일부 유실)
+    flush - 모아 쓸 때마다 OS로 flush (기본값, 프로세스가 죽어도 유지, OS/전원 장애 시 유실 가능)
+    fsync - 모아 쓸 때마다 fsync (기존과 같은 보장, 줄마다가 아니라 묶음마다)
+"""
+import atexit
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+# backend/app/core/log_writer.py -> backend/app/core -> backend/app -> backend -> 프로젝트 루트
+DEFAULT_LOG_FILE_PATH = Path(__file__).resolve().parent.parent.parent.parent / "backend_logs.txt"
+LOG_FILE_PATH = Path(os.getenv("LOG_FILE_PATH", str(DEFAULT_LOG_FILE_PATH)))
+LOG_FILE_MAX_MB = float(os.getenv("LOG_FILE_MAX_MB", "20"))
+LOG_FILE_BACKUPS = int(os.getenv("LOG_FILE_BACKUPS", "3"))
+LOG_DURABILITY = os.getenv("LOG_DURABILITY", "flush").strip().lower()
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "0.5"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_CONSOLE = os.getenv("LOG_CONSOLE", "true").strip().lower() in ("1", "true", "yes")
+
+_STOP = object()
+
+
+class LogWriter:
+    def __init__(
+        self,
+        path: Path = LOG_FILE_PATH,
+        max_bytes: int = int(LOG_FILE_MAX_MB * 1024 * 1024),
+        backups: int = LOG_FILE_BACKUPS,
+        durability: str = LOG_DURABILITY,
+        flush_interval: float = LOG_FLUSH_INTERVAL,
+        console: bool = LOG_CONSOLE,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.durability = durability if durability in ("none", "flush", "fsync") else "flush"
+        self.flush_interval = flush_interval
+        self.console = console
+        self._queue: "queue.Queue" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self._dropped = 0
+        self._file = None
+        self._size = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def write(self, message: str):
+        """로그 한 줄을 큐에 넣습니다 (기다리지 않음)."""
+        if self._closed:
+            print(message, flush=True)
+            return
+        self._ensure_thread()
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            self._queue.put_nowait((timestamp, message))
+        except queue.Full:
+            self._dropped += 1
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [item]
+            # 이미 쌓인 줄은 기다리지 않고 함께 씀
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(entry is _STOP for entry in batch)
+            self._write_batch([entry for entry in batch if entry is not _STOP])
+            if stop:
+                self._close_file()
+                return
+
+    def _write_batch(self, batch: List[tuple]):
+        if self._dropped:
+            dropped, self._dropped = self._dropped, 0
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            batch.append((timestamp, f"[로그] 큐가 가득 차서 {dropped}줄을 버렸습니다."))
+        if not batch:
+            return
+
+        if self.console:
+            try:
+                sys.stdout.write("".join(f"{message}\n" for _, message in batch))
+                sys.stdout.flush()
+            except Exception:
+                pass
+
+        text = "".join(f"[{timestamp}] {message}\n" for timestamp, message in batch)
+        data = text.encode('utf-8', errors='replace')
+        try:
+            if self._file is None:
+                self._open_file()
+            elif self.max_bytes > 0 and self._size + len(data) > self.max_bytes:
+                self._rotate()
+            self._file.write(data)
+            self._size += len(data)
+            if self.durability != "none":
+                self._file.flush()
+                if self.durability == "fsync":
+                    os.fsync(self._file.fileno())
+        except Exception as e:
+            # 파일 로깅 실패해도 콘솔 출력은 계속 (다음 묶음에서 파일을 다시 엶)
+            print(f"[로그 파일 쓰기 실패] {type(e).__name__}: {str(e)}", flush=True)
+            print(f"[로그 파일 경로] {self.path}", flush=True)
+            self._close_file()
+
+    def _open_file(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'ab')
+        self._size = self._file.tell()
+
+    def _close_file(self):
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            if self.durability == "fsync":
+                os.fsync(self._file.fileno())
+            self._file.close()
+        except Exception:
+            pass
+        self._file = None
+
+    def _rotate(self):
+        """backend_logs.txt -> .1 -> .2 ... (가장 오래된 파일은 삭제)"""
+        self._close_file()
+        if self.backups > 0:
+            for index in range(self.backups - 1, 0, -1):
+                source = self.path.with_name(f"{self.path.name}.{index}")
+                if source.exists():
+                    os.replace(source, self.path.with_name(f"{self.path.name}.{index + 1}"))
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink(missing_ok=True)
+        self._open_file()
+
+    def close(self, timeout: float = 5.0):
+        """남은 로그를 모두 쓰고 파일을 닫습니다 (앱 종료 시)."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+
+log_writer = LogWriter()
+
+
+def log_to_file(message: str):
+    """파일과 콘솔 모두에 로그 출력 (백그라운드 스레드가 모아서 기록)"""
+    log_writer.write(message)
+
+
+def shutdown_log_writer():
+    log_writer.close()
+
+
+# 서버 종료 이벤트 없이 끝나는 경우(스크립트 등)에도 남은 로그를 씀
+atexit.register(shutdown_log_writer)
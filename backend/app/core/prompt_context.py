@@ -0,0 +1,132 @@
+"""
+학습 데이터 기반 프롬프트 조각(learning_context) 캐시
+
+초안 생성/퇴고 때마다 학습 데이터 전체를 다시 이어 붙이지 않도록,
+학습 데이터 버전(learning_store.version)이 바뀔 때만 한 번 만들고 이후 요청에서 재사용합니다.
+- 캐시 키: 용도 -> (버전, 조각)
+- 초안용 어투 예시는 주제에 따라 달라지므로 요청마다 고르고(app.core.style_index), 나머지만 캐시합니다.
+- 학습/퇴고로 데이터가 바뀌면 버전이 올라가므로 다음 요청에서 자동으로 다시 만듭니다.
+"""
+import threading
+from typing import Callable, Dict, List, Tuple, TypeVar
+
+from app.core.learning_store import learning_store
+from app.core.style_index import select_style_examples
+
+T = TypeVar("T")
+
+_fragment_cache: Dict[str, Tuple[int, object]] = {}
+_cache_lock = threading.Lock()
+
+
+def build_style_examples_context(sample_texts: List[str]) -> str:
+    """초안 생성용 어투 예시 블록을 만듭니다 (각 예시 최대 800자)."""
+    if not sample_texts:
+        return ""
+    examples_context = f"\n\n=== [학습된 블로그 어투 예시 - 반드시 이 어투를 따라야 함] ===\n"
+    for i, text in enumerate(sample_texts, 1):
+        # 각 텍스트의 충분한 부분 제공 (800자)
+        text_preview = text[:800] + "..." if len(text) > 800 else text
+        examples_context += f"\n[예시 {i} - 학습된 어투]\n{text_preview}\n"
+    examples_context += "\n=== 위 예시들의 어투, 문장 구조, 표현 방식을 정확히 따라야 합니다 ===\n"
+    return examples_context
+
+
+def build_draft_rules_context(learning_data: dict) -> str:
+    """초안 생성용 학습 컨텍스트 중 주제와 무관한 부분 (스타일 규칙, 퇴고 선호사항, 개인/한의원 정보)"""
+    learning_context = ""
+    if not learning_data:
+        return learning_context
+
+    # 스타일 규칙 반영 (영구적으로 저장된 스타일 규칙)
+    style_rules = learning_data.get('style_rules', [])
+    if style_rules:
+        learning_context += f"\n\n=== [학습된 스타일 규칙 - 반드시 준수해야 함] ===\n"
+        for i, rule in enumerate(style_rules, 1):
+            learning_context += f"{i}. {rule}\n"
+        learning_context += "\n[중요] 매우 중요: 위의 스타일 규칙을 반드시 준수하여 작성하세요. 이 규칙들은 사용자가 퇴고를 통해 영구적으로 설정한 것이므로 절대 위반하지 마세요.\n"
+
+    # 퇴고 패턴에서 학습된 선호사항 반영
+    revision_patterns = learning_data.get('revision_patterns', [])
+    if revision_patterns:
+        # 최근 퇴고 패턴들의 지시사항 분석
+        recent_instructions = [p.get('revision_instruction', '') for p in revision_patterns[-10:]]
+        if recent_instructions:
+            learning_context += f"\n\n=== [퇴고 패턴에서 학습된 선호사항] ===\n"
+            learning_context += "사용자가 자주 요청하는 수정 사항:\n"
+            for i, instruction in enumerate(recent_instructions[-5:], 1):  # 최근 5개
+                learning_context += f"{i}. {instruction}\n"
+            learning_context += "\n위의 선호사항을 참고하여 초안을 작성하세요.\n"
+
+    # 개인 정보와 한의원 정보는 모든 스타일에서 활용
+    if learning_data.get('personal_info'):
+        learning_context += f"\n[개인 정보 - 글에 자연스럽게 반영]\n{learning_data['personal_info']}\n"
+
+    if learning_data.get('clinic_info'):
+        learning_context += f"\n[한의원 정보 - 글에 자연스럽게 반영]\n{learning_data['clinic_info']}\n"
+
+    return learning_context
+
+
+def build_revision_learning_context(learning_data: dict) -> str:
+    """퇴고용 학습 컨텍스트를 만듭니다 (스타일 규칙 + 최근 어투 예시 3개)."""
+    learning_context = ""
+    if not learning_data:
+        return learning_context
+
+    # 스타일 규칙 반영 (영구적으로 저장된 스타일 규칙)
+    style_rules = learning_data.get('style_rules', [])
+    if style_rules:
+        learning_context += f"\n\n=== [학습된 스타일 규칙 - 반드시 준수해야 함] ===\n"
+        for i, rule in enumerate(style_rules, 1):
+            learning_context += f"{i}. {rule}\n"
+        learning_context += "\n[중요] 매우 중요: 위의 스타일 규칙을 반드시 준수하여 퇴고하세요. 이 규칙들은 사용자가 이전 퇴고를 통해 영구적으로 설정한 것이므로 절대 위반하지 마세요.\n"
+
+    if learning_data.get('blog_texts'):
+        learning_context += f"\n\n[학습된 블로그 어투 예시 - 참고용]\n"
+        sample_texts = learning_data['blog_texts'][-3:]
+        for i, text in enumerate(sample_texts, 1):
+            text_preview = text[:500] + "..." if len(text) > 500 else text
+            learning_context += f"예시 {i}:\n{text_preview}\n\n"
+
+    return learning_context
+
+
+def _cached_fragment(key: str, builder: Callable[[dict], T]) -> T:
+    """현재 학습 데이터 버전의 조각이 있으면 재사용하고, 없으면 만들어 저장합니다."""
+    learning_data, version = learning_store.versioned_snapshot()
+    with _cache_lock:
+        cached = _fragment_cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+
+    fragment = builder(learning_data)
+    with _cache_lock:
+        _fragment_cache[key] = (version, fragment)
+    print(f"[프롬프트 캐시] 학습 컨텍스트 생성 ({key}, 버전 {version})")
+    return fragment
+
+
+def get_draft_learning_context(tone: str, query: str = "") -> Tuple[str, bool]:
+    """
+    초안 생성용 학습 컨텍스트를 반환합니다.
+    어투 예시는 "종성이가 씀 !" 스타일(personal)일 때만 넣으며, 주제/키워드(query)와 비슷한 글을 고릅니다.
+    나머지 부분(스타일 규칙 등)은 학습 데이터 버전별로 캐시합니다.
+
+    Returns:
+        (learning_context, 학습된 어투 예시 포함 여부)
+    """
+    learning_data, _ = learning_store.versioned_snapshot()
+    examples_context = ""
+    # "종성이가 씀 !" 스타일(박원장 스타일)일 때만 학습된 어투 강력하게 반영
+    if tone == 'personal' and learning_data.get('blog_texts'):
+        sample_texts = select_style_examples(learning_data['blog_texts'], query, k=5)
+        examples_context = build_style_examples_context(sample_texts)
+
+    rules_context = _cached_fragment("draft", build_draft_rules_context)
+    return examples_context + rules_context, bool(examples_context)
+
+
+def get_revision_learning_context() -> str:
+    """퇴고용 학습 컨텍스트 (캐시)"""
+    return _cached_fragment("revise", build_revision_learning_context)
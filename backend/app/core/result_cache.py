@@ -0,0 +1,137 @@
+"""
+Gemini 결과 디스크 캐시 (입력 해시 기반)
+
+같은 입력으로 Gemini를 다시 호출하지 않도록 결과를 저장합니다.
+(예: 글을 조금 고친 뒤 의료법 검사를 다시 실행, 같은 표를 다시 생성)
+
+- 캐시 키: sha256(용도 + 모델 이름 + 공백을 정리한 입력값들)
+- 저장 구조 (RESULT_CACHE_DIR, 기본값: 프로젝트 루트/result_cache): {키}.json - 결과, 저장 시각
+- 최근 사용한 항목은 메모리(RESULT_CACHE_MEMORY_ENTRIES개)에도 보관하여 디스크를 읽지 않고 바로 반환합니다.
+- TTL(RESULT_CACHE_TTL, 초)이 지난 항목은 사용하지 않습니다.
+- 전체 크기가 RESULT_CACHE_MAX_MB를 넘으면 가장 오래된 항목부터 삭제합니다.
+- 호출 측에서 refresh(캐시 무시) 옵션을 주면 캐시를 읽지 않고 새로 호출한 결과로 덮어씁니다.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from app.core.crawl_cache import content_hash
+
+# backend/app/core/result_cache.py -> backend/app/core -> backend/app -> backend -> 프로젝트 루트
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent.parent.parent / "result_cache"
+RESULT_CACHE_DIR = Path(os.getenv("RESULT_CACHE_DIR", str(DEFAULT_CACHE_DIR)))
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", str(7 * 24 * 60 * 60)))  # 기본 7일
+RESULT_CACHE_MAX_BYTES = int(float(os.getenv("RESULT_CACHE_MAX_MB", "50")) * 1024 * 1024)
+RESULT_CACHE_MEMORY_ENTRIES = int(os.getenv("RESULT_CACHE_MEMORY_ENTRIES", "2000"))
+
+
+def make_cache_key(namespace: str, model_name: str, *parts: Optional[str]) -> str:
+    """용도, 모델 이름, 입력값(공백 정리)으로 캐시 키를 만듭니다."""
+    normalized = [' '.join((part or '').split()) for part in parts]
+    return content_hash(json.dumps([namespace, model_name, *normalized], ensure_ascii=False))
+
+
+class ResultCache:
+    def __init__(self, cache_dir: Path = RESULT_CACHE_DIR, ttl: int = RESULT_CACHE_TTL,
+                 max_bytes: int = RESULT_CACHE_MAX_BYTES, memory_entries: int = RESULT_CACHE_MEMORY_ENTRIES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()  # 키 -> (저장 시각, 결과)
+        self._lock = threading.Lock()
+        self._approx_bytes: Optional[int] = None  # 디스크 사용량 추정치 (처음 저장할 때 계산)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _remember(self, key: str, stored_at: float, value: Any):
+        with self._lock:
+            self._memory[key] = (stored_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """캐시된 결과를 반환합니다 (없거나 만료되었으면 default)."""
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                if now - cached[0] < self.ttl:
+                    self._memory.move_to_end(key)
+                    return cached[1]
+                del self._memory[key]
+
+        entry_path = self._entry_path(key)
+        if not entry_path.exists():
+            return default
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except Exception as e:
+            print(f"[결과 캐시] 항목 읽기 실패, 무시합니다 ({key[:12]}): {str(e)}")
+            return default
+        if now - entry.get('stored_at', 0) >= self.ttl:
+            return default
+        self._remember(key, entry['stored_at'], entry['value'])
+        return entry['value']
+
+    def put(self, key: str, value: Any):
+        """결과를 저장합니다 (JSON으로 저장 가능한 값만)."""
+        stored_at = time.time()
+        self._remember(key, stored_at, value)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            data = json.dumps({'stored_at': stored_at, 'value': value}, ensure_ascii=False)
+            entry_path = self._entry_path(key)
+            # 임시 파일에 쓴 뒤 교체 (중간에 중단되어도 깨진 항목이 남지 않도록)
+            tmp_path = entry_path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, entry_path)
+
+            with self._lock:
+                if self._approx_bytes is None:
+                    self._approx_bytes = sum(p.stat().st_size for p in self.cache_dir.glob("*.json"))
+                else:
+                    self._approx_bytes += len(data.encode('utf-8'))
+                over_limit = self._approx_bytes > self.max_bytes
+            if over_limit:
+                self._enforce_size_limit()
+        except Exception as e:
+            # 캐시 저장 실패는 결과에 영향을 주지 않음
+            print(f"[결과 캐시] 저장 실패 ({key[:12]}): {str(e)}")
+
+    def _enforce_size_limit(self):
+        """전체 크기가 상한을 넘으면 오래된 항목부터 상한의 80%까지 삭제합니다."""
+        entries = []
+        for entry_path in self.cache_dir.glob("*.json"):
+            try:
+                stat = entry_path.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry_path))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        entries.sort(key=lambda item: item[0])
+
+        removed = 0
+        target = self.max_bytes * 0.8
+        for _, size, entry_path in entries:
+            if total <= target:
+                break
+            entry_path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+            with self._lock:
+                self._memory.pop(entry_path.stem, None)
+        with self._lock:
+            self._approx_bytes = total
+        print(f"[결과 캐시] 크기 제한 초과 - {removed}개 항목 삭제 (현재 {total / 1024 / 1024:.1f}MB)")
+
+
+result_cache = ResultCache()
@@ -0,0 +1,151 @@
+"""
+학습된 블로그 글 검색 인덱스 (TF-IDF)
+
+초안 생성 시 최근 글 5개 대신, 주제/키워드와 가장 비슷한 학습 글을 어투 예시로 고르기 위한 인덱스입니다.
+- 한국어는 조사/어미 때문에 단어 단위로는 잘 맞지 않으므로, 단어 + 단어 내부 글자 2-gram을 함께 사용합니다.
+- 역색인(단어 -> 글 번호, 가중치)으로 저장하여 질의어가 포함된 글만 점수를 계산합니다.
+- numpy가 설치되어 있으면 배열로 점수를 계산하고, 없으면 순수 파이썬으로 계산합니다.
+- 인덱스는 학습 글 목록(blog_texts)이 바뀔 때만 다시 만듭니다 (글 수 + 마지막 글로 확인 -
+  학습 글은 뒤에 추가되거나 정리로 줄어들기만 하므로, 퇴고 패턴/규칙 저장 등으로 버전만 바뀐 경우는 그대로 사용).
+
+STYLE_EXAMPLE_SELECTION: "similar" (기본값, 주제와 비슷한 글) 또는 "recent" (기존 방식, 최근 글)
+"""
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from app.core.learning_store import learning_store
+
+STYLE_EXAMPLE_SELECTION = os.getenv("STYLE_EXAMPLE_SELECTION", "similar").strip().lower()
+
+_WORD_PATTERN = re.compile(r'[0-9a-zA-Z가-힣]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """단어와 단어 내부 글자 2-gram으로 나눕니다."""
+    tokens = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        tokens.append(word)
+        if len(word) > 2:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class StyleExampleIndex:
+    """블로그 글 목록에 대한 TF-IDF 역색인"""
+
+    def __init__(self, texts: List[str]):
+        self.size = len(texts)
+        self.idf: Dict[str, float] = {}
+        # 단어 -> (글 번호 목록, 정규화된 가중치 목록)
+        self.postings: Dict[str, Tuple[object, object]] = {}
+        self._build(texts)
+
+    def _build(self, texts: List[str]):
+        term_counts = [Counter(tokenize(text)) for text in texts]
+        document_frequency = Counter()
+        for counts in term_counts:
+            document_frequency.update(counts.keys())
+        self.idf = {
+            term: math.log((1 + self.size) / (1 + df)) + 1.0
+            for term, df in document_frequency.items()
+        }
+
+        postings: Dict[str, Tuple[List[int], List[float]]] = {}
+        for doc_id, counts in enumerate(term_counts):
+            weights = {term: (1.0 + math.log(count)) * self.idf[term] for term, count in counts.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for term, weight in weights.items():
+                doc_ids, doc_weights = postings.setdefault(term, ([], []))
+                doc_ids.append(doc_id)
+                doc_weights.append(weight / norm)
+
+        if np is not None:
+            self.postings = {
+                term: (np.asarray(ids, dtype=np.int32), np.asarray(ws, dtype=np.float32))
+                for term, (ids, ws) in postings.items()
+            }
+        else:
+            self.postings = postings
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """질의와 비슷한 글 (글 번호, 코사인 유사도)을 점수 순으로 최대 k개 반환합니다 (점수 0 제외)."""
+        query_terms = Counter(term for term in tokenize(query) if term in self.idf)
+        if not query_terms or self.size == 0:
+            return []
+
+        query_weights = {term: (1.0 + math.log(count)) * self.idf[term] for term, count in query_terms.items()}
+        query_norm = math.sqrt(sum(w * w for w in query_weights.values())) or 1.0
+
+        if np is not None:
+            scores = np.zeros(self.size, dtype=np.float32)
+            for term, weight in query_weights.items():
+                doc_ids, doc_weights = self.postings[term]
+                scores[doc_ids] += doc_weights * (weight / query_norm)
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            ranked = sorted(((int(i), float(scores[i])) for i in candidates), key=lambda item: -item[1])
+            return ranked[:k]
+
+        scores: Dict[int, float] = {}
+        for term, weight in query_weights.items():
+            doc_ids, doc_weights = self.postings[term]
+            for doc_id, doc_weight in zip(doc_ids, doc_weights):
+                scores[doc_id] = scores.get(doc_id, 0.0) + doc_weight * (weight / query_norm)
+        return sorted(scores.items(), key=lambda item: -item[1])[:k]
+
+
+_index: Optional[StyleExampleIndex] = None
+_index_fingerprint: Optional[tuple] = None
+_index_lock = threading.Lock()
+
+
+def _texts_fingerprint(texts: List[str]) -> tuple:
+    """학습 글 목록 식별값 (글 수, 마지막 글 해시)"""
+    return len(texts), hash(texts[-1]) if texts else None
+
+
+def get_style_index() -> Tuple[StyleExampleIndex, List[str]]:
+    """현재 학습 글의 인덱스와 글 목록을 반환합니다 (글 목록이 바뀌었으면 다시 만듦)."""
+    global _index, _index_fingerprint
+    learning_data, version = learning_store.versioned_snapshot()
+    texts = learning_data.get('blog_texts', [])
+    fingerprint = _texts_fingerprint(texts)
+    with _index_lock:
+        if _index is None or _index_fingerprint != fingerprint:
+            _index = StyleExampleIndex(texts)
+            _index_fingerprint = fingerprint
+            print(f"[어투 검색] 인덱스 생성 ({len(texts)}개 글, 단어 {len(_index.idf)}개, 버전 {version})")
+        return _index, texts
+
+
+def select_style_examples(texts: List[str], query: str, k: int = 5) -> List[str]:
+    """
+    어투 예시로 사용할 학습 글을 고릅니다.
+    주제/키워드와 비슷한 글을 우선하고, 부족하면 최근 글로 채웁니다.
+    (STYLE_EXAMPLE_SELECTION=recent 이거나 질의가 비어 있으면 기존처럼 최근 글 k개)
+    """
+    if STYLE_EXAMPLE_SELECTION == "recent" or not query.strip() or len(texts) <= k:
+        return texts[-k:]
+
+    index, indexed_texts = get_style_index()
+    if indexed_texts is not texts and _texts_fingerprint(indexed_texts) != _texts_fingerprint(texts):
+        # 호출 측 스냅샷과 인덱스 버전이 다르면(드물게 그 사이 학습된 경우) 현재 목록으로 임시 인덱스 사용
+        index = StyleExampleIndex(texts)
+
+    selected = [doc_id for doc_id, _ in index.search(query, k)]
+    for doc_id in range(len(texts) - 1, -1, -1):
+        if len(selected) >= k:
+            break
+        if doc_id not in selected:
+            selected.append(doc_id)
+    return [texts[doc_id] for doc_id in selected]
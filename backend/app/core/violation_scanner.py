@@ -0,0 +1,195 @@
+"""
+의료법 위반 표현 검사기 (Aho-Corasick)
+
+위반 단어 목록(사전)을 오토마톤으로 한 번 컴파일해 두고, 글을 한 번만 훑어서
+모든 일치 위치(시작/끝 글자 위치), 분류, 심각도를 찾습니다.
+단어 수가 늘어나도 검사 시간은 글 길이에 비례합니다. (기존: 단어마다 `in` 검사)
+
+- 기본 사전: DEFAULT_VIOLATION_LEXICON
+- VIOLATION_LEXICON_PATH: 추가 사전 JSON 파일 (선택사항). 파일이 바뀌면 다음 검사 때 다시 컴파일합니다.
+    [
+        {"pattern": "완벽하게 낫", "category": "효과 보장", "severity": "high"},
+        {"regex": "\\d+\\s*%\\s*(?:효과|개선)", "category": "효과 보장", "severity": "high"}
+    ]
+  regex 항목은 하나의 정규식으로 합쳐 한 번에 검사합니다.
+"""
+import json
+import os
+import re
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+VIOLATION_LEXICON_PATH = os.getenv("VIOLATION_LEXICON_PATH", "").strip()
+
+# 기본 의료법 위반 단어 (기존 MEDICAL_VIOLATION_WORDS, 순서 유지)
+DEFAULT_VIOLATION_LEXICON = [
+    {"pattern": "완치", "category": "효과 보장", "severity": "high"},
+    {"pattern": "치료", "category": "의료 행위 표현", "severity": "low"},
+    {"pattern": "100%", "category": "효과 보장", "severity": "high"},
+    {"pattern": "보장", "category": "효과 보장", "severity": "high"},
+    {"pattern": "확실", "category": "효과 보장", "severity": "medium"},
+    {"pattern": "무조건", "category": "효과 보장", "severity": "medium"},
+    {"pattern": "최고", "category": "비교 우위", "severity": "medium"},
+    {"pattern": "최강", "category": "비교 우위", "severity": "medium"},
+    {"pattern": "유일", "category": "비교 우위", "severity": "medium"},
+    {"pattern": "독점", "category": "비교 우위", "severity": "medium"},
+    {"pattern": "비밀", "category": "과장/기만", "severity": "low"},
+    {"pattern": "특허", "category": "과장/기만", "severity": "low"},
+    {"pattern": "당장", "category": "긴급성 유도", "severity": "low"},
+    {"pattern": "지금", "category": "긴급성 유도", "severity": "low"},
+    {"pattern": "급하게", "category": "긴급성 유도", "severity": "low"},
+    {"pattern": "즉시", "category": "긴급성 유도", "severity": "low"},
+    {"pattern": "당일", "category": "긴급성 유도", "severity": "low"},
+]
+
+
+def _lower_preserving_offsets(text: str) -> str:
+    """소문자로 바꾸되 글자 수가 바뀌는 문자(예: 'İ')는 그대로 두어 위치가 원문과 일치하도록 합니다."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+
+class AhoCorasickAutomaton:
+    """여러 문자열을 한 번에 찾는 Aho-Corasick 오토마톤"""
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        for index, pattern in enumerate(patterns):
+            self._add(pattern, index)
+        self._build_failure_links()
+
+    def _add(self, pattern: str, index: int):
+        node = 0
+        for ch in pattern:
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[node][ch] = next_node
+            node = next_node
+        self._output[node].append(index)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, next_node in self._goto[node].items():
+                queue.append(next_node)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail_target = self._goto[fail].get(ch, 0)
+                self._fail[next_node] = fail_target if fail_target != next_node else 0
+                self._output[next_node] = self._output[next_node] + self._output[self._fail[next_node]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """(끝 위치(포함하지 않음), 패턴 번호)를 찾는 순서대로 반환합니다."""
+        node = 0
+        for position, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for index in self._output[node]:
+                yield position + 1, index
+
+
+class ViolationScanner:
+    """컴파일된 위반 사전 (문자열은 Aho-Corasick, 정규식은 하나로 합친 패턴)"""
+
+    def __init__(self, lexicon: List[dict]):
+        self.entries = [entry for entry in lexicon if entry.get("pattern")]
+        self.regex_entries = [entry for entry in lexicon if entry.get("regex")]
+        self.automaton = AhoCorasickAutomaton([entry["pattern"].lower() for entry in self.entries])
+        self.regex = None
+        if self.regex_entries:
+            self.regex = re.compile(
+                '|'.join(f'(?P<r{i}>{entry["regex"]})' for i, entry in enumerate(self.regex_entries)),
+                re.IGNORECASE
+            )
+
+    def _match(self, entry: dict, word: str, start: int, end: int) -> dict:
+        return {
+            "word": word,
+            "start": start,
+            "end": end,
+            "category": entry.get("category", "기타"),
+            "severity": entry.get("severity", "medium"),
+        }
+
+    def scan(self, text: str) -> List[dict]:
+        """
+        모든 일치 항목을 시작 위치 순서로 반환합니다.
+        각 항목: {"word": 원문 표현, "start": 시작, "end": 끝(포함하지 않음), "category": 분류, "severity": "high" | "medium" | "low"}
+        """
+        matches = []
+        for end, index in self.automaton.iter_matches(_lower_preserving_offsets(text)):
+            start = end - len(self.entries[index]["pattern"])
+            matches.append(self._match(self.entries[index], text[start:end], start, end))
+        if self.regex is not None:
+            for found in self.regex.finditer(text):
+                index = int(found.lastgroup[1:])
+                matches.append(self._match(self.regex_entries[index], found.group(), found.start(), found.end()))
+        matches.sort(key=lambda match: (match["start"], -match["end"]))
+        return matches
+
+    def matched_words(self, text: str) -> List[str]:
+        """일치한 사전 단어 목록 (중복 제거, 사전 순서) - 기존 check_medical_violations와 같은 형태"""
+        found = set()
+        for _, index in self.automaton.iter_matches(_lower_preserving_offsets(text)):
+            found.add(index)
+        words = [entry["pattern"] for i, entry in enumerate(self.entries) if i in found]
+        if self.regex is not None:
+            for match in self.regex.finditer(text):
+                if match.group() not in words:
+                    words.append(match.group())
+        return words
+
+
+_scanner: Optional[ViolationScanner] = None
+_scanner_signature = None
+_scanner_lock = threading.Lock()
+
+
+def _lexicon_signature() -> Optional[Tuple[int, int]]:
+    if not VIOLATION_LEXICON_PATH:
+        return None
+    try:
+        stat = Path(VIOLATION_LEXICON_PATH).stat()
+        return stat.st_mtime_ns, stat.st_size
+    except FileNotFoundError:
+        return None
+
+
+def _load_lexicon() -> List[dict]:
+    lexicon = list(DEFAULT_VIOLATION_LEXICON)
+    if VIOLATION_LEXICON_PATH and Path(VIOLATION_LEXICON_PATH).exists():
+        try:
+            with open(VIOLATION_LEXICON_PATH, 'r', encoding='utf-8') as f:
+                lexicon.extend(json.load(f))
+        except Exception as e:
+            print(f"[위반 검사] 추가 사전 로드 실패, 기본 사전만 사용합니다: {str(e)}")
+    return lexicon
+
+
+def get_violation_scanner() -> ViolationScanner:
+    """컴파일된 검사기를 반환합니다 (사전 파일이 바뀌었으면 다시 컴파일)."""
+    global _scanner, _scanner_signature
+    signature = _lexicon_signature()
+    if _scanner is not None and signature == _scanner_signature:
+        return _scanner
+    with _scanner_lock:
+        if _scanner is None or signature != _scanner_signature:
+            lexicon = _load_lexicon()
+            _scanner = ViolationScanner(lexicon)
+            _scanner_signature = signature
+            print(f"[위반 검사] 사전 컴파일 완료 ({len(lexicon)}개 항목)")
+        return _scanner
@@ -0,0 +1,57 @@
+"""
+CPU 작업 전용 워커 풀
+
+HTML 파싱처럼 CPU를 많이 쓰는 동기 작업을 이벤트 루프 밖에서 실행합니다.
+asyncio.to_thread는 GIL을 공유하므로 순수 파이썬 파싱 중에는 다른 요청도 느려집니다.
+기본값은 별도 프로세스 풀이며, 환경 변수로 조정할 수 있습니다.
+
+- CPU_WORKER_MODE: "process" (기본값) 또는 "thread"
+- CPU_WORKERS: 워커 수 (기본값: 2)
+
+프로세스 풀에 넘기는 함수와 인자는 pickle 가능해야 합니다 (모듈 최상위 함수 사용).
+"""
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+CPU_WORKER_MODE = os.getenv("CPU_WORKER_MODE", "process").strip().lower()
+CPU_WORKERS = max(1, int(os.getenv("CPU_WORKERS", "2")))
+
+_executor: Optional[Executor] = None
+
+
+def get_cpu_executor() -> Executor:
+    """CPU 작업용 실행기를 반환합니다 (처음 호출 시 생성)."""
+    global _executor
+    if _executor is None:
+        if CPU_WORKER_MODE == "thread":
+            _executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="cpu-worker")
+        else:
+            _executor = ProcessPoolExecutor(max_workers=CPU_WORKERS)
+        print(f"[워커 풀] CPU 워커 풀 생성 (모드: {CPU_WORKER_MODE}, 워커: {CPU_WORKERS}개)")
+    return _executor
+
+
+async def run_cpu_bound(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    CPU 작업을 워커 풀에서 실행하고 결과를 기다립니다.
+    프로세스 풀이 깨진 경우(워커 비정상 종료 등) 풀을 다시 만들고, 이번 호출은 스레드에서 실행합니다.
+    """
+    global _executor
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_cpu_executor(), func, *args)
+    except BrokenProcessPool:
+        print("[워커 풀] 프로세스 풀이 중단되어 재생성합니다. (이번 작업은 스레드에서 실행)")
+        _executor = None
+        return await asyncio.to_thread(func, *args)
+
+
+def shutdown_cpu_executor():
+    """앱 종료 시 워커 풀을 정리합니다."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -1,6 +1,12 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import get_settings
+from app.core.workers import shutdown_cpu_executor
+from app.core.crawl_client import close_crawl_client
+from app.core.gemini import shutdown_gemini_executor
+from app.core.imagen import preload_imagen_model
+from app.core.image_jobs import image_jobs
+from app.core.log_writer import LOG_FILE_PATH, log_to_file, shutdown_log_writer
 import logging
 
 # 로깅 설정 - 콘솔에 명확하게 출력
@@ -42,62 +48,12 @@ app = FastAPI(
     description="문정역 한의원을 위한 네이버 블로그 최적화 및 자동화 도구"
 )
 
-# 로그 파일 경로
-from pathlib import Path
-# backend/app/main.py -> backend/app -> backend -> 프로젝트 루트
-LOG_FILE_PATH = Path(__file__).resolve().parent.parent.parent / "backend_logs.txt"
-
-def log_to_file(message: str):
-    """파일과 콘솔 모두에 로그 출력"""
-    from datetime import datetime
-    import os
-    
-    # 콘솔에 먼저 출력 (인코딩 문제 없이)
-    print(message, flush=True)
-    sys.stdout.flush()
-    sys.stderr.flush()
-    
-    # 파일에 쓰기 (UTF-8)
-    try:
-        # 로그 파일 경로 확인
-        log_dir = LOG_FILE_PATH.parent
-        if not log_dir.exists():
-            log_dir.mkdir(parents=True, exist_ok=True)
-            print(f"[로그] 디렉토리 생성: {log_dir}", flush=True)
-        
-        # 메시지를 UTF-8로 명시적으로 인코딩
-        message_bytes = message.encode('utf-8', errors='replace')
-        message_safe = message_bytes.decode('utf-8', errors='replace')
-        
-        # 파일 열기 (없으면 생성)
-        with open(LOG_FILE_PATH, 'a', encoding='utf-8', errors='replace') as f:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"[{timestamp}] {message_safe}\n")
-            f.flush()
-            os.fsync(f.fileno())  # 디스크에 즉시 쓰기
-    except PermissionError as e:
-        print(f"[로그 파일 쓰기 실패 - 권한 오류] {str(e)}", flush=True)
-        print(f"[로그 파일 경로] {LOG_FILE_PATH}", flush=True)
-    except Exception as e:
-        # 파일 로깅 실패해도 콘솔 출력은 계속
-        print(f"[로그 파일 쓰기 실패] {type(e).__name__}: {str(e)}", flush=True)
-        print(f"[로그 파일 경로] {LOG_FILE_PATH}", flush=True)
-        import traceback
-        print(f"[로그 파일 쓰기 실패 상세] {traceback.format_exc()}", flush=True)
-
 # 요청 로깅 미들웨어 - 모든 요청을 로깅
 # 주의: 미들웨어는 CORS 미들웨어보다 먼저 등록되어야 함
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    # 미들웨어 호출 확인용 로그 (즉시 출력)
-    import sys
     import time
-    print(f"\n{'='*80}", flush=True)
-    print(f"[미들웨어 호출 확인] {request.method} {request.url.path}", flush=True)
-    print(f"[미들웨어 호출 확인] 클라이언트: {request.client.host if request.client else 'Unknown'}", flush=True)
-    sys.stdout.flush()
-    sys.stderr.flush()
-    
+
     # 모든 요청을 강제로 출력 (stdout과 stderr 모두)
     start_time = time.time()
     request_path = str(request.url.path)
@@ -146,11 +102,12 @@ app.add_middleware(
 )
 
 # 라우터 임포트
-from app.api import keywords, ai, auth
+from app.api import keywords, ai, auth, media
 
 app.include_router(keywords.router, prefix="/api", tags=["keywords"])
 app.include_router(ai.router, prefix="/api", tags=["ai"])
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
+app.include_router(media.router, prefix="/api", tags=["media"])
 
 
 @app.get("/", tags=["system"])
@@ -205,3 +162,15 @@ async def startup_event():
     print("[시스템] 백엔드 서버 시작 완료", flush=True)
     print(f"[시스템] 미들웨어 개수: {len(app.user_middleware)}", flush=True)
     print("=" * 80 + "\n", flush=True)
+    # Imagen 모델 미리 초기화 (백그라운드, 첫 이미지 요청 대기 시간 감소)
+    preload_imagen_model()
+
+
+# 앱 종료 시 CPU 워커 풀 및 크롤링 클라이언트 정리
+@app.on_event("shutdown")
+async def shutdown_event():
+    shutdown_cpu_executor()
+    shutdown_gemini_executor()
+    image_jobs.cancel_all()
+    await close_crawl_client()
+    shutdown_log_writer()
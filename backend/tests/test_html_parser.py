@@ -0,0 +1,77 @@
+"""
+html.parser / lxml 추출 결과 비교
+
+HTML_PARSER 기본값(auto)은 lxml이 설치되어 있으면 lxml을 사용하므로,
+대표적인 네이버 페이지(tests/fixtures/naver)에서 두 파서의 추출 결과가 같아야 합니다.
+실행: backend 폴더에서 python -m pytest -q
+"""
+from pathlib import Path
+
+import pytest
+
+from app.core import html_parser
+
+pytest.importorskip("lxml")
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "naver"
+POST_FIXTURES = ["smarteditor_post.html", "legacy_post.html", "frameset_post.html", "malformed_post.html"]
+
+
+def _load(name: str) -> str:
+    return (FIXTURES_DIR / name).read_text(encoding='utf-8')
+
+
+def _parse_with(backend: str, func, *args):
+    """HTML_PARSER를 지정한 백엔드로 바꿔 func를 실행합니다."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("HTML_PARSER", backend)
+        html_parser.get_parser_backend.cache_clear()
+        try:
+            assert html_parser.get_parser_backend() == backend
+            return func(*args)
+        finally:
+            html_parser.get_parser_backend.cache_clear()
+
+
+@pytest.mark.parametrize("name", POST_FIXTURES)
+def test_parse_naver_post_parity(name):
+    html = _load(name)
+    url = "https://blog.naver.com/sample_clinic/223456789012"
+    expected = _parse_with("html.parser", html_parser.parse_naver_post, html, url)
+    assert _parse_with("lxml", html_parser.parse_naver_post, html, url) == expected
+
+
+@pytest.mark.parametrize("name", POST_FIXTURES)
+def test_parse_naver_iframe_parity(name):
+    html = _load(name)
+    expected = _parse_with("html.parser", html_parser.parse_naver_iframe, html)
+    assert _parse_with("lxml", html_parser.parse_naver_iframe, html) == expected
+
+
+def test_parse_post_list_page_parity():
+    html = _load("post_list.html")
+    expected = _parse_with("html.parser", html_parser.parse_post_list_page, html, "sample_clinic")
+    assert _parse_with("lxml", html_parser.parse_post_list_page, html, "sample_clinic") == expected
+
+
+def test_smarteditor_text_keeps_inline_spans_on_one_line():
+    result = _parse_with("lxml", html_parser.parse_naver_post, _load("smarteditor_post.html"))
+    assert result['selector'] == '.se-main-container'
+    lines = result['text'].split('\n')
+    assert "안녕하세요, 샘플 한의원 원장입니다." in lines
+    assert "오늘은 오래 앉아 있는 분들이 자주 겪는 허리 통증에 대해" in lines
+    assert "허리 통증, 이렇게 관리하세요" in lines
+    assert '' not in lines and '​' not in result['text']
+
+
+def test_frameset_post_falls_back_to_iframe():
+    result = _parse_with("lxml", html_parser.parse_naver_post, _load("frameset_post.html"))
+    assert result['selector'] is None
+    assert result['iframe_src'].startswith("/PostView.naver?blogId=sample_clinic&logNo=223456789012")
+    assert result['generic'][1] == "body"
+    assert "메뉴 바로가기" not in result['body_text']
+
+
+def test_malformed_inline_markup_is_not_split():
+    result = _parse_with("html.parser", html_parser.parse_naver_post, _load("malformed_post.html"))
+    assert result['text'].startswith("불면증으로 고생하시는 분들이\n많습니다.")
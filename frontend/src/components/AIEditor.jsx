@@ -2,6 +2,24 @@ import { useState, useEffect } from 'react';
 
 const API_BASE_URL = 'http://127.0.0.1:8000/api';
 
+// NDJSON 스트림 읽기 (한 줄에 이벤트 하나) - /ai/draft/stream, /ai/revise/stream, /ai/learn/stream
+const readNdjsonStream = async (response, onEvent) => {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop();
+    for (const line of lines) {
+      if (line.trim()) onEvent(JSON.parse(line));
+    }
+  }
+  if (buffer.trim()) onEvent(JSON.parse(buffer));
+};
+
 export default function AIEditor() {
   const [topic, setTopic] = useState('손목통증');
   const [keywords, setKeywords] = useState('문정역 한의원, 문정역 교통사고 한의원');
@@ -30,6 +48,7 @@ export default function AIEditor() {
   const [cookies, setCookies] = useState(''); // 네이버 로그인 쿠키
   const [learningLoading, setLearningLoading] = useState(false);
   const [learningStatus, setLearningStatus] = useState(null);
+  const [learningProgress, setLearningProgress] = useState(null); // 스트리밍 학습 진행 상황
   
   // 우클릭 컨텍스트 메뉴 관련 상태
   const [contextMenu, setContextMenu] = useState(null);
@@ -106,7 +125,8 @@ export default function AIEditor() {
       const controller = new AbortController();
       const timeoutId = setTimeout(() => controller.abort(), 120000);
       
-      const response = await fetch(`${API_BASE_URL}/ai/draft`, {
+      // 스트리밍 초안 생성 API 사용 (생성되는 텍스트를 바로 표시)
+      const response = await fetch(`${API_BASE_URL}/ai/draft/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -117,19 +137,43 @@ export default function AIEditor() {
           writing_instruction: writingInstruction.trim() || undefined, // 글쓰기 지시사항 (구조, 길이, 타겟 등)
           content_instruction: contentInstruction.trim() || undefined, // 글의 내용 지시사항 (구체적인 사건, 경험 등)
           tone: style, // 'diary', 'blog', 'essay', 'personal'
-          length: 'medium'
+          length: 'medium',
+          background_image: true // 이미지는 백그라운드에서 생성 (초안 먼저 표시, 완료 후 교체)
         }),
         signal: controller.signal
       });
 
-      clearTimeout(timeoutId);
-
       if (!response.ok) {
+        clearTimeout(timeoutId);
         const error = await response.json();
         throw new Error(error.detail || '초안 생성 실패');
       }
 
-      const data = await response.json();
+      let data = null;
+      let streamedText = '';
+      setDraft('');
+      setViolations([]);
+      setEditingMode(prev => ({ ...prev, draft: false }));
+      await readNdjsonStream(response, (event) => {
+        if (event.type === 'chunk') {
+          streamedText += event.text;
+          setDraft(streamedText);
+          setWordCount(streamedText.length);
+        } else if (event.type === 'violation') {
+          // 생성 중 발견된 위반 단어 (최종 결과는 done 이벤트에서 교체)
+          setViolations(prev => [...prev, ...event.words.filter(word => !prev.includes(word))]);
+        } else if (event.type === 'done') {
+          data = event.result;
+        } else if (event.type === 'error') {
+          throw new Error(event.detail || '초안 생성 실패');
+        }
+      });
+      clearTimeout(timeoutId);
+
+      if (!data) {
+        throw new Error('초안 생성 결과를 받지 못했습니다.');
+      }
+      // 최종 초안 (이미지가 삽입된 버전)으로 교체
       setDraft(data.draft);
       setViolations(data.medical_violations || []);
       setWordCount(data.word_count || 0);
@@ -167,6 +211,11 @@ export default function AIEditor() {
       setEditingMode({ draft: false, revised: false, final: false });
       setPreviewMode({ draft: true, revised: true, final: true });
       // 내용 지시사항은 유지 (재사용 가능)
+
+      // 백그라운드 이미지 작업이 있으면 완료 후 플레이스홀더를 실제 이미지로 교체
+      if (data.image_job_id && data.image_placeholder) {
+        pollImageJob(data.image_job_id, data.image_placeholder);
+      }
     } catch (error) {
       console.error('초안 생성 실패:', error);
       if (error.name === 'AbortError') {
@@ -179,6 +228,47 @@ export default function AIEditor() {
     }
   };
 
+  // 백그라운드 이미지 작업 상태 확인 (3초 간격, 최대 5분)
+  const pollImageJob = async (jobId, placeholder) => {
+    const deadline = Date.now() + 5 * 60 * 1000;
+    while (Date.now() < deadline) {
+      await new Promise(resolve => setTimeout(resolve, 3000));
+      let job;
+      try {
+        const response = await fetch(`${API_BASE_URL}/ai/image/jobs/${jobId}`);
+        if (!response.ok) {
+          console.warn('[프론트엔드] 이미지 작업을 찾을 수 없습니다:', jobId);
+          return;
+        }
+        job = await response.json();
+      } catch (error) {
+        console.warn('[프론트엔드] 이미지 작업 상태 확인 실패 (다시 시도):', error);
+        continue;
+      }
+      if (job.status === 'pending') continue;
+      if (job.status === 'done' && job.result?.markdown) {
+        const markdown = job.result.markdown;
+        const markdownMatch = markdown.match(/!\[([^\]]*)\]\(([^)]+)\)/);
+        // 초안(수정 중일 수 있음)에 남아 있는 플레이스홀더만 교체
+        setDraft(prev => prev.replace(placeholder, markdown));
+        setUploadedImages(prev => ({
+          ...prev,
+          draft: prev.draft.map(img => img.markdown === placeholder ? {
+            ...img,
+            url: job.result.image_url || (markdownMatch ? markdownMatch[2] : img.url),
+            previewUrl: job.result.variants?.thumb,
+            markdown
+          } : img)
+        }));
+        console.log('[프론트엔드] 백그라운드 이미지 교체 완료:', jobId);
+      } else {
+        console.warn('[프론트엔드] 백그라운드 이미지 생성 실패:', job.error);
+      }
+      return;
+    }
+    console.warn('[프론트엔드] 백그라운드 이미지 생성 시간 초과 (5분):', jobId);
+  };
+
   const handleCheckViolations = async () => {
     if (!draft.trim()) return;
 
@@ -205,7 +295,8 @@ export default function AIEditor() {
       // 새로운 퇴고 결과를 위해 기존 revisedDraft는 유지 (이전 버전 보존)
       // 새로운 퇴고 결과는 revisedDraft에 덮어쓰기
       
-      const response = await fetch(`${API_BASE_URL}/ai/revise`, {
+      // 스트리밍 퇴고 API 사용 (수정되는 텍스트를 바로 표시)
+      const response = await fetch(`${API_BASE_URL}/ai/revise/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -222,7 +313,25 @@ export default function AIEditor() {
         throw new Error(error.detail || '퇴고 실패');
       }
 
-      const data = await response.json();
+      let data = null;
+      let streamedText = '';
+      setRevisedViolations([]);
+      await readNdjsonStream(response, (event) => {
+        if (event.type === 'chunk') {
+          streamedText += event.text;
+          setRevisedDraft(streamedText);
+        } else if (event.type === 'violation') {
+          setRevisedViolations(prev => [...prev, ...event.words.filter(word => !prev.includes(word))]);
+        } else if (event.type === 'done') {
+          data = event.result;
+        } else if (event.type === 'error') {
+          throw new Error(event.detail || '퇴고 실패');
+        }
+      });
+
+      if (!data) {
+        throw new Error('퇴고 결과를 받지 못했습니다.');
+      }
       setRevisedDraft(data.revised_draft);
       setRevisedViolations(data.medical_violations || []); // 퇴고된 버전의 위반 사항 저장
       
@@ -266,7 +375,10 @@ export default function AIEditor() {
       // 텍스트를 통으로 하나로 처리 (빈 줄로 나누지 않음)
       const textToLearn = blogTexts.trim() || undefined;
       
-      const response = await fetch(`${API_BASE_URL}/ai/learn`, {
+      setLearningProgress(null);
+      
+      // 스트리밍 학습 API 사용 (포스트별 진행 상황을 NDJSON으로 수신)
+      const response = await fetch(`${API_BASE_URL}/ai/learn/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -286,7 +398,35 @@ export default function AIEditor() {
         throw new Error(error.detail || '학습 실패');
       }
 
-      const data = await response.json();
+      let data = null;
+      let successCount = 0;
+      let failCount = 0;
+      
+      const handleEvent = (event) => {
+        if (event.type === 'start') {
+          setLearningProgress({ total: event.total, done: 0, success: 0, failed: 0, last: null });
+        } else if (event.type === 'post') {
+          if (event.status === 'success') successCount += 1;
+          else failCount += 1;
+          setLearningProgress({
+            total: event.total,
+            done: event.index,
+            success: successCount,
+            failed: failCount,
+            last: event,
+          });
+        } else if (event.type === 'done') {
+          data = event.result;
+        } else if (event.type === 'error') {
+          throw new Error(event.detail || '학습 실패');
+        }
+      };
+      
+      await readNdjsonStream(response, handleEvent);
+      
+      if (!data) {
+        throw new Error('학습 결과를 받지 못했습니다.');
+      }
       
       // 학습 결과를 상세히 표시
       let resultMessage = data.message || '학습이 완료되었습니다!';
@@ -642,6 +782,7 @@ export default function AIEditor() {
             id: imageId,
             url: imageUrl,
             alt: imageAlt,
+            previewUrl: data.preview_url,
             markdown: data.markdown
           };
           console.log('[프론트엔드] 새 이미지 객체:', newImage);
@@ -1030,6 +1171,28 @@ export default function AIEditor() {
             >
               {learningLoading ? '학습 중...' : '학습하기'}
             </button>
+            {learningLoading && learningProgress && learningProgress.total > 0 && (
+              <div className="rounded-lg border border-slate-200 bg-slate-50 p-3 text-sm text-slate-700">
+                <p className="font-medium">
+                  크롤링 진행: {learningProgress.done} / {learningProgress.total}
+                  <span className="ml-2 text-xs text-slate-500">
+                    (성공 {learningProgress.success}, 실패 {learningProgress.failed})
+                  </span>
+                </p>
+                <div className="mt-2 h-2 w-full rounded-full bg-slate-200">
+                  <div
+                    className="h-2 rounded-full bg-clinicGreen-600"
+                    style={{ width: `${Math.round((learningProgress.done / learningProgress.total) * 100)}%` }}
+                  />
+                </div>
+                {learningProgress.last && (
+                  <p className="mt-2 truncate text-xs text-slate-500">
+                    {learningProgress.last.status === 'success' ? '✓' : '✗'} {learningProgress.last.url}
+                    {' '}({learningProgress.last.char_count}자, {learningProgress.last.elapsed}초)
+                  </p>
+                )}
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -1264,7 +1427,7 @@ export default function AIEditor() {
                     {uploadedImages.draft.map((img) => (
                       <div key={img.id} className="relative group">
                         <img
-                          src={img.url}
+                          src={img.previewUrl || img.url}
                           alt={img.alt}
                           className="w-full h-24 object-cover rounded border border-slate-300 cursor-pointer hover:opacity-80 transition-opacity"
                           onClick={() => {
@@ -1428,7 +1591,7 @@ export default function AIEditor() {
                       {uploadedImages.revised.map((img) => (
                         <div key={img.id} className="relative group">
                           <img
-                            src={img.url}
+                            src={img.previewUrl || img.url}
                             alt={img.alt}
                             className="w-full h-24 object-cover rounded border border-clinicGreen-300"
                           />
@@ -1601,7 +1764,7 @@ export default function AIEditor() {
                       {uploadedImages.final.map((img) => (
                         <div key={img.id} className="relative group">
                           <img
-                            src={img.url}
+                            src={img.previewUrl || img.url}
                             alt={img.alt}
                             className="w-full h-24 object-cover rounded border border-purple-300"
                           />